@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_batch.py  # Compare Gene Calls, Batch
+#
+# Programmer: Carol Zhou
+#
+# Description:  Compares gene calls for many genomes in one invocation.
+#    Inputs a manifest listing, for each genome, the gene call files
+#    (prepared by CGC_parser.py) to be compared. The genomes are
+#    processed concurrently in a pool of worker processes, each running
+#    the same comparison as CGC_main.py. The report and log for each
+#    genome are written under an output directory, and one summary
+#    table covers all genomes.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: CompareGenome() and FormatSummaryLine() split from RunGenome(), for CGC_runner.py
+#    16 Oct 2026: duplicate and unusable genome ids are skipped; a genome that fails is an error row, not the end of the batch
+#    16 Oct 2026: CompareGenome() takes the match mode, minimum overlap, grid format and backend (see CGC_runner.py)
+#    16 Oct 2026: a comparison refused by CGC_main.RunComparison() is an error row, not no_calls
+#
+# Programmer's Notes:
+#    Manifest format: one genome per line, tab separated:
+#        <genome id> <tab> <gene call file> [<tab> <gene call file> ...]
+#    Blank lines and lines beginning with '#' are skipped. Each genome id
+#    must name a directory of its own: a repeated id, or ".", "..", is
+#    skipped (path separators in an id are replaced by '_').
+#    Output, for each genome:  <outdir>/<genome id>/CGC_main.out (report)
+#                              <outdir>/<genome id>/CGC_main.log
+#    Summary of all genomes:   <outdir>/CGC_batch.summary.tsv
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import os
+import re
+import multiprocessing
+import CGC_compare
+import CGC_grid
+import CGC_main
+
+##### FILES
+
+CODE_BASE    = "./CGC_batch"
+CODE_FILE    = CODE_BASE + ".py"
+SUMMARY_FILE = "CGC_batch.summary.tsv"
+GENOME_OUT   = "CGC_main.out"
+GENOME_LOG   = "CGC_main.log"
+
+##### PATTERNS
+
+p_comment  = re.compile('^#')
+
+##### PRINT CONTROL
+
+CHATTY = True
+#CHATTY = False
+
+##### CONSTANTS
+
+HELP_STRING = "This code compares gene calls for each genome listed in a manifest, running the comparison of CGC_main.py for many genomes in a single invocation. Type: python " + CODE_FILE + " usage|input for more information\n"
+
+USAGE_STRING = "Usage:  python " + CODE_FILE + " [--workers=N] [--stream] <manifest> <outdir>\n"
+
+INPUT_STRING = "The manifest lists one genome per line: a genome id, followed by the gene call files (prepared by CGC_parser.py) to compare, separated by tabs. Lines beginning with '#' are skipped. The report and log for each genome are written to <outdir>/<genome id>/, and a summary of all genomes to <outdir>/" + SUMMARY_FILE + "\n"
+
+SUMMARY_HEADER = "genome\tstatus\tcallers\tdistinct\tcommon\tlone\tcallsPerCaller\n"
+
+##### FUNCTIONS
+
+# Read the manifest; returns a list of (genome id, list of gene call files)
+# A genome whose id does not name a directory of its own under the output directory (e.g., "..", or an id
+# already listed, or one that differs from a listed id only by a path separator) is skipped, with a warning
+def ReadManifest(MANIFEST_HANDLE):
+    genomes = []
+    genomeDirs = set()
+    for line in MANIFEST_HANDLE:
+        line = line.rstrip('\r\n')
+        if line.strip() == '' or re.search(p_comment,line):
+            continue
+        fields = [field.strip() for field in line.split('\t') if field.strip() != '']
+        if len(fields) < 2:
+            print "WARNING: manifest line lists no gene call files; skipped:", line
+            continue
+        genomeDir = GetGenomeDirName(fields[0])
+        if genomeDir in ('','.','..'):
+            print "WARNING: genome id cannot be used as a directory name; skipped:", line
+            continue
+        if genomeDir in genomeDirs:
+            print "WARNING: genome id is listed more than once; skipped:", line
+            continue
+        genomeDirs.add(genomeDir)
+        genomes.append((fields[0],fields[1:]))
+    return genomes
+
+# The name of the directory of a genome's report and log: the genome id, with path separators replaced
+def GetGenomeDirName(genomeId):
+    genomeDir = genomeId.replace(os.sep,'_')
+    if os.altsep:
+        genomeDir = genomeDir.replace(os.altsep,'_')
+    return genomeDir
+
+# The directory of a genome's report and log
+def GetGenomeDir(outDir,genomeId):
+    return os.path.join(outDir,GetGenomeDirName(genomeId))
+
+# Compare the gene calls of a single genome, writing its report and log under outDir
+# stream, matchMode, minOverlap, gridFormat and backend are those of CGC_main.RunComparison()
+# Returns (status, summary), where summary holds the counts of Comparison.statsSummary; any failure (e.g., the
+# genome's directory cannot be made, or the comparison is refused) is returned as an error status, so the batch goes on
+def CompareGenome(genomeId,fileSet,outDir,stream=False,matchMode=CGC_compare.MATCH_EXACT,minOverlap=CGC_compare.DEFAULT_MIN_OVERLAP,
+                  gridFormat=CGC_grid.GRID_TSV,backend=CGC_compare.BACKEND_PYTHON):
+    CGC_main.CHATTY = False
+    OUT = None; LOG = None
+    logged = False  # the error is already in the log
+    try:
+        genomeDir = GetGenomeDir(outDir,genomeId)
+        if not os.path.isdir(genomeDir):
+            os.makedirs(genomeDir)
+        OUT = open(os.path.join(genomeDir,GENOME_OUT),"w")
+        LOG = open(os.path.join(genomeDir,GENOME_LOG),"w")
+        comparison = CGC_main.RunComparison(fileSet,OUT,LOG,stream,1,matchMode,minOverlap,None,gridFormat,backend=backend)
+        summary = comparison.statsSummary
+        if comparison.error:  # refused, or stopped, e.g., streaming an unsorted file
+            status  = "error: " + comparison.error.replace('\t',' ')
+            logged  = True
+            summary = {'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}}
+        elif summary:
+            status = "ok"
+        else:
+            status = "no_calls"
+            summary = {'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}}
+    except Exception as e:  # e.g., IOError, OSError, ValueError: any failure ends this genome only
+        status  = "error: " + ("%s: %s" % (type(e).__name__,e)).replace('\t',' ')
+        summary = {'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}}
+    if LOG is not None:
+        if status.startswith("error: ") and not logged:
+            LOG.write("%s%s\n" % ("ERROR: ",status[len("error: "):]))
+        LOG.write("%s\n" % ("Processing complete"))
+        LOG.close()
+    if OUT is not None:
+        OUT.close()
+    return status, summary
+
+# Returns a genome's line of the summary table (see SUMMARY_HEADER)
+def FormatSummaryLine(genomeId,status,summary):
+    callers = sorted(summary['callerCounts'].keys())
+    callsPerCaller = ','.join([caller + '=' + str(summary['callerCounts'][caller]) for caller in callers])
+    return "%s\t%s\t%s\t%s\t%s\t%s\t%s\n" % (genomeId,status,','.join(callers),summary['distinct'],
+                                           summary['common'],summary['lone'],callsPerCaller)
+
+# Compare the gene calls of a single genome; runs in a worker process
+# job is (genome id, gene call files, output directory, stream); returns the genome's summary line
+def RunGenome(job):
+    genomeId, fileSet, outDir, stream = job
+    status, summary = CompareGenome(genomeId,fileSet,outDir,stream)
+    return FormatSummaryLine(genomeId,status,summary)
+
+# Compare every genome in the manifest, using a pool of worker processes
+# Summary lines are written in manifest order as the genomes complete
+def RunBatch(genomes,outDir,workers=1,stream=False):
+    if not os.path.isdir(outDir):
+        os.makedirs(outDir)
+    jobs = [(genomeId,fileSet,outDir,stream) for genomeId, fileSet in genomes]
+    SUMMARY = open(os.path.join(outDir,SUMMARY_FILE),"w")
+    SUMMARY.write(SUMMARY_HEADER)
+    if workers > 1:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(RunGenome,jobs)
+    else:
+        pool = None
+        results = (RunGenome(job) for job in jobs)
+    count = 0
+    for summaryLine in results:
+        SUMMARY.write(summaryLine)
+        count += 1
+        if CHATTY:
+            print "Batch: completed genome", count, "of", len(jobs), ":", summaryLine.split('\t')[0]
+    if pool is not None:
+        pool.close()
+        pool.join()
+    SUMMARY.close()
+    return count
+
+##### BEGIN MAIN
+
+if __name__ == "__main__":
+
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    workers = multiprocessing.cpu_count()
+    stream  = False
+    for option in options:
+        if option == "--stream":
+            stream = True
+        elif option.startswith("--workers=") and option[len("--workers="):].isdigit():
+            workers = max(1,int(option[len("--workers="):]))
+        else:
+            print "Unrecognized option:", option
+            print USAGE_STRING
+            exit(0)
+
+    if len(args) == 1 and re.search("help", args[0].lower()):
+        print HELP_STRING
+        exit(0)
+    if len(args) == 1 and re.search("input", args[0].lower()):
+        print INPUT_STRING
+        exit(0)
+    if len(args) != 2:
+        print USAGE_STRING
+        exit(0)
+
+    manifestFile, outDir = args
+    try:
+        MANIFEST = open(manifestFile,"r")
+    except IOError as e:
+        print "ERROR: cannot open manifest:", e
+        exit(1)
+    genomes = ReadManifest(MANIFEST)
+    MANIFEST.close()
+
+    RunBatch(genomes,outDir,workers,stream)
@@ -0,0 +1,564 @@
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_benchmark.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Benchmarks for the gene-call comparison code. Builds
+#    synthetic gene call sets in memory and times the code paths of
+#    interest, so that alternative implementations can be compared on
+#    identical input.
+#
+# Updates:
+#    16 Oct 2026: begin; sort benchmark (keyed sort vs. insertion sort)
+#    16 Oct 2026: memory benchmark (GeneCallTable vs. one GeneCall object per call)
+#    16 Oct 2026: comparison benchmark (Merge/Compare/IdentifyCommonCore time and memory; MergeAll)
+#    16 Oct 2026: parser benchmark (MB/s for each gene caller format)
+#    16 Oct 2026: benchmark suite (parse, load, sort, merge, compare, report) with JSON results;
+#                 generator options (--genes-per-contig, --callers, --agreement, --seed); generate command
+#    16 Oct 2026: sort benchmark: insertion sort timed at every size, up to --time-limit=SECONDS; beyond the
+#                 limit, its time is extrapolated from a quadratic fit of the sizes measured
+#
+# Programmer's Notes:
+#    Synthetic calls are generated contig by contig, with contigs in
+#    random order, as seen in metagenome assemblies: each contig is in
+#    coordinate order, but the set as a whole is not.
+#    The suite times every stage of a comparison, from the callers' raw outputs to the report:
+#        python CGC_benchmark.py suite [--json=FILE] [--callers=N] [--agreement=F] 10000 100000 1000000
+#    For each size it writes the reference calls in every supported output format (SUITE_FORMATS)
+#    and parses them in-process; writes each synthetic caller's calls as a normalized file, with
+#    contigs in random order, and loads and sorts it; then merges, compares and reports. Results are
+#    printed, and with --json=FILE saved along with the commit, Python version and generator
+#    settings, so that runs can be compared across commits. The generate command writes the same
+#    synthetic files to --outdir=DIR, as test data.
+#    The sort benchmark times the original insertion sort at every size, but stops it at the time
+#    limit (--time-limit=SECONDS, default INSERTION_TIME_LIMIT): on contig-ordered input it takes about
+#    20 s at 10,000 calls, so at 100,000 and 1,000,000 calls it would run for hours or days. A stopped
+#    sort is reported as the limit, with an estimate extrapolated from time = c * n^2, fitted (least
+#    squares) to the sizes that finished, or to CALIBRATION_SIZE calls if none did.
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+import random
+import signal
+import resource
+import json
+import CGC_geneCall
+import CGC_compare
+import CGC_parser
+
+##### CONSTANTS
+
+CODE_FILE = "CGC_benchmark.py"
+
+DEFAULT_SIZES      = (10000, 100000, 1000000)
+INSERTION_TIME_LIMIT = 300.0  # seconds: an insertion sort still running then is stopped (see TimeSortLimited())
+CALIBRATION_SIZE   = 2000    # calls sorted to fit the insertion sort's quadratic cost when no size finished in time
+GENES_PER_CONTIG   = 1000
+RANDOM_SEED        = 2016
+CALLER_COUNT       = 4
+AGREEMENT_RATE     = 0.7     # fraction of a caller's calls that are identical to the reference call
+
+PARSER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),"CGC_parser.py")
+PARSE_FORMATS = ("genemark","glimmer","prodigal","rast","phate")  # as configured by default in CGC_parser.py
+
+# Output formats written and parsed by the suite: (format, gene caller, CGC_parser settings for the format)
+SUITE_FORMATS = (
+    ("genemark",     "genemark", {}),
+    ("glimmer3",     "glimmer",  {'GLIMMER3':True}),
+    ("glimmer2",     "glimmer",  {'GLIMMER3':False}),
+    ("prodigal_sco", "prodigal", {'PRODIGAL_sco':True,  'PRODIGAL_gff':False}),
+    ("prodigal_gff", "prodigal", {'PRODIGAL_sco':False, 'PRODIGAL_gff':True}),
+    ("rast_gff3",    "rast",     {'RAST_GFF3':True}),
+    ("phate",        "phate",    {}),
+    )
+SUITE_CALLERS  = ("genemark","glimmer","prodigal","rast","phate")  # synthetic callers are named after these
+SUITE_VERSION  = 1
+GENERATE_DIR   = "CGC_benchmark.data"
+
+BENCHMARKS = ("sort","memory","compare","parse","suite","generate")
+
+USAGE_STRING = "Usage:  python " + CODE_FILE + " sort|memory|compare|parse|suite|generate [--json=FILE] [--outdir=DIR] [--genes-per-contig=N] [--callers=N] [--agreement=F] [--seed=N] [--time-limit=SECONDS] [size1 size2 ...]\n"
+
+##### FUNCTIONS
+
+# Create a GeneCallSet of n synthetic calls, contig by contig, with contigs in random order
+def MakeGeneCallSet(n,geneCaller="prodigal",seed=RANDOM_SEED):
+    rng = random.Random(seed)
+    callSet = CGC_geneCall.GeneCallSet()
+    callSet.geneCaller = geneCaller
+    contigCount = max(1, (n + GENES_PER_CONTIG - 1) / GENES_PER_CONTIG)
+    contigs = ["contig_" + str(i) for i in xrange(0,contigCount)]
+    rng.shuffle(contigs)
+    geneNumber = 0
+    for contig in contigs:
+        position = 1
+        for i in xrange(0,GENES_PER_CONTIG):
+            if geneNumber >= n:
+                break
+            geneNumber += 1
+            position += rng.randint(0,100)
+            length   = 3 * rng.randint(30,600)
+            strand   = rng.choice('+-')
+            callSet.geneCallList.AppendRow(geneNumber,strand,position,position + length - 1,length,contig,geneCaller)
+            position += length
+    callSet.UpdateGeneCount()
+    return callSet
+
+# Derive callerCount sorted call sets from one reference set of n calls: each caller reproduces a
+# reference call exactly with probability agreement; otherwise it shifts the start or omits the call
+# Callers are named "caller1", "caller2", ..., unless named in callerNames
+def MakeCallerSets(n,callerCount=CALLER_COUNT,agreement=AGREEMENT_RATE,seed=RANDOM_SEED,callerNames=None):
+    rng = random.Random(seed)
+    reference = MakeGeneCallSet(n,"reference",seed)
+    reference.SortGeneCalls()
+    table = reference.geneCallList
+    callSets = []
+    for callerNumber in xrange(0,callerCount):
+        if callerNames:
+            geneCaller = callerNames[callerNumber]
+        else:
+            geneCaller = "caller" + str(callerNumber + 1)
+        callSet = CGC_geneCall.GeneCallSet()
+        callSet.geneCaller = geneCaller
+        for i in xrange(0,len(table)):
+            leftEnd = table.leftEnd[i]; rightEnd = table.rightEnd[i]; draw = rng.random()
+            if draw >= agreement:
+                if draw < agreement + (1.0 - agreement) / 2:
+                    continue  # call omitted by this caller
+                if table.strand[i] == '+':
+                    leftEnd += 3
+                else:
+                    rightEnd -= 3
+            callSet.geneCallList.AppendRow(table.geneNumber[i],table.strand[i],leftEnd,rightEnd,
+                                           rightEnd - leftEnd + 1,table.contigNames[table.contigId[i]],geneCaller)
+        callSet.UpdateGeneCount()
+        callSet.SortGeneCalls()
+        callSets.append(callSet)
+    return callSets
+
+# Checksum of a table's columns, to verify that a comparison leaves the callers' data unchanged
+def GetTableChecksum(table):
+    return hash(tuple([column.tostring() for column in (table.geneNumber,table.strand,table.leftEnd,
+                       table.rightEnd,table.geneLength,table.callerId,table.contigId)]))
+
+# Peak resident set size of this process, in MB (ru_maxrss is in KB on Linux)
+def GetPeakRSS():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+# Time a single sort of a fresh copy of callSet's table
+def TimeSort(callSet,mode):
+    callSet.geneCallList = callSet.geneCallList.Copy()
+    start = time.time()
+    callSet.SortGeneCalls(mode)
+    return time.time() - start
+
+class TimeLimitExceeded(Exception):
+    pass
+
+def RaiseTimeLimit(signalNumber,frame):
+    raise TimeLimitExceeded()
+
+# Time a single sort of a fresh copy of callSet's table, as TimeSort() does; returns None if the sort is
+# stopped at timeLimit seconds
+def TimeSortLimited(callSet,mode,timeLimit):
+    handler = signal.signal(signal.SIGALRM,RaiseTimeLimit)
+    signal.setitimer(signal.ITIMER_REAL,timeLimit)
+    try:
+        return TimeSort(callSet,mode)
+    except TimeLimitExceeded:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL,0)
+        signal.signal(signal.SIGALRM,handler)
+
+# Least-squares fit of time = c * n^2 to (n, seconds) points; returns c
+def FitQuadratic(points):
+    return sum([seconds * n * n for n, seconds in points]) / float(sum([float(n) ** 4 for n, seconds in points]))
+
+def BenchmarkSort(sizes,timeLimit=INSERTION_TIME_LIMIT):
+    print "size\tkeyed(s)\tkeyed_presorted(s)\tinsertion(s)"
+    measured = []  # (size, seconds) of the insertion sorts that finished
+    for size in sorted(sizes):
+        callSet = MakeGeneCallSet(size)
+        original = callSet.geneCallList
+        keyedTime = TimeSort(callSet,CGC_geneCall.SORT_KEYED)
+        presortedTime = TimeSort(callSet,CGC_geneCall.SORT_KEYED)  # list is now sorted: exercises IsSorted()
+        callSet.geneCallList = original
+        seconds = TimeSortLimited(callSet,CGC_geneCall.SORT_INSERTION,timeLimit)
+        if seconds is not None:
+            measured.append((size,seconds))
+            insertionTime = "%.3f" % seconds
+        else:
+            if not measured:
+                calibration = MakeGeneCallSet(CALIBRATION_SIZE)
+                measured.append((CALIBRATION_SIZE,TimeSort(calibration,CGC_geneCall.SORT_INSERTION)))
+            insertionTime = ">%.0f (time limit); %.0f extrapolated" % (timeLimit,FitQuadratic(measured) * size * size)
+        print "%d\t%.3f\t%.3f\t%s" % (size,keyedTime,presortedTime,insertionTime)
+    return
+
+# Bytes held by a GeneCall object with string fields, as built by the original GeneCallSet.GetGeneCalls()
+def GetObjectBytes(geneCall):
+    byteSize = sys.getsizeof(geneCall) + sys.getsizeof(geneCall.__dict__)
+    for value in geneCall.__dict__.values():
+        byteSize += sys.getsizeof(str(value))
+    return byteSize
+
+def BenchmarkMemory(sizes):
+    print "size\ttable(bytes/call)\tobjects(bytes/call)"
+    for size in sizes:
+        callSet = MakeGeneCallSet(size)
+        table = callSet.geneCallList
+        sample = min(len(table),1000)
+        objectBytes = sum([GetObjectBytes(table[i]) for i in xrange(0,sample)]) / float(sample)
+        print "%d\t%.1f\t%.1f" % (size,table.GetByteSize() / float(len(table)),objectBytes)
+    return
+
+# Write callSet in the raw output format of a gene caller, as read by CGC_parser.py; geneCaller is one of
+# PARSE_FORMATS (glimmer3 and Prodigal sco), or a format of SUITE_FORMATS
+def WriteCallerOutput(callSet,geneCaller,OUT):
+    table = callSet.geneCallList
+    contig = None
+    if geneCaller == "glimmer3":
+        geneCaller = "glimmer"
+    elif geneCaller == "prodigal_sco":
+        geneCaller = "prodigal"
+    elif geneCaller == "rast_gff3":
+        geneCaller = "rast"
+    elif geneCaller == "prodigal_gff":
+        OUT.write("##gff-version  3\n")
+    for i in xrange(0,len(table)):
+        call = table.GetCall(i)
+        if call.contig != contig:
+            contig = call.contig
+            if geneCaller == "genemark":
+                OUT.write("FASTA definition line: %s length=%d\n" % (contig,1000000))
+            elif geneCaller == "glimmer":
+                OUT.write(">%s length=%d numreads=%d\n" % (contig,1000000,10))
+            elif geneCaller in ("prodigal","prodigal_gff"):
+                OUT.write("# Sequence Data: seqnum=1;seqlen=%d;seqhdr=\"%s\"\n" % (1000000,contig))
+            elif geneCaller == "phate":
+                OUT.write(">%s\n" % (contig))
+        if call.strand == '+':
+            start = call.leftEnd; stop = call.rightEnd
+        else:
+            start = call.rightEnd; stop = call.leftEnd
+        if geneCaller == "genemark":
+            OUT.write("  %5d   %s %9d %9d %9d  1\n" % (call.geneNumber,call.strand,call.leftEnd,call.rightEnd,call.geneLength))
+        elif geneCaller == "glimmer":
+            OUT.write("orf%05d %8d %8d  %s1 %8.2f\n" % (call.geneNumber,start,stop,call.strand,5.0))
+        elif geneCaller == "glimmer2":  # Glimmer2 coordinates exclude the stop codon
+            if call.strand == '+':
+                stop -= 3
+            else:
+                stop += 3
+            OUT.write(" %5d %8d %8d  [%s1 L=%4d r=-1.234]\n" % (call.geneNumber,start,stop,call.strand,call.geneLength))
+        elif geneCaller == "prodigal":
+            OUT.write(">%d_%d_%d_%s\n" % (call.geneNumber,call.leftEnd,call.rightEnd,call.strand))
+        elif geneCaller == "prodigal_gff":
+            OUT.write("%s\tProdigal_v2.6.3\tCDS\t%d\t%d\t%.1f\t%s\t0\tID=1_%d;partial=00\n" % (contig,call.leftEnd,call.rightEnd,
+                      50.0,call.strand,call.geneNumber))
+        elif geneCaller == "rast":
+            OUT.write("%s\tFIG\tCDS\t%d\t%d\t.\t%s\t0\tID=fig|peg.%d\n" % (contig,call.leftEnd,call.rightEnd,call.strand,call.geneNumber))
+        else:  # phate
+            OUT.write("%d\t%d\t%s\n" % (start,stop,call.strand))
+    return
+
+# Parser throughput, in MB of caller output per second, for each format; the parser is run as a
+# separate process (as a user would run it) in a scratch directory, since it writes its log there
+def BenchmarkParse(sizes):
+    print "size\tformat\tMB\tparse(s)\tMB/s"
+    scratch = tempfile.mkdtemp(prefix="CGC_benchmark.")
+    try:
+        for size in sizes:
+            callSet = MakeGeneCallSet(size)
+            callSet.SortGeneCalls()
+            for geneCaller in PARSE_FORMATS:
+                inFile = os.path.join(scratch,geneCaller + ".raw")
+                RAW = open(inFile,"w")
+                WriteCallerOutput(callSet,geneCaller,RAW)
+                RAW.close()
+                megabytes = os.path.getsize(inFile) / 1048576.0
+                start = time.time()
+                subprocess.check_call([sys.executable,PARSER_FILE,geneCaller,inFile],cwd=scratch)
+                parseTime = time.time() - start
+                print "%d\t%s\t%.1f\t%.3f\t%.1f" % (size,geneCaller,megabytes,parseTime,megabytes / parseTime)
+    finally:
+        shutil.rmtree(scratch)
+    return
+
+def BenchmarkCompare(sizes):
+    print "size\tcalls\tmerge(s)\tcompare(s)\tmergeAll+compare(s)\tcommonCore(s)\tgroups\tbytes/call\tpeakRSS(MB)\tunchanged"
+    for size in sizes:
+        callSets = MakeCallerSets(size)
+        checksums = [GetTableChecksum(callSet.geneCallList) for callSet in callSets]
+        comparison = CGC_compare.Comparison()
+        start = time.time()
+        for callSet in callSets:
+            comparison.Merge(callSet.geneCallList)
+        mergeTime = time.time() - start
+        start = time.time()
+        comparison.Compare()
+        compareTime = time.time() - start
+        start = time.time()
+        singlePass = CGC_compare.Comparison()
+        singlePass.Compare(singlePass.MergeAll([callSet.geneCallList for callSet in callSets]))
+        mergeAllTime = time.time() - start
+        start = time.time()
+        comparison.IdentifyCommonCore()
+        coreTime = time.time() - start
+        callCount = len(comparison.mergeList)
+        refBytes = comparison.mergeList.tableIndex.itemsize * callCount + comparison.mergeList.row.itemsize * callCount \
+                 + comparison.uniqueList.starts.itemsize * len(comparison.uniqueList)
+        unchanged = checksums == [GetTableChecksum(callSet.geneCallList) for callSet in callSets]
+        print "%d\t%d\t%.3f\t%.3f\t%.3f\t%.3f\t%d\t%.1f\t%.1f\t%s" % (size,callCount,mergeTime,compareTime,mergeAllTime,coreTime,
+              len(comparison.uniqueList),refBytes / float(callCount),GetPeakRSS(),unchanged)
+    return
+
+##### SUITE
+
+# Commit of the code being measured, or None if not run from a git working tree
+def GetCommit():
+    try:
+        commit = subprocess.check_output(["git","rev-parse","HEAD"],cwd=os.path.dirname(os.path.abspath(__file__)),
+                                         stderr=open(os.devnull,"w"))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit.strip()
+
+# Names for callerCount synthetic callers that CGC_geneCall recognizes: genemark, glimmer, ..., genemark2, ...
+def GetSuiteCallers(callerCount):
+    names = []
+    for i in xrange(0,callerCount):
+        name = SUITE_CALLERS[i % len(SUITE_CALLERS)]
+        if i >= len(SUITE_CALLERS):
+            name += str(i / len(SUITE_CALLERS) + 1)
+        names.append(name)
+    return names
+
+# Set CGC_parser's configuration for a format (see SUITE_FORMATS); returns the settings replaced
+def SetParserOptions(settings):
+    previous = {}
+    for name, value in settings.items():
+        previous[name] = getattr(CGC_parser,name)
+        setattr(CGC_parser,name,value)
+    return previous
+
+# Yield a sorted table's calls as CGC_parser tuples, contig by contig, with the contigs in random order
+def IterShuffledCalls(table,rng):
+    blocks = []
+    start = 0
+    while start < len(table):
+        end = start + 1
+        while end < len(table) and table.contigId[end] == table.contigId[start]:
+            end += 1
+        blocks.append((start,end))
+        start = end
+    rng.shuffle(blocks)
+    for start, end in blocks:
+        for i in xrange(start,end):
+            yield (table.geneNumber[i],table.strand[i],table.leftEnd[i],table.rightEnd[i],table.geneLength[i],
+                   table.contigNames[table.contigId[i]])
+    return
+
+# Write the synthetic files for one size to outDir: the reference calls in every format of SUITE_FORMATS,
+# and each synthetic caller's calls as a normalized file. Returns (reference set, caller sets, format files,
+# caller files), where format files are (format, gene caller, parser settings, path) and caller files are paths
+def WriteSuiteFiles(size,outDir):
+    reference = MakeGeneCallSet(size,"reference")
+    reference.SortGeneCalls()
+    callSets = MakeCallerSets(size,CALLER_COUNT,AGREEMENT_RATE,RANDOM_SEED,GetSuiteCallers(CALLER_COUNT))
+    formatFiles = []
+    for outFormat, geneCaller, settings in SUITE_FORMATS:
+        path = os.path.join(outDir,"%d.%s.raw" % (size,outFormat))
+        OUT = open(path,"w")
+        WriteCallerOutput(reference,outFormat,OUT)
+        OUT.close()
+        formatFiles.append((outFormat,geneCaller,settings,path))
+    rng = random.Random(RANDOM_SEED)
+    callerFiles = []
+    for callSet in callSets:
+        path = os.path.join(outDir,"%d.%s%s" % (size,callSet.geneCaller,CGC_parser.OUT_SUFFIX))
+        OUT = open(path,"w")
+        CGC_parser.WriteCalls(callSet.geneCaller,"synthetic",IterShuffledCalls(callSet.geneCallList,rng),[OUT])
+        OUT.close()
+        callerFiles.append(path)
+    return reference, callSets, formatFiles, callerFiles
+
+# Time a stage of the suite: fn(*args) is called once; returns (seconds, fn's result)
+def TimeStage(fn,*args):
+    start = time.time()
+    result = fn(*args)
+    return time.time() - start, result
+
+def CountParsed(geneCaller,path):
+    count = 0
+    for call in CGC_parser.Parse(geneCaller,path):
+        count += 1
+    return count
+
+def LoadCallerFile(path):
+    callSet = CGC_geneCall.GeneCallSet()
+    INFILE = open(path,"r")
+    callSet.AddGeneCalls(INFILE)
+    INFILE.close()
+    return callSet
+
+# Merge and compare as CGC_main.py does (one k-way merge); the pairwise Merge() is timed separately
+def CompareAll(tables):
+    comparison = CGC_compare.Comparison()
+    comparison.Compare(comparison.MergeAll(tables))
+    return comparison
+
+def MergePairwise(tables):
+    comparison = CGC_compare.Comparison()
+    for table in tables:
+        comparison.Merge(table)
+    return comparison
+
+def PrintReport(comparison):
+    NULL = open(os.devnull,"w")
+    comparison.PrintReport(NULL)
+    NULL.close()
+    return
+
+# Run every stage of the suite for each size; returns the list of results, one dict per stage (and format,
+# or caller). The files are written to a scratch directory, removed afterwards
+def BenchmarkSuite(sizes):
+    results = []
+    def Record(size,stage,name,calls,seconds,megabytes=None):
+        result = {'size':size, 'stage':stage, 'name':name, 'calls':calls, 'seconds':round(seconds,6),
+                  'callsPerSecond':round(calls / max(seconds,1e-9),1), 'peakRSS_MB':round(GetPeakRSS(),1)}
+        if megabytes is not None:
+            result['megabytes'] = round(megabytes,3)
+            result['MBps'] = round(megabytes / max(seconds,1e-9),2)
+        results.append(result)
+        print "%d\t%s\t%s\t%d\t%.3f\t%.0f\t%s" % (size,stage,name,calls,seconds,result['callsPerSecond'],
+                                                 result.get('MBps',''))
+        sys.stdout.flush()
+        return
+    print "size\tstage\tname\tcalls\tseconds\tcalls/s\tMB/s"
+    scratch = tempfile.mkdtemp(prefix="CGC_benchmark.")
+    try:
+        for size in sizes:
+            reference, callSets, formatFiles, callerFiles = WriteSuiteFiles(size,scratch)
+            del reference, callSets
+            for outFormat, geneCaller, settings, path in formatFiles:
+                previous = SetParserOptions(settings)
+                try:
+                    seconds, calls = TimeStage(CountParsed,geneCaller,path)
+                finally:
+                    SetParserOptions(previous)
+                Record(size,"parse",outFormat,calls,seconds,os.path.getsize(path) / 1048576.0)
+                os.remove(path)
+            loaded = []
+            for path in callerFiles:
+                seconds, callSet = TimeStage(LoadCallerFile,path)
+                Record(size,"load",callSet.geneCaller,len(callSet.geneCallList),seconds,os.path.getsize(path) / 1048576.0)
+                seconds, unused = TimeStage(callSet.SortGeneCalls)
+                Record(size,"sort",callSet.geneCaller,len(callSet.geneCallList),seconds)
+                loaded.append(callSet)
+                os.remove(path)
+            tables = [callSet.geneCallList for callSet in loaded]
+            seconds, merged = TimeStage(MergePairwise,tables)
+            Record(size,"merge","pairwise",len(merged.mergeList),seconds)
+            seconds, unused = TimeStage(merged.Compare)
+            Record(size,"compare","pairwise",len(merged.mergeList),seconds)
+            del merged
+            seconds, comparison = TimeStage(CompareAll,tables)
+            Record(size,"compare","mergeAll",len(comparison.mergeList),seconds)
+            seconds, unused = TimeStage(comparison.IdentifyCommonCore)
+            Record(size,"commonCore","",len(comparison.commonCore),seconds)
+            seconds, unused = TimeStage(PrintReport,comparison)
+            Record(size,"report","tsv",len(comparison.uniqueList),seconds)
+            del comparison, loaded, tables
+    finally:
+        shutil.rmtree(scratch)
+    return results
+
+# Save suite results, with what is needed to compare them with another run's
+def WriteSuiteJSON(results,OUT):
+    suite = {'version':SUITE_VERSION, 'commit':GetCommit(), 'python':sys.version.split()[0],
+             'time':time.strftime("%Y-%m-%dT%H:%M:%S"),
+             'generator':{'genesPerContig':GENES_PER_CONTIG, 'callers':CALLER_COUNT, 'agreement':AGREEMENT_RATE,
+                          'seed':RANDOM_SEED},
+             'results':results}
+    json.dump(suite,OUT,indent=1,sort_keys=True)
+    OUT.write("\n")
+    return
+
+# Write the suite's synthetic files for each size to outDir, for use as test data
+def GenerateFiles(sizes,outDir):
+    if not os.path.isdir(outDir):
+        os.makedirs(outDir)
+    for size in sizes:
+        reference, callSets, formatFiles, callerFiles = WriteSuiteFiles(size,outDir)
+        for outFormat, geneCaller, settings, path in formatFiles:
+            print path
+        for path in callerFiles:
+            print path
+    return
+
+##### BEGIN MAIN
+
+if __name__ == "__main__":
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if len(args) < 1 or args[0].lower() not in BENCHMARKS:
+        print USAGE_STRING
+        exit(0)
+    jsonFile = ""; outDir = GENERATE_DIR; timeLimit = INSERTION_TIME_LIMIT
+    for option in options:
+        name, equals, value = option.partition('=')
+        try:
+            if name == "--json" and value != "":
+                jsonFile = value
+            elif name == "--outdir" and value != "":
+                outDir = value
+            elif name == "--genes-per-contig" and int(value) > 0:
+                GENES_PER_CONTIG = int(value)
+            elif name == "--callers" and int(value) > 0:
+                CALLER_COUNT = int(value)
+            elif name == "--agreement" and 0.0 <= float(value) <= 1.0:
+                AGREEMENT_RATE = float(value)
+            elif name == "--seed":
+                RANDOM_SEED = int(value)
+            elif name == "--time-limit" and float(value) > 0.0:
+                timeLimit = float(value)
+            else:
+                raise ValueError(option)
+        except ValueError:
+            print "Unrecognized option:", option
+            print USAGE_STRING
+            exit(0)
+    sizes = DEFAULT_SIZES
+    if len(args) > 1:
+        sizes = [int(size) for size in args[1:]]
+    benchmark = args[0].lower()
+    if benchmark == "sort":
+        BenchmarkSort(sizes,timeLimit)
+    elif benchmark == "memory":
+        BenchmarkMemory(sizes)
+    elif benchmark == "parse":
+        BenchmarkParse(sizes)
+    elif benchmark == "suite":
+        results = BenchmarkSuite(sizes)
+        if jsonFile:
+            OUT = open(jsonFile,"w")
+            WriteSuiteJSON(results,OUT)
+            OUT.close()
+    elif benchmark == "generate":
+        GenerateFiles(sizes,outDir)
+    else:
+        BenchmarkCompare(sizes)
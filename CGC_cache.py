@@ -0,0 +1,142 @@
+###################################################################################################
+#
+# Module:  CGC_cache.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module containing an on-disk cache of loaded and sorted gene call sets, so that
+#    repeated comparisons over the same inputs (e.g., with different subsets of callers) read
+#    each input once. Entries are keyed by a hash of the input file's content and of the version
+#    of the code that reads it; the cache is bounded in size, evicting least recently used entries.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: Store() skips the store, rather than failing, if the cache directory is missing or cannot be written
+#
+# Programmer's Notes:
+#    Each entry is a directory, <cache dir>/<key>/, holding one binary call file per call set
+#    (0.cgb, 1.cgb, ...; see CGC_geneCall.py), written sorted so that a hit needs neither parsing
+#    nor sorting. An entry is written to a temporary directory, then renamed, so that processes
+#    sharing a cache never see a partial entry. The modification time of an entry's directory
+#    is updated on each hit, and eviction removes the entries with the oldest times first.
+#
+# Classes and Methods:
+#    CallSetCache(cacheDir,maxBytes)
+#        GetKey(fileName,geneCaller)
+#        Load(key)
+#        Store(key,callSets)
+#        Evict()
+#        GetEntrySize(entryDir)
+#        GetSummary()
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import shutil
+import hashlib
+import tempfile
+import CGC_geneCall
+import CGC_parser
+
+##### CONSTANTS
+
+CACHE_VERSION     = 1    # increase whenever the layout of cache entries changes
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+HASH_BLOCK_SIZE   = 1024 * 1024
+
+class CallSetCache(object):
+
+    def __init__(self,cacheDir,maxBytes=DEFAULT_MAX_BYTES):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.hits     = 0
+        self.misses   = 0
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+
+    # Key for the call sets read from fileName: a normalized call file, or, if geneCaller is given,
+    # that caller's raw output. The key covers the file's content and the versions of the code
+    # (and parser settings) that read it, so that a change to either makes a new entry
+    def GetKey(self,fileName,geneCaller=None):
+        digest = hashlib.sha1()
+        digest.update("%s %s %s\n" % (CACHE_VERSION,CGC_geneCall.BINARY_VERSION,CGC_parser.PARSER_VERSION))
+        if geneCaller is not None:
+            digest.update("raw %s %s %s %s %s\n" % (geneCaller,CGC_parser.GLIMMER3,CGC_parser.PRODIGAL_sco,
+                                                    CGC_parser.PRODIGAL_gff,CGC_parser.RAST_GFF3))
+        INFILE = open(fileName,"rb")
+        block = INFILE.read(HASH_BLOCK_SIZE)
+        while block:
+            digest.update(block)
+            block = INFILE.read(HASH_BLOCK_SIZE)
+        INFILE.close()
+        return digest.hexdigest()
+
+    # Return the list of call sets stored under key, or None if there is no such entry
+    def Load(self,key):
+        entryDir = os.path.join(self.cacheDir,key)
+        try:
+            fileNames = sorted([fileName for fileName in os.listdir(entryDir) if fileName.endswith(CGC_geneCall.BINARY_SUFFIX)],
+                               key=lambda fileName: int(fileName[:-len(CGC_geneCall.BINARY_SUFFIX)]))
+            callSets = [CGC_geneCall.ReadBinaryGeneCallSet(os.path.join(entryDir,fileName)) for fileName in fileNames]
+            os.utime(entryDir,None)  # most recently used
+        except (IOError, OSError, ValueError):  # no entry, or removed by another process meanwhile
+            self.misses += 1
+            return None
+        self.hits += 1
+        return callSets
+
+    # Store call sets under key; each set is sorted first, if it is not already
+    # Returns False if the call sets cannot be stored (e.g., a set holds more than one caller's calls)
+    def Store(self,key,callSets):
+        tempDir = None
+        try:
+            tempDir = tempfile.mkdtemp(prefix=".tmp.",dir=self.cacheDir)
+            for index, callSet in enumerate(callSets):
+                callSet.SortGeneCalls()
+                OUT = open(os.path.join(tempDir,str(index) + CGC_geneCall.BINARY_SUFFIX),"wb")
+                try:
+                    callSet.WriteBinary(OUT)
+                finally:
+                    OUT.close()
+            os.rename(tempDir,os.path.join(self.cacheDir,key))
+        except (IOError, OSError, ValueError):  # includes an entry stored by another process meanwhile, and a cache
+            if tempDir is not None:             # directory that is missing or cannot be written: the store is skipped
+                shutil.rmtree(tempDir,ignore_errors=True)
+            return False
+        self.Evict()
+        return True
+
+    # Remove least recently used entries until the cache holds at most maxBytes
+    def Evict(self):
+        entries = []
+        totalBytes = 0
+        try:
+            keys = os.listdir(self.cacheDir)
+        except OSError:  # cache directory removed meanwhile
+            return
+        for key in keys:
+            entryDir = os.path.join(self.cacheDir,key)
+            if key.startswith(".tmp.") or not os.path.isdir(entryDir):
+                continue
+            try:
+                entrySize = self.GetEntrySize(entryDir)
+                entries.append((os.path.getmtime(entryDir),entrySize,entryDir))
+            except OSError:
+                continue
+            totalBytes += entrySize
+        entries.sort()
+        for lastUsed, entrySize, entryDir in entries:
+            if totalBytes <= self.maxBytes:
+                break
+            shutil.rmtree(entryDir,ignore_errors=True)
+            totalBytes -= entrySize
+        return
+
+    def GetEntrySize(self,entryDir):
+        return sum([os.path.getsize(os.path.join(entryDir,fileName)) for fileName in os.listdir(entryDir)])
+
+    def GetSummary(self):
+        return "Cache %s: %d hits, %d misses" % (self.cacheDir,self.hits,self.misses)
@@ -9,52 +9,207 @@
 #
 # Updates:
 #    Begin 3 June 2016
+#    16 Oct 2026: mergeList and uniqueList refer to rows of the callers' tables instead of deep copies
+#    16 Oct 2026: MergeAll() merges all callers in a single k-way pass, consumed directly by Compare()
+#    16 Oct 2026: CompareStreams() compares sorted call files with bounded memory
+#    16 Oct 2026: calls on different contigs never match; CompareByContig() runs contigs in a process pool
+#    16 Oct 2026: same-stop and reciprocal-overlap match modes (Comparison.matchMode)
+#    16 Oct 2026: caller subsets: bitmask per unique gene call, counts of every caller combination,
+#                 pairwise Jaccard/agreement matrices and UpSet-ready tables
+#    16 Oct 2026: caller statistics gathered in one pass (CGC_stats.py; Comparison.stats)
+#    16 Oct 2026: grid written by CGC_grid.GridWriter: batched, TSV/CSV/long formats (Comparison.gridFormat)
+#    16 Oct 2026: AddCaller() and RemoveCaller() update a completed comparison (see also CGC_state.py)
+#    16 Oct 2026: CompareByContig() may reuse a worker pool kept open by its caller (see CGC_server.py)
+#    16 Oct 2026: comparison backends: NewComparison() returns a Comparison, or a numpy VectorComparison (CGC_vector.py)
+#    16 Oct 2026: Comparison.error: why a comparison was refused or stopped (see CGC_main.RunComparison())
+#    16 Oct 2026: grid rows are layered (several lines per row) only when matching is not exact
+#    16 Oct 2026: CompareStreams() keeps per-caller statistics only (no per-contig statistics)
+#    16 Oct 2026: multiprocessing imported only when CompareByContig() starts a pool of its own
 #
 # Programmer's Notes:
 #
 # Classes and Methods:
+#    GeneCallRefList(tables)
+#        Append(tableIndex,row)
+#        GetKey(index)
+#        GetCaller(index)
+#    GeneCallGroupList(refs)
+#        AppendGroup(start)
+#        GetGroupSize(index)
+#        GetGroupCallerCount(index)
 #    Comparison
 #        IdentifyCallers()
 #        IdentifyCommonCore()
 #        IsLesser(gene1,gene2)
+#        GetTable(nextGeneSet)
+#        AddCallSet(nextGeneSet)
 #        Merge(nextGeneSet)
-#        Compare()
+#        MergeAll(geneSets)
+#        IterMerged(firstIndex)
+#        Compare(mergeStream)
+#        GroupMatches()
+#        Extend(other)
+#        AddCaller(nextGeneSet)
+#        RemoveCaller(geneCaller)
+#        Recompare()
 #        PrintMergeList()
 #        PrintUniqueList()
 #        PrintCommonCore()
 #        PrintCallerList()
-#        PrintGenecallGrid()
-#        PrintReport()
-#        PrintStats()
+#        PrintGenecallGrid(OUT)
+#        PrintReport(OUT)
+#        PrintStats(OUT)
+#        PrintStatsForGrid(OUT,counts)
+#        GatherStats()
+#        PrintStatsSummary(distinctCount,commonCount,loneCallCount,OUT)
+#        CompareStreams(streams,OUT)
+#        CloseStreamGroup(writer,group,counts,callerBits)
+#        IdentifySubsets()
+#        GetCallerBits()
+#        GetPairwiseCounts()
+#        PrintSubsetCounts(OUT)
+#        PrintSubsetMembership(OUT)
+#        PrintPairwiseMatrix(OUT,measure)
 #        PrintAll()
 #        PrintAll_verbose()
+#    NewComparison(backend)
+#    CompareContig(job)
+#    CompareByContig(callSets,workers,matchMode,minOverlap,pool,backend)
 #
 ###################################################################################################
 
 # This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
 # THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
 
+import sys
 import re
-import copy
+import array
+import heapq
+from itertools import izip
+from cStringIO import StringIO
 import CGC_geneCall
+import CGC_interval
+import CGC_stats
+import CGC_grid
 
 p_comment   = re.compile('^#')
 
+##### MATCH MODES (see Comparison.matchMode)
+
+MATCH_EXACT         = 'exact'      # same contig, strand, leftEnd and rightEnd
+MATCH_SAME_STOP     = 'same-stop'  # same contig, strand and stop position; starts may differ
+MATCH_OVERLAP       = 'overlap'    # same contig and strand; overlap >= minOverlap of both calls' lengths
+MATCH_MODES         = (MATCH_EXACT, MATCH_SAME_STOP, MATCH_OVERLAP)
+DEFAULT_MIN_OVERLAP = 0.8
+
+##### BACKENDS (see NewComparison())
+
+BACKEND_PYTHON = 'python'  # Comparison: calls are merged and grouped one at a time
+BACKEND_NUMPY  = 'numpy'   # CGC_vector.VectorComparison: calls are merged and grouped as numpy arrays
+BACKENDS       = (BACKEND_PYTHON, BACKEND_NUMPY)
+
+##### CALLER SUBSETS (see Comparison.IdentifySubsets())
+
+SUBSET_MAX_CALLERS = 8 * array.array('L').itemsize  # one bit per caller in each unique gene call's mask
+MEASURE_JACCARD    = 'jaccard'    # calls made by both callers / calls made by either
+MEASURE_AGREEMENT  = 'agreement'  # calls made by both callers / calls made by the row's caller
+
+# Ordered references to rows of the callers' GeneCallTables, held as (table index, row) pairs
+# Indexing or iterating returns read-only GeneCall views; no gene call data is copied
+class GeneCallRefList(object):
+
+    def __init__(self,tables):
+        self.tables     = tables            # list of GeneCallTables, shared with the owning Comparison
+        self.tableIndex = array.array('i')  # index into self.tables
+        self.row        = array.array('i')  # row within that table
+
+    def __len__(self):
+        return len(self.row)
+
+    def __getitem__(self,index):
+        return self.tables[self.tableIndex[index]].GetCall(self.row[index])
+
+    def __iter__(self):
+        for index in xrange(0,len(self.row)):
+            yield self.tables[self.tableIndex[index]].GetCall(self.row[index])
+
+    def Append(self,tableIndex,row):
+        self.tableIndex.append(tableIndex)
+        self.row.append(row)
+        return
+
+    def GetKey(self,index):
+        return self.tables[self.tableIndex[index]].GetKey(self.row[index])
+
+    def GetCaller(self,index):
+        table = self.tables[self.tableIndex[index]]
+        return table.callerNames[table.callerId[self.row[index]]]
+
+# Groups of identical gene calls: each group is a run of consecutive entries in a GeneCallRefList,
+# recorded by its start offset. Indexing returns the group's GeneCall views as a list
+class GeneCallGroupList(object):
+
+    def __init__(self,refs):
+        self.refs   = refs              # GeneCallRefList, shared with the owning Comparison
+        self.starts = array.array('i')  # offset of each group's first entry in self.refs
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self,index):
+        if index < 0:
+            index += len(self.starts)
+        start = self.starts[index]
+        if index + 1 < len(self.starts):
+            end = self.starts[index + 1]
+        else:
+            end = len(self.refs)
+        return [self.refs[i] for i in xrange(start,end)]
+
+    def __iter__(self):
+        for index in xrange(0,len(self.starts)):
+            yield self[index]
+
+    def AppendGroup(self,start):
+        self.starts.append(start)
+        return
+
+    # Number of gene calls in group index, without building its GeneCall views
+    def GetGroupSize(self,index):
+        if index + 1 < len(self.starts):
+            return self.starts[index + 1] - self.starts[index]
+        return len(self.refs) - self.starts[index]
+
+    # Number of distinct callers among the gene calls of group index
+    def GetGroupCallerCount(self,index):
+        start = self.starts[index]
+        end   = start + self.GetGroupSize(index)
+        return len(set([self.refs.GetCaller(i) for i in xrange(start,end)]))
+
 class Comparison(object):
     
     def __init__(self):
+        self.callSets   = []  # callers' GeneCallTables (frozen); mergeList and uniqueList refer to their rows
         self.commonCore = []  # list of lists of identical CGC_geneCall object calls (ie, different callers, same call) 
-        self.mergeList  = []  # combined list of CGC_geneCall objects, merged by self.Merge()
-        self.uniqueList = []  # list of lists of unique gene calls over all callers; each item in list is a common gene call (>=1 gene caller)
+        self.mergeList  = GeneCallRefList(self.callSets)  # combined, ordered references to gene calls, merged by self.Merge()
+        self.uniqueList = GeneCallGroupList(self.mergeList)  # unique gene calls over all callers; each item in list is a common gene call (>=1 gene caller)
         self.callerList = []  # non-redundant list of callers 
-        self.geneCall   = CGC_geneCall.GeneCall()  # a geneCall object
+        self.statsSummary = {}  # counts reported by the last PrintStatsSummary(), for batch summaries
+        self.stats        = CGC_stats.ComparisonStats()  # per-caller and per-contig statistics (see GatherStats())
+        self.gridFormat   = CGC_grid.GRID_TSV  # format of the gene call grid (see CGC_grid.GRID_FORMATS)
+        self.matchMode  = MATCH_EXACT          # how Compare() decides that gene calls match (see MATCH_MODES)
+        self.minOverlap = DEFAULT_MIN_OVERLAP  # for MATCH_OVERLAP: fraction of each call's length that must overlap
+        self.subsetMasks  = array.array('L')  # per unique gene call: bit i set if self.callerList[i] made the call
+        self.subsetCounts = {}  # caller bitmask => number of unique gene calls made by exactly those callers
+        self.error        = ""  # why CGC_main.RunComparison() refused or stopped this comparison; "" if it ran
 
     # Create a non-redundant list of gene callers
     def IdentifyCallers(self):
         if self.mergeList:
-            for gene in self.mergeList:
-                if gene.geneCaller not in self.callerList:
-                    self.callerList.append(gene.geneCaller)
+            for table in self.callSets:
+                for geneCaller in table.callerNames:
+                    if geneCaller not in self.callerList:
+                        self.callerList.append(geneCaller)
             self.callerList.sort()
             return len(self.callerList)
         else:
@@ -68,16 +223,21 @@ class Comparison(object):
             if self.mergeList:
                 callerCount = self.IdentifyCallers() 
                 if callerCount > 0:
-                    for commonCalls in self.uniqueList:
-                        count = 1
-                        if len(commonCalls) == callerCount:
-                            newCommonCoreCall = copy.deepcopy(self.geneCall)
+                    count = 1
+                    for groupIndex in xrange(0,len(self.uniqueList)):
+                        if self.matchMode == MATCH_EXACT:
+                            groupCallerCount = self.uniqueList.GetGroupSize(groupIndex)
+                        else:  # a group of matching (not identical) calls may hold several calls from one caller
+                            groupCallerCount = self.uniqueList.GetGroupCallerCount(groupIndex)
+                        if groupCallerCount == callerCount:
+                            commonCalls = self.uniqueList[groupIndex]
                             geneName   = "CommonCoreGene_" + str(count)
                             strand     = commonCalls[0].strand
                             leftEnd    = commonCalls[0].leftEnd
                             rightEnd   = commonCalls[0].rightEnd
                             geneLength = commonCalls[0].geneLength
-                            newCommonCoreCall.AssignGeneCall(geneName,"All_callers",count,strand,leftEnd,rightEnd,geneLength)
+                            contig     = commonCalls[0].contig
+                            newCommonCoreCall = CGC_geneCall.FrozenGeneCall(geneName,"All_callers",count,strand,leftEnd,rightEnd,geneLength,contig)
                             self.commonCore.append(newCommonCoreCall)
                             count += 1
                 else:
@@ -90,73 +250,245 @@ class Comparison(object):
              
 
     # Determine which gene call occurs first along the sequence
+    # Uses the same (contig, leftEnd, rightEnd, strand) ordering as GeneCallSet.SortGeneCalls()
     def IsLesser(self,gene1,gene2):  # input is 2 geneCall objects
-        if (int(gene1.leftEnd) < int(gene2.leftEnd)):
-            return True
-        if (int(gene1.leftEnd) == int(gene2.leftEnd)) and (int(gene1.rightEnd) < int(gene2.rightEnd)):
-            return True
-        return False
-
-    # Merge a list of gene call objects with self.mergeList
+        return CGC_geneCall.SortKey(gene1) < CGC_geneCall.SortKey(gene2)
+
+    # Return nextGeneSet as a GeneCallTable; accepts a table or a list of GeneCall objects
+    def GetTable(self,nextGeneSet):
+        if isinstance(nextGeneSet,CGC_geneCall.GeneCallTable):
+            return nextGeneSet
+        table = CGC_geneCall.GeneCallTable()
+        for geneCall in nextGeneSet:
+            table.AppendCall(geneCall)
+        return table
+
+    # Add a caller's table to self.callSets and freeze it, since results will refer to its rows
+    def AddCallSet(self,nextGeneSet):
+        nextTable = self.GetTable(nextGeneSet)
+        if nextTable.mapped:  # rows are read one at a time from here on: faster from arrays than from numpy
+            nextTable.CopyColumns()
+        nextTable.Freeze()
+        self.callSets.append(nextTable)
+        return len(self.callSets) - 1
+
+    # Merge a sorted table (or list) of gene calls with self.mergeList
     # Call this method once for each caller's output (i.e., loop over the set of gene caller outputs) 
+    # Only row references are merged; the callers' gene calls are neither copied nor modified
     def Merge(self,nextGeneSet):  # Merge a list of gene call objects with self.mergeList
-        if self.mergeList == []:
-            # Trivial case: copy geneCall objects into self.mergeList
-            for geneCall in nextGeneSet:
-                newGeneCall = copy.deepcopy(geneCall)
-                self.mergeList.append(newGeneCall)
-
-        else: # merge next gene call set with existing self.mergeList
-            temp = []   # holds merged geneCall objects
-            mergeIndex = 0; mergeEnd = len(self.mergeList)
-            nextIndex  = 0; nextEnd  = len(nextGeneSet)
-
-            # Capture the gene call with smallest leftEnd location, or rightEnd if leftEnds are equal
-            while mergeIndex < mergeEnd and nextIndex < nextEnd:
-                if self.IsLesser(self.mergeList[mergeIndex],nextGeneSet[nextIndex]):
-                    nextMergeGene = self.mergeList[mergeIndex]
-                    mergeIndex += 1
-                else:
-                    nextMergeGene = copy.deepcopy(nextGeneSet[nextIndex])
-                    nextIndex += 1
-                temp.append(nextMergeGene) 
-
-            # If this code executes, then all remaining geneCall objects from self.mergeList go next
-            while mergeIndex < mergeEnd:
-                temp.append(self.mergeList[mergeIndex])
-                mergeIndex += 1
-
-            # If this code executes, then all remaining geneCall objects from nextGeneSet go next
-            while nextIndex < nextEnd:
-                temp.append(nextGeneSet[nextIndex])
-                nextIndex += 1
-
-            # update self.mergeList
-            self.mergeList = temp
+        nextIndex = self.AddCallSet(nextGeneSet)
+        nextTable = self.callSets[nextIndex]
+        temp = GeneCallRefList(self.callSets)   # holds merged gene call references
+        mergeRow = 0; mergeEnd = len(self.mergeList)
+        nextRow  = 0; nextEnd  = len(nextTable)
+
+        # Capture the gene call with smallest leftEnd location, or rightEnd if leftEnds are equal
+        # Keys are compared as integers, straight from the table columns
+        while mergeRow < mergeEnd and nextRow < nextEnd:
+            if self.mergeList.GetKey(mergeRow) < nextTable.GetKey(nextRow):
+                temp.Append(self.mergeList.tableIndex[mergeRow],self.mergeList.row[mergeRow])
+                mergeRow += 1
+            else:
+                temp.Append(nextIndex,nextRow)
+                nextRow += 1
+
+        # If this code executes, then all remaining gene calls from self.mergeList go next
+        while mergeRow < mergeEnd:
+            temp.Append(self.mergeList.tableIndex[mergeRow],self.mergeList.row[mergeRow])
+            mergeRow += 1
+
+        # If this code executes, then all remaining gene calls from nextTable go next
+        while nextRow < nextEnd:
+            temp.Append(nextIndex,nextRow)
+            nextRow += 1
+
+        # update self.mergeList
+        self.mergeList = temp
+        self.uniqueList = GeneCallGroupList(self.mergeList)
+        return
+
+    # Merge all callers' sorted tables (or lists) in a single k-way heap merge
+    # Returns a generator of (table index, row) references in merged order, to be passed to Compare();
+    # the merged list is built only once, by Compare(), instead of once per caller as with Merge()
+    def MergeAll(self,geneSets):
+        firstIndex = len(self.callSets)
+        for geneSet in geneSets:
+            self.AddCallSet(geneSet)
+        return self.IterMerged(firstIndex)
+
+    # Generator behind MergeAll(): yields references to the rows of self.callSets[firstIndex:] in sorted order
+    # Ties on (contig, leftEnd, rightEnd, strand) are broken by caller order, then by row
+    def IterMerged(self,firstIndex=0):
+        tables = self.callSets
+        heap = []
+        for tableIndex in xrange(firstIndex,len(tables)):
+            if len(tables[tableIndex]) > 0:
+                heap.append((tables[tableIndex].GetKey(0),tableIndex,0))
+        heapq.heapify(heap)
+        while heap:
+            key, tableIndex, row = heap[0]
+            yield tableIndex, row
+            row += 1
+            if row < len(tables[tableIndex]):
+                heapq.heapreplace(heap,(tables[tableIndex].GetKey(row),tableIndex,row))
+            else:
+                heapq.heappop(heap)
         return
 
     # Compares the genes in self.mergeList; creates a list of ordered, unique gene calls 
-    # Run this method after having merged all of your gene call sets into self.mergeList
-    def Compare(self):  
-        identityList = []
-        if self.mergeList:
-            callCount = len(self.mergeList)               # number of total gene calls, all callers
-            nextCall  = copy.deepcopy(self.mergeList[0])  # capture 1st gene call
-            identityList.append(nextCall)                 # each addition to list is identical to existing in list
-            for i in xrange(1,callCount):                 # start with 2nd gene call
-                nextCall = copy.deepcopy(self.mergeList[i])
-                if self.mergeList[i].strand   != self.mergeList[i-1].strand  or \
-                   self.mergeList[i].leftEnd  != self.mergeList[i-1].leftEnd or \
-                   self.mergeList[i].rightEnd != self.mergeList[i-1].rightEnd:
-                    self.uniqueList.append(identityList)  # all identicals for this gene call are identified
-                    identityList = []                     # reset
-                identityList.append(nextCall)
-            if identityList:
-                self.uniqueList.append(identityList)
+    # Run this method after having merged all of your gene call sets into self.mergeList, or pass it
+    # the generator returned by MergeAll(), in which case self.mergeList is filled as the stream is consumed
+    # Each unique gene call is a group of consecutive references in self.mergeList (nothing is copied)
+    def Compare(self,mergeStream=None):  
+        if mergeStream is None:
+            mergeStream = izip(self.mergeList.tableIndex,self.mergeList.row)
+        tables = self.callSets
+        refs   = GeneCallRefList(self.callSets)
+        groups = GeneCallGroupList(refs)
+        previous = None; previousRow = 0
+        for tableIndex, row in mergeStream:
+            current = tables[tableIndex]
+            if previous is None or \
+               current.strand[row]   != previous.strand[previousRow]  or \
+               current.leftEnd[row]  != previous.leftEnd[previousRow] or \
+               current.rightEnd[row] != previous.rightEnd[previousRow] or \
+               current.contigNames[current.contigId[row]] != previous.contigNames[previous.contigId[previousRow]]:
+                groups.AppendGroup(len(refs))             # this gene call starts a new group of identical calls
+            refs.Append(tableIndex,row)
+            previous = current; previousRow = row
+        if refs:
+            self.mergeList  = refs
+            self.uniqueList = groups
+            if self.matchMode != MATCH_EXACT:
+                self.GroupMatches()
         else:
             print "Compare(): Nothing to Compare"
         return
 
+    # Regroup self.mergeList for the same-stop and overlap match modes, using an interval index over the
+    # calls (see CGC_interval.py); matches are joined transitively, so a group holds every call connected
+    # to it by a chain of matches. Groups are ordered by their first call in merged order
+    def GroupMatches(self):
+        refs   = self.mergeList
+        tables = self.callSets
+        index  = CGC_interval.IntervalIndex()
+        for i in xrange(0,len(refs)):
+            table = tables[refs.tableIndex[i]]; row = refs.row[i]
+            index.AddInterval(table.contigNames[table.contigId[row]],table.strand[row],table.leftEnd[row],table.rightEnd[row],i)
+        if self.matchMode == MATCH_SAME_STOP:
+            matches = index.IterSameStop()
+        elif self.matchMode == MATCH_OVERLAP:
+            matches = index.IterOverlaps(self.minOverlap)
+        else:
+            print "GroupMatches(): unknown match mode", self.matchMode
+            return
+        groupSets = CGC_interval.UnionFind(len(refs))
+        for i, j in matches:
+            groupSets.Union(i,j)
+
+        # The root of each set is its lowest index, i.e., the group's first call in merged order
+        members = {}  # root => indexes into refs
+        roots   = []
+        for i in xrange(0,len(refs)):
+            root = groupSets.Find(i)
+            if root not in members:
+                members[root] = []
+                roots.append(root)
+            members[root].append(i)
+        newRefs = GeneCallRefList(tables)
+        groups  = GeneCallGroupList(newRefs)
+        for root in roots:
+            groups.AppendGroup(len(newRefs))
+            for i in members[root]:
+                newRefs.Append(refs.tableIndex[i],refs.row[i])
+        self.mergeList  = newRefs
+        self.uniqueList = groups
+        return
+
+    # Append the results of another Comparison, computed over a later part of the sequence (e.g., the next
+    # contig), to this one; common core genes are renumbered to follow this comparison's own
+    def Extend(self,other):
+        tableOffset = len(self.callSets)
+        refOffset   = len(self.mergeList)
+        self.callSets.extend(other.callSets)
+        self.mergeList.tableIndex.extend(array.array('i',[tableIndex + tableOffset for tableIndex in other.mergeList.tableIndex]))
+        self.mergeList.row.extend(other.mergeList.row)
+        self.uniqueList.starts.extend(array.array('i',[start + refOffset for start in other.uniqueList.starts]))
+        for commonCall in other.commonCore:
+            count = len(self.commonCore) + 1
+            newCommonCoreCall = CGC_geneCall.FrozenGeneCall("CommonCoreGene_" + str(count),commonCall.geneCaller,count,commonCall.strand,
+                                                            commonCall.leftEnd,commonCall.rightEnd,commonCall.geneLength,commonCall.contig)
+            self.commonCore.append(newCommonCoreCall)
+        for caller in other.callerList:
+            if caller not in self.callerList:
+                self.callerList.append(caller)
+        self.callerList.sort()
+        return
+
+    # Add one caller's sorted table (or list) of gene calls to a completed comparison, and update the
+    # unique gene calls and the common core. With exact matching, the new calls are merged into the
+    # existing merged list in one pass, O(n_existing + n_new); other match modes regroup all calls
+    def AddCaller(self,nextGeneSet):
+        nextTable = self.GetTable(nextGeneSet)
+        for geneCaller in nextTable.callerNames:
+            if geneCaller in self.callerList:
+                raise ValueError("caller " + geneCaller + " is already part of this comparison")
+        if self.matchMode == MATCH_EXACT:
+            self.Merge(nextTable)  # the merged list is in sorted order, as Merge() requires
+            self.Compare()
+        else:
+            self.AddCallSet(nextTable)
+            self.Recompare()
+        self.commonCore = []
+        self.IdentifyCommonCore()
+        return
+
+    # Remove a caller's gene calls from a completed comparison, and update the unique gene calls and the
+    # common core. With exact matching, the remaining calls keep their groups, in one pass; other match
+    # modes regroup the remaining calls, since a group may have been joined through the removed calls
+    def RemoveCaller(self,geneCaller):
+        if geneCaller not in self.callerList:
+            raise ValueError("caller " + geneCaller + " is not part of this comparison")
+        keepTables = []; tableMap = {}  # old table index => new table index
+        for tableIndex, table in enumerate(self.callSets):
+            if geneCaller in table.callerNames:
+                if len(table.callerNames) > 1:
+                    raise ValueError("caller " + geneCaller + " shares a gene call table with other callers")
+                continue
+            tableMap[tableIndex] = len(keepTables)
+            keepTables.append(table)
+        self.callSets[:] = keepTables  # the list is shared with self.mergeList
+        self.callerList.remove(geneCaller)
+        if self.matchMode == MATCH_EXACT:
+            oldRefs = self.mergeList; oldGroups = self.uniqueList
+            refs   = GeneCallRefList(self.callSets)
+            groups = GeneCallGroupList(refs)
+            for groupIndex in xrange(0,len(oldGroups)):
+                start = oldGroups.starts[groupIndex]
+                groupStart = len(refs)
+                for i in xrange(start,start + oldGroups.GetGroupSize(groupIndex)):
+                    newIndex = tableMap.get(oldRefs.tableIndex[i])
+                    if newIndex is not None:
+                        refs.Append(newIndex,oldRefs.row[i])
+                if len(refs) > groupStart:
+                    groups.AppendGroup(groupStart)
+            self.mergeList  = refs
+            self.uniqueList = groups
+        else:
+            self.Recompare()
+        self.commonCore = []
+        if self.mergeList:
+            self.IdentifyCommonCore()
+        return
+
+    # Merge and compare all of self.callSets again, e.g., after a change of callers in a match mode
+    # other than exact
+    def Recompare(self):
+        self.mergeList  = GeneCallRefList(self.callSets)
+        self.uniqueList = GeneCallGroupList(self.mergeList)
+        self.Compare(self.IterMerged(0))
+        return
+
     def PrintMergeList(self):
         print "\n***************Merge List"
         count = 1 
@@ -191,90 +523,220 @@ class Comparison(object):
         for caller in self.callerList:
             print caller 
 
-    # Formats the unique calls list and prints to standard out; this is the final comparison data set
-    def PrintGenecallGrid(self): # Prints an ordered, complete list of gene calls, each caller's in a column, identical calls in same row
+    # Formats the unique calls list and prints to OUT (standard out by default); this is the final comparison data set
+    def PrintGenecallGrid(self,OUT=None): # Prints an ordered, complete list of gene calls, each caller's in a column, identical calls in same row
+        if OUT is None:
+            OUT = sys.stdout
         if self.callerList:
             if self.uniqueList: # Recall, uniqueList is list of unique gene calls, many of which were called by >1 caller
-                count = 1
-
-                # Print column headers, for as many gene callers as we have
-                print "count\t",
-                for i in xrange(0,len(self.callerList)):
-                    print "caller\tstrand\tleftEnd\trightEnd\tlength\tcontig\t",
-                print 
-
                 # Format each gene call as a single line of output, arranging gene callers in order left to right
-                for geneList in self.uniqueList:
-
-                    # Create an empty array for printing identical gene calls in order going across by gene caller
-                    printArray = [] # initialize
-                    for i in xrange(0,len(self.callerList)): # Make the array as big as it needs to be for current gene call 
-                        printArray.append('')
-
-                    # Fill the print array in order by gene caller # will be at least 1 gene caller's call 
-                    for i in xrange(0,len(geneList)):
-                        currentCaller = geneList[i].geneCaller
-                        printColumn = self.callerList.index(currentCaller) # capture index of this gene caller in self.callerList
-                        printArray[printColumn] = geneList[i].geneCaller + '\t' + geneList[i].strand   + '\t' \
-                                                + geneList[i].leftEnd    + '\t' + geneList[i].rightEnd + '\t' \
-                                                + geneList[i].geneLength + '\t' + geneList[i].contig + '\t'
-
-                    # Print the current row: horizontal list of identical gene calls 
-                    print count, '\t',
-                    for geneCallString in printArray:
-                        if geneCallString == '':
-                            print "\t\t\t\t\t\t",
-                        else:
-                            print geneCallString, 
-                    print 
-                    count += 1
+                writer = CGC_grid.GridWriter(self.callerList,OUT,self.gridFormat,self.matchMode != MATCH_EXACT)
+                writer.WriteHeader()
+                writer.WriteComparison(self)
             else:
                 print "PrintGenecallGrid(): uniqueList is empty"
         else:
             print "PrintGenecallGrid(): callerList is empty"
         return
 
-    def PrintReport(self):  # Final output
-        self.PrintStats()
-        self.PrintGenecallGrid()
+    def PrintReport(self,OUT=None):  # Final output; written to standard out unless OUT is given
+        self.PrintStatsForGrid(OUT)
+        self.PrintGenecallGrid(OUT)
         return
 
-    def PrintStats(self):
+    # Print statistics as PrintStats() does, or as PrintStatsSummary() does for the given (distinct, common, lone)
+    # counts; for grid formats other than TSV, as comment lines, so that the report can be read as a table
+    def PrintStatsForGrid(self,OUT=None,counts=None):
+        if self.gridFormat == CGC_grid.GRID_TSV:
+            summary = OUT
+        else:
+            summary = StringIO()
+        if counts is None:
+            self.PrintStats(summary)
+        else:
+            self.PrintStatsSummary(counts[0],counts[1],counts[2],summary)
+        if self.gridFormat != CGC_grid.GRID_TSV:
+            CGC_grid.WriteComments(summary.getvalue(),OUT)
+        return
 
-        # Print a list of the callers 
-        print "The following gene callers were considered:",
-        for caller in self.callerList:
-            print ',', caller,
-        print
-        print "The number of distinct gene calls over all gene callers is", len(self.uniqueList)
-        print "The number of gene calls in common among all callers is", len(self.commonCore) 
+    def PrintStats(self,OUT=None):
 
         # Calculate number of gene calls that are not shared between any 2 gene callers
         loneCallCount = 0
-        for callerList in self.uniqueList:
-            if len(callerList) == 1:
+        for groupIndex in xrange(0,len(self.uniqueList)):
+            if self.matchMode == MATCH_EXACT:
+                groupCallerCount = self.uniqueList.GetGroupSize(groupIndex)
+            else:  # as in IdentifyCommonCore(): a group may hold several calls from one caller
+                groupCallerCount = self.uniqueList.GetGroupCallerCount(groupIndex)
+            if groupCallerCount == 1:
                 loneCallCount += 1
-        print "The number of unique (non-matching) gene calls is", loneCallCount 
 
         # For each gene caller, calculate the number of calls it made 
+        self.GatherStats()
+
+        self.PrintStatsSummary(len(self.uniqueList),len(self.commonCore),loneCallCount,OUT)
+        return
+
+    # Per-caller and per-contig statistics over all callers' tables, in a single pass over each table
+    def GatherStats(self):
+        self.stats = CGC_stats.ComparisonStats()
+        for table in self.callSets:
+            self.stats.AddTable(table)
+        return self.stats
+
+    # Prints to OUT (standard out if OUT is None); caller statistics are taken from self.stats
+    def PrintStatsSummary(self,distinctCount,commonCount,loneCallCount,OUT=None):
+
+        # Print a list of the callers 
+        print >>OUT, "The following gene callers were considered:",
+        for caller in self.callerList:
+            print >>OUT, ',', caller,
+        print >>OUT
+        print >>OUT, "The number of distinct gene calls over all gene callers is", distinctCount
+        print >>OUT, "The number of gene calls in common among all callers is", commonCount
+        print >>OUT, "The number of unique (non-matching) gene calls is", loneCallCount 
+
         for caller in self.callerList:
-            callCount        = 0
-            cumulativeLength = 0 
-            maxLength        = 0
-            minLength        = 1000000 
-            aveLength        = 0
-            for call in self.mergeList:
-                if (call.geneCaller == caller):
-                    callCount += 1
-                    intLength = int(call.geneLength)
-                    cumulativeLength += intLength
-                    if maxLength < intLength:
-                        maxLength = intLength
-                    if minLength > intLength:
-                        minLength = intLength
-            aveLength = cumulativeLength / callCount
-            print "Caller", caller, "produced", callCount, "gene calls."
-            print "Caller", caller, "gene-call length stats:  min:", minLength, ", max:", maxLength, ", ave:", aveLength
+            stats = self.stats.GetCallerStats(caller)
+            callCount = stats.count; minLength = 0; maxLength = 0; aveLength = 0
+            if callCount > 0:
+                minLength = stats.GetMin(); maxLength = stats.GetMax()
+                aveLength = stats.totalLength / callCount
+            print >>OUT, "Caller", caller, "produced", callCount, "gene calls."
+            print >>OUT, "Caller", caller, "gene-call length stats:  min:", minLength, ", max:", maxLength, ", ave:", aveLength
+
+        self.statsSummary = {'distinct':distinctCount, 'common':commonCount, 'lone':loneCallCount,
+                             'callerCounts':dict([(caller,self.stats.GetCallerStats(caller).count) for caller in self.callerList])}
+        return
+
+    # Streaming comparison over CGC_geneCall.GeneCallStream objects, each reading a file sorted in
+    # CGC_geneCall.SortKey() order. Calls are merged and grouped on the fly; each grid row is written
+    # to OUT as soon as its group is complete, and statistics are kept as running totals, so memory
+    # use does not grow with the number of gene calls. Statistics are printed after the grid.
+    def CompareStreams(self,streams,OUT):
+        if self.matchMode != MATCH_EXACT:
+            raise ValueError("streaming comparison supports exact matching only, not " + self.matchMode)
+        for stream in streams:
+            if stream.geneCaller not in self.callerList:
+                self.callerList.append(stream.geneCaller)
+        self.callerList.sort()
+        self.stats = CGC_stats.ComparisonStats(False)  # per caller only: memory use must not grow with the number of contigs
+        callerBits = self.GetCallerBits()
+        self.subsetCounts = {}  # combination counts only: masks are not kept per gene call
+        counts = [0,0,0]  # distinct, common and lone gene calls so far
+
+        writer = CGC_grid.GridWriter(self.callerList,OUT,self.gridFormat)
+        writer.WriteHeader()
+        group = []; groupKey = None
+        mergeStream = heapq.merge(*[stream.IterKeyed(streamIndex) for streamIndex, stream in enumerate(streams)])
+        for key, streamIndex, lineNumber, geneCall in mergeStream:
+            self.stats.AddCall(geneCall.geneCaller,geneCall.contig,geneCall.geneLength,geneCall.strand)
+            if group and key != groupKey:  # same identity test as Compare(): contig, strand, leftEnd, rightEnd
+                self.CloseStreamGroup(writer,group,counts,callerBits)
+                group = []
+            group.append(geneCall); groupKey = key
+        if group:
+            self.CloseStreamGroup(writer,group,counts,callerBits)
+        writer.Flush()
+
+        self.PrintStatsForGrid(OUT,tuple(counts))
+        return
+
+    # Complete a group of identical gene calls (CGC_geneCall.GeneCall objects) of CompareStreams(): write its
+    # grid row, and add it to counts ([distinct, common, lone], updated in place) and to self.subsetCounts,
+    # counted as IdentifyCommonCore(), PrintStats() and IdentifySubsets() count an exact comparison's groups
+    def CloseStreamGroup(self,writer,group,counts,callerBits):
+        counts[0] += 1
+        writer.WriteCalls(counts[0],group)
+        if len(group) == len(self.callerList):
+            counts[1] += 1
+        if len(group) == 1:
+            counts[2] += 1
+        mask = 0
+        for geneCall in group:
+            mask |= callerBits[geneCall.geneCaller]
+        self.subsetCounts[mask] = self.subsetCounts.get(mask,0) + 1
+        return
+
+    # Bit for each caller in self.callerList, in order: callerList[i] => 1 << i
+    def GetCallerBits(self):
+        if len(self.callerList) > SUBSET_MAX_CALLERS:
+            raise ValueError("caller subsets are limited to " + str(SUBSET_MAX_CALLERS) + " callers")
+        return dict([(caller,1 << i) for i, caller in enumerate(self.callerList)])
+
+    # Give each unique gene call (group in self.uniqueList) a bitmask of the callers that made it, and count
+    # the unique gene calls made by each combination of callers, in a single pass over self.mergeList
+    # Run Compare() and IdentifyCommonCore() (or IdentifyCallers()) before running this method
+    def IdentifySubsets(self):
+        callerBits = self.GetCallerBits()
+        tableBits  = [[callerBits.get(caller,0) for caller in table.callerNames] for table in self.callSets]
+        callerIds  = [table.callerId for table in self.callSets]
+        tableIndex = self.mergeList.tableIndex; rows = self.mergeList.row
+        starts = self.uniqueList.starts
+        self.subsetMasks  = array.array('L')
+        self.subsetCounts = {}
+        for groupIndex in xrange(0,len(starts)):
+            start = starts[groupIndex]
+            end   = start + self.uniqueList.GetGroupSize(groupIndex)
+            mask = 0
+            for i in xrange(start,end):
+                mask |= tableBits[tableIndex[i]][callerIds[tableIndex[i]][rows[i]]]
+            self.subsetMasks.append(mask)
+            self.subsetCounts[mask] = self.subsetCounts.get(mask,0) + 1
+        return self.subsetCounts
+
+    # From self.subsetCounts, the number of unique gene calls made by each caller, and by each pair of callers
+    # Returns (calls, shared): calls[i] for self.callerList[i], shared[i][j] for callers i and j
+    def GetPairwiseCounts(self):
+        callerCount = len(self.callerList)
+        calls  = [0] * callerCount
+        shared = [[0] * callerCount for i in xrange(0,callerCount)]
+        for mask, count in self.subsetCounts.iteritems():
+            members = [i for i in xrange(0,callerCount) if mask & (1 << i)]
+            for i in members:
+                calls[i] += count
+                for j in members:
+                    shared[i][j] += count
+        return calls, shared
+
+    # UpSet-ready table of combination counts: one row per combination of callers that made at least one
+    # unique gene call; a 0/1 column per caller, the number of unique gene calls, and the combination's
+    # name (callers joined by '&', as expected by UpSetR's fromExpression()); largest counts first
+    def PrintSubsetCounts(self,OUT=None):
+        print >>OUT, '\t'.join(self.callerList + ["count","combination"])
+        for mask, count in sorted(self.subsetCounts.items(),key=lambda item: (-item[1],item[0])):
+            flags   = [str((mask >> i) & 1) for i in xrange(0,len(self.callerList))]
+            members = [caller for i, caller in enumerate(self.callerList) if mask & (1 << i)]
+            print >>OUT, '\t'.join(flags + [str(count),'&'.join(members)])
+        return
+
+    # UpSet-ready membership table: one row per unique gene call, numbered as in the gene call grid,
+    # with a 0/1 column per caller
+    def PrintSubsetMembership(self,OUT=None):
+        print >>OUT, '\t'.join(["call"] + self.callerList)
+        callerRange = xrange(0,len(self.callerList))
+        for groupIndex, mask in enumerate(self.subsetMasks):
+            print >>OUT, str(groupIndex + 1) + '\t' + '\t'.join([str((mask >> i) & 1) for i in callerRange])
+        return
+
+    # Square matrix over self.callerList of MEASURE_JACCARD or MEASURE_AGREEMENT, for each pair of callers
+    # Agreement is not symmetric: row i, column j is the fraction of caller i's calls also made by caller j
+    def PrintPairwiseMatrix(self,OUT=None,measure=MEASURE_JACCARD):
+        calls, shared = self.GetPairwiseCounts()
+        print >>OUT, '\t'.join(["caller"] + self.callerList)
+        for i, caller in enumerate(self.callerList):
+            values = []
+            for j in xrange(0,len(self.callerList)):
+                if measure == MEASURE_JACCARD:
+                    total = calls[i] + calls[j] - shared[i][j]
+                else:
+                    total = calls[i]
+                if total > 0:
+                    values.append("%.4f" % (float(shared[i][j]) / total))
+                else:
+                    values.append("NA")
+            print >>OUT, '\t'.join([caller] + values)
+        return
 
     def PrintAll(self):  # Print a dump of everything (debug/diagnostic) 
         self.PrintCallerList()
@@ -301,3 +763,61 @@ class Comparison(object):
         return
 
 
+
+# Returns a new, empty Comparison for backend (see BACKENDS); both backends give the same results
+# Raises ValueError if the backend is unknown, or needs numpy and numpy is not installed
+def NewComparison(backend=BACKEND_PYTHON):
+    if backend == BACKEND_PYTHON:
+        return Comparison()
+    if backend == BACKEND_NUMPY:
+        if CGC_geneCall.GetNumpy() is None:
+            raise ValueError("the numpy comparison backend requires numpy, which is not installed")
+        import CGC_vector  # imported here: CGC_vector imports this module
+        return CGC_vector.VectorComparison()
+    raise ValueError("unknown comparison backend: " + str(backend))
+
+# Merge, compare and identify the common core for the gene calls of one contig
+# callerList lists all callers in the full comparison, so that a caller with no calls on this contig
+# still counts toward the common core; module-level so that multiprocessing can run it in a worker
+def CompareContig(job):
+    callerList, tables, matchMode, minOverlap, backend = job
+    comparison = NewComparison(backend)
+    comparison.callerList = list(callerList)
+    comparison.matchMode  = matchMode
+    comparison.minOverlap = minOverlap
+    comparison.Compare(comparison.MergeAll(tables))
+    if comparison.mergeList:
+        comparison.IdentifyCommonCore()
+    return comparison
+
+# Compare callers contig by contig, using a pool of worker processes when workers > 1
+# callSets is a list of CGC_geneCall.GeneCallSet objects; each is partitioned by contig, every contig is
+# compared independently, and the per-contig results are concatenated in order of contig name
+# If pool (a multiprocessing.Pool) is given, it is used, and left open, instead of a new pool of workers processes
+def CompareByContig(callSets,workers=1,matchMode=MATCH_EXACT,minOverlap=DEFAULT_MIN_OVERLAP,pool=None,backend=BACKEND_PYTHON):
+    callerList = sorted(set([callSet.geneCaller for callSet in callSets]))
+    partitions = [callSet.PartitionByContig() for callSet in callSets]
+    contigs = sorted(set([contig for partition in partitions for contig in partition]))
+    jobs = []
+    for contig in contigs:
+        jobs.append((callerList,[partition[contig].geneCallList for partition in partitions if contig in partition],
+                     matchMode,minOverlap,backend))
+    if pool is not None and len(jobs) > 1:
+        results = pool.map(CompareContig,jobs,max(1,len(jobs) / (4 * workers)))
+    elif workers > 1 and len(jobs) > 1:
+        import multiprocessing  # imported here: a run without worker processes does not load it
+        pool = multiprocessing.Pool(workers)
+        try:
+            results = pool.map(CompareContig,jobs,max(1,len(jobs) / (4 * workers)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(CompareContig,jobs)
+    comparison = NewComparison(backend)
+    comparison.callerList = list(callerList)
+    comparison.matchMode  = matchMode
+    comparison.minOverlap = minOverlap
+    for result in results:
+        comparison.Extend(result)
+    return comparison
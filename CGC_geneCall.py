@@ -8,23 +8,85 @@
 #
 # Updates:
 #    Begin 2 June 2016
+#    16 Oct 2026: keyed O(n log n) sort replaces insertion sort as the default
+#    16 Oct 2026: gene calls are stored in a columnar GeneCallTable; GeneCall objects are views
+#    16 Oct 2026: GeneCall views and merged tables are read-only (Freeze())
+#    16 Oct 2026: GeneCallStream reads a sorted call file one line at a time
+#    16 Oct 2026: ReadGeneCallSets() reads each file once, one GeneCallSet per caller section
+#    16 Oct 2026: AddParsedCalls() loads a gene caller's raw output, as parsed by CGC_parser.Parse()
+#    16 Oct 2026: binary columnar call files (WriteBinary(), ReadBinaryGeneCallSet()), memory-mapped on load
+#    16 Oct 2026: contig index of a call file (WriteContigIndex()); calls read by contig (ReadContigCallSets())
+#    16 Oct 2026: numpy is imported on first use (GetNumpy()), not when the module is imported
+#    16 Oct 2026: binary call files with an unnamed caller load with their calls (caller "" interned)
+#    16 Oct 2026: FrozenGeneCall() builds read-only views without a read-only check per attribute
 #
 # Programmer's Notes:
+#    Binary call file format (all integers little-endian; see WriteBinary()):
+#        header:  "CGCB", version (uint32), flags (uint32; bit 0: rows are sorted),
+#                 caller name, section name, contig count (uint32) and contig names,
+#                 each name a uint32 byte count followed by the bytes; row count (uint32);
+#                 zero padding to a multiple of 8 bytes
+#        columns: geneNumber, leftEnd, rightEnd, geneLength, contigId (int32 each; contigId
+#                 indexes the contig names), then strand (1 byte per row, '+' or '-')
+#    When numpy is installed, ReadBinaryGeneCallSet() maps the columns from the file without
+#    copying them (numpy.memmap); otherwise each column is read from an mmap with a single copy.
+#    Contig index of a call file (written by CGC_parser.py, as <call file>.contigs):
+#        "# CGC contig index <version> <size of the call file in bytes>", then one line per contig,
+#        in file order: contig, byte offset, byte length and number of calls of the contig's block
+#        of rows, tab separated. A contig's number (its id) is its position in the index. The index
+#        is used only if the call file still has the size recorded; otherwise it is ignored.
 #
 # Classes and Methods:
 #    GeneCall()
 #        AssignGeneCall(<input parameters>)
+#        Freeze()
 #        PrintAll()
 #        PrintAll_brief()
+#    GeneCallTable()
+#        InternCaller(geneCaller)
+#        InternContig(contig)
+#        AppendRow(geneNumber,strand,leftEnd,rightEnd,geneLength,contig,geneCaller)
+#        AppendCall(geneCall)
+#        AppendTableRow(table,index)
+#        AppendTableRows(table,start,end)
+#        GetCall(index)
+#        GetKey(index)
+#        GetSortKeys()
+#        Reorder(order)
+#        Copy()
+#        GetByteSize()
+#        Freeze()
+#        CheckWritable()
+#        CopyColumns()
 #    GeneCallSet()
 #        AddGeneCall(newGeneCall)
 #        AddGeneCalls(GENE_FILE_HANDLE)
+#        AddParsedCalls(geneCaller,sourceName,calls)
 #        IsLesser(gene1,gene2)
 #        UpdateGeneCount()
 #        GetGeneCalls()
-#        SortGeneCalls()
+#        GetSortKeys()
+#        IsSorted(keys)
+#        SortGeneCalls(mode)
+#        PartitionByContig()
+#        SelectContigs(contigs)
+#        InsertionSortGeneCalls()
 #        PrintAll()
 #        PrintAll_brief()
+#        WriteBinary(OUT)
+#    ReadGeneCallSets(GENE_FILE_HANDLE)
+#    IsBinaryFile(fileName)
+#    GetNumpy()
+#    ReadBinaryGeneCallSet(fileName)
+#    WriteContigIndex(fileName,index)
+#    ReadContigIndex(fileName)
+#    GroupByContig(fileName,index)
+#    ReadContigCallSets(fileName,contigs)
+#    GeneCallStream(GENE_FILE_HANDLE)
+#        ReadHeader()
+#        IterKeyed(streamIndex)
+#    SortKey(gene)
+#    FrozenGeneCall(geneName,geneCaller,geneNumber,strand,leftEnd,rightEnd,geneLength,contig)
 #
 #################################################################################################
 
@@ -32,34 +94,82 @@
 # THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
 
 import re
-import copy
+import os
+import sys
+import array
+import itertools
+import mmap
+import struct
+
+numpy = False  # imported on first use, by GetNumpy(): None if not installed
 
 p_comment    = re.compile('^#')
 p_caller     = re.compile('(\w+)\sgene\scalls')
 p_callerName = re.compile('[Gg][Ee][Nn][Ee][Mm][Aa][Rr][Kk]|[Gg][Ll][Ii][Mm][Mm][Ee][Rr]|[Pp][Rr][Oo][Dd][Ii][Gg][Aa][Ll]|[Rr][Aa][Ss][Tt]|[Pp][Hh][Aa][Tt][Ee]')
-p_dataLine   = re.compile('^(\d+)\t([+-])\t(\d+)\t(\d+)\t(\d+)\t([\d\w\.\-\_]+)')
+p_section    = re.compile('gene\scalls[,;:]?\s*(.*)')  # text after the caller header names the section (e.g., source file or genome)
+p_end        = re.compile('^#\s*END')
+p_dataLine   = re.compile('^(\d+)\t([+-])\t(\d+)\t(\d+)\t(\d+)\t(\S+)')
+
+##### SORT MODES
+
+SORT_KEYED     = 'keyed'      # stable O(n log n) sort on integer keys, computed once per call (default)
+SORT_INSERTION = 'insertion'  # original insertion sort; retained for benchmarking
+
+STRAND_RANK = {'+':0, '-':1}  # strand order within identical coordinates; unknown strand sorts last
+
+##### BINARY CALL FILES
+
+BINARY_MAGIC   = "CGCB"
+BINARY_VERSION = 1
+BINARY_SUFFIX  = ".cgb"
+BINARY_SORTED  = 0x1  # header flag: rows are sorted (SortKey order)
+CONTIG_INDEX_SUFFIX  = ".contigs"
+CONTIG_INDEX_VERSION = 1
+COPY_BLOCK = 1 << 20  # bytes copied at a time by GroupByContig()
+
+BINARY_COLUMNS = ('geneNumber','leftEnd','rightEnd','geneLength','contigId')  # int32 columns, in file order
+
+# Column name => array typecode, for every column of a GeneCallTable
+COLUMN_TYPES = (('geneNumber','i'),('strand','c'),('leftEnd','i'),('rightEnd','i'),('geneLength','i'),
+                ('callerId','H'),('contigId','i'))
+
+# Sort key for a single gene call: order by contig, then left end, right end and strand
+# Comparison.IsLesser() uses this same key, so merged lists stay consistent with sorted call sets
+def SortKey(gene):
+    return (gene.contig, int(gene.leftEnd), int(gene.rightEnd), STRAND_RANK.get(gene.strand,2))
 
 class GeneCall(object):
     
     def __init__(self):
-        self.geneName   = "unknwon"
-        self.geneCaller = "unknown"
-        self.geneNumber = 0
-        self.strand     = 'x'  # Typically '+' or '-'; 'x' indicates NULL
-        self.leftEnd    = 0    # may be start or stop, depending on strand (orientation)
-        self.rightEnd   = 0
-        self.geneLength = 0
-        self.contig     = "unknown"
+        # Attributes are set in __dict__, not through __setattr__(): a new call is never frozen
+        self.__dict__.update(
+            frozen     = False,      # once frozen, attributes cannot be changed (see Freeze())
+            geneName   = "unknwon",
+            geneCaller = "unknown",
+            geneNumber = 0,
+            strand     = 'x',        # Typically '+' or '-'; 'x' indicates NULL
+            leftEnd    = 0,          # may be start or stop, depending on strand (orientation)
+            rightEnd   = 0,
+            geneLength = 0,
+            contig     = "unknown")
 
     def AssignGeneCall(self,geneName,geneCaller,geneNumber,strand,leftEnd,rightEnd,geneLength,contig="unknown"):
-        self.geneName   = geneName
-        self.geneCaller = geneCaller
-        self.geneNumber = geneNumber
-        self.strand     = strand 
-        self.leftEnd    = leftEnd 
-        self.rightEnd   = rightEnd 
-        self.geneLength = geneLength
-        self.contig     = contig
+        if self.frozen:
+            raise AttributeError("GeneCall is read-only; cannot assign " + geneName)
+        self.__dict__.update(geneName=geneName,geneCaller=geneCaller,geneNumber=geneNumber,strand=strand,
+                             leftEnd=leftEnd,rightEnd=rightEnd,geneLength=geneLength,contig=contig)
+        return
+
+    # Guards assignments made after construction only; GeneCall(), AssignGeneCall() and
+    # FrozenGeneCall() set attributes in __dict__ directly
+    def __setattr__(self,name,value):
+        if self.frozen:
+            raise AttributeError("GeneCall is read-only; cannot set " + name)
+        object.__setattr__(self,name,value)
+
+    # Make this gene call read-only; views of GeneCallTable rows are always frozen
+    def Freeze(self):
+        object.__setattr__(self,'frozen',True)
         return
 
     def PrintAll(self):
@@ -77,13 +187,184 @@ class GeneCall(object):
         print "Gene No.", self.geneNumber, "gene caller: ", self.geneCaller, ", leftEnd:", self.leftEnd, ", rightEnd:", self.rightEnd, ", strand:", self.strand, ", length:", self.geneLength, ", contig:", self.contig
         return
 
+# Columnar storage for gene calls: one typed array per field, with caller and contig names interned
+# Uses about 23 bytes per call (vs. roughly 1 KB for a GeneCall object holding strings)
+# Indexing or iterating over a table returns GeneCall objects, built on demand as views of a row
+# Create a read-only GeneCall in one step: attributes go straight into __dict__, frozen included,
+# so building a view costs no __setattr__() calls (see GeneCallTable.GetCall())
+def FrozenGeneCall(geneName,geneCaller,geneNumber,strand,leftEnd,rightEnd,geneLength,contig):
+    geneCall = object.__new__(GeneCall)
+    geneCall.__dict__.update(frozen=True,geneName=geneName,geneCaller=geneCaller,geneNumber=geneNumber,strand=strand,
+                             leftEnd=leftEnd,rightEnd=rightEnd,geneLength=geneLength,contig=contig)
+    return geneCall
+
+class GeneCallTable(object):
+
+    def __init__(self):
+        self.geneNumber  = array.array('i')
+        self.strand      = array.array('c')  # '+' or '-'
+        self.leftEnd     = array.array('i')
+        self.rightEnd    = array.array('i')
+        self.geneLength  = array.array('i')
+        self.callerId    = array.array('H')  # index into self.callerNames
+        self.contigId    = array.array('i')  # index into self.contigNames
+        self.callerNames = []
+        self.contigNames = []
+        self.callerIds   = {}  # name => id
+        self.contigIds   = {}  # name => id
+        self.frozen      = False  # True once the table is shared with a Comparison (see Freeze())
+        self.mapped      = False  # True if columns are memory-mapped from a binary call file (read-only)
+        self.sorted      = False  # True if rows are known to be in SortKey order; cleared by any change
+
+    def __len__(self):
+        return len(self.leftEnd)
+
+    def __getitem__(self,index):
+        if index < 0:
+            index += len(self.leftEnd)
+        if index < 0 or index >= len(self.leftEnd):
+            raise IndexError("GeneCallTable index out of range")
+        return self.GetCall(index)
+
+    def __iter__(self):
+        for index in xrange(0,len(self.leftEnd)):
+            yield self.GetCall(index)
+
+    def InternCaller(self,geneCaller):
+        if geneCaller not in self.callerIds:
+            self.callerIds[geneCaller] = len(self.callerNames)
+            self.callerNames.append(geneCaller)
+        return self.callerIds[geneCaller]
+
+    def InternContig(self,contig):
+        if contig not in self.contigIds:
+            self.contigIds[contig] = len(self.contigNames)
+            self.contigNames.append(contig)
+        return self.contigIds[contig]
+
+    def AppendRow(self,geneNumber,strand,leftEnd,rightEnd,geneLength,contig,geneCaller):
+        self.CheckWritable()
+        self.geneNumber.append(int(geneNumber))
+        self.strand.append(strand)
+        self.leftEnd.append(int(leftEnd))
+        self.rightEnd.append(int(rightEnd))
+        self.geneLength.append(int(geneLength))
+        self.callerId.append(self.InternCaller(geneCaller))
+        self.contigId.append(self.InternContig(contig))
+        return
+
+    def AppendCall(self,geneCall):
+        self.AppendRow(geneCall.geneNumber,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,
+                       geneCall.geneLength,geneCall.contig,geneCall.geneCaller)
+        return
+
+    # Copy row index of another table into this one, re-interning its caller and contig names
+    def AppendTableRow(self,table,index):
+        self.CheckWritable()
+        self.geneNumber.append(table.geneNumber[index])
+        self.strand.append(table.strand[index])
+        self.leftEnd.append(table.leftEnd[index])
+        self.rightEnd.append(table.rightEnd[index])
+        self.geneLength.append(table.geneLength[index])
+        self.callerId.append(self.InternCaller(table.callerNames[table.callerId[index]]))
+        self.contigId.append(self.InternContig(table.contigNames[table.contigId[index]]))
+        return
+
+    # Copy rows start to end-1 of another table into this one, a column slice at a time
+    def AppendTableRows(self,table,start,end):
+        self.CheckWritable()
+        self.geneNumber.extend(table.geneNumber[start:end])
+        self.strand.extend(table.strand[start:end])
+        self.leftEnd.extend(table.leftEnd[start:end])
+        self.rightEnd.extend(table.rightEnd[start:end])
+        self.geneLength.extend(table.geneLength[start:end])
+        callerMap = {}; contigMap = {}  # the other table's ids => this table's ids, for names in the slice
+        for callerId in set(table.callerId[start:end]):
+            callerMap[callerId] = self.InternCaller(table.callerNames[callerId])
+        for contigId in set(table.contigId[start:end]):
+            contigMap[contigId] = self.InternContig(table.contigNames[contigId])
+        self.callerId.extend(array.array('H',[callerMap[callerId] for callerId in table.callerId[start:end]]))
+        self.contigId.extend(array.array('i',[contigMap[contigId] for contigId in table.contigId[start:end]]))
+        return
+
+    # Create a GeneCall view of row index; coordinates are returned as integers
+    def GetCall(self,index):
+        geneCaller = self.callerNames[self.callerId[index]]
+        geneNumber = self.geneNumber[index]
+        return FrozenGeneCall(geneCaller + '_' + str(geneNumber),geneCaller,geneNumber,self.strand[index],
+                              self.leftEnd[index],self.rightEnd[index],self.geneLength[index],
+                              self.contigNames[self.contigId[index]])
+
+    # Same ordering as SortKey(), without building a GeneCall
+    def GetKey(self,index):
+        return (self.contigNames[self.contigId[index]], self.leftEnd[index], self.rightEnd[index],
+                STRAND_RANK.get(self.strand[index],2))
+
+    # Integer keys for the whole table; contig ids are replaced by the rank of the contig's name
+    def GetSortKeys(self):
+        contigRank = [0] * len(self.contigNames)
+        for rank, contigId in enumerate(sorted(xrange(0,len(self.contigNames)), key=self.contigNames.__getitem__)):
+            contigRank[contigId] = rank
+        strandRank = [STRAND_RANK.get(strand,2) for strand in self.strand]
+        return zip([contigRank[contigId] for contigId in self.contigId], self.leftEnd, self.rightEnd, strandRank)
+
+    # Rearrange all columns so that new row i is old row order[i]
+    def Reorder(self,order):
+        self.CheckWritable()
+        for column, typecode in COLUMN_TYPES:
+            oldColumn = getattr(self,column)
+            setattr(self,column,array.array(typecode,[oldColumn[i] for i in order]))
+        return
+
+    def Copy(self):
+        newTable = GeneCallTable()
+        for column, typecode in COLUMN_TYPES:
+            setattr(newTable,column,array.array(typecode,getattr(self,column)))
+        newTable.callerNames = list(self.callerNames); newTable.callerIds = dict(self.callerIds)
+        newTable.contigNames = list(self.contigNames); newTable.contigIds = dict(self.contigIds)
+        return newTable
+
+    # Make the table read-only; Comparison freezes each table it merges, since its results
+    # refer to the table's rows rather than holding copies of them
+    def Freeze(self):
+        self.frozen = True
+        return
+
+    # Called before any change to the table
+    def CheckWritable(self):
+        if self.frozen:
+            raise TypeError("GeneCallTable is frozen: its rows are referenced by a Comparison")
+        if self.mapped:
+            self.CopyColumns()
+        self.sorted = False
+        return
+
+    # Replace memory-mapped columns with in-memory arrays, so that the table can be changed
+    def CopyColumns(self):
+        for column, typecode in COLUMN_TYPES:
+            values = getattr(self,column)
+            if isinstance(values,array.array):
+                values = array.array(typecode,values)
+            else:  # numpy array: copy its buffer at once, in native byte order
+                values = array.array(typecode,values.astype(values.dtype.newbyteorder('=')).tostring())
+            setattr(self,column,values)
+        self.mapped = False
+        return
+
+    # Bytes used by the column arrays (excludes the interned name lists, which do not grow per call)
+    def GetByteSize(self):
+        byteSize = 0
+        for column in (self.geneNumber,self.strand,self.leftEnd,self.rightEnd,self.geneLength,self.callerId,self.contigId):
+            byteSize += column.itemsize * len(column)
+        return byteSize
+
 class GeneCallSet(object):
 
     def __init__(self):
         self.geneCaller     = ""  # Typically, 'GeneMark', 'Glimmer', 'Prodigal', 'PhATE'
         self.geneCount      = 0
-        self.geneCallList   = []  # list of GeneCall objects 
-        self.geneCall_obj   = GeneCall()
+        self.geneCallList   = GeneCallTable()  # columnar storage; iterates as GeneCall objects
+        self.sectionName    = ""  # rest of the "<caller> gene calls" header line, e.g., "taken from file X"
 
     def UpdateGeneCount(self):
 
@@ -101,31 +382,86 @@ class GeneCallSet(object):
                 rightEnd   = match_data.group(4)
                 geneLength = match_data.group(5) 
                 contig     = match_data.group(6)
-                geneName   = self.geneCaller + '_' + geneNumber
-                newGeneCall = copy.deepcopy(self.geneCall_obj)
-                newGeneCall.AssignGeneCall(geneName,geneCaller,geneNumber,strand,leftEnd,rightEnd,geneLength,contig)
-                self.AddGeneCall(newGeneCall)
+                self.geneCallList.AppendRow(geneNumber,strand,leftEnd,rightEnd,geneLength,contig,geneCaller)
+        self.UpdateGeneCount()
         return
 
     def AddGeneCall(self,newGeneCall):
 
-        self.geneCallList.append(newGeneCall)
+        self.geneCallList.AppendCall(newGeneCall)
         self.UpdateGeneCount()
         return
 
+    # Split this call set into one GeneCallSet per contig, keyed by contig name; row order is preserved
+    # Each run of consecutive rows on the same contig (one run per contig, once sorted) is copied as a slice
+    def PartitionByContig(self):
+
+        partitions = {}  # contig name => GeneCallSet
+        table = self.geneCallList
+        start = 0
+        while start < len(table):
+            contigId = table.contigId[start]
+            end = start + 1
+            while end < len(table) and table.contigId[end] == contigId:
+                end += 1
+            contig = table.contigNames[contigId]
+            if contig not in partitions:
+                partitions[contig] = GeneCallSet()
+                partitions[contig].geneCaller  = self.geneCaller
+                partitions[contig].sectionName = self.sectionName
+            partitions[contig].geneCallList.AppendTableRows(table,start,end)
+            start = end
+        for callSet in partitions.values():
+            callSet.UpdateGeneCount()
+        return partitions
+
+    # Returns a GeneCallSet holding only this set's calls on the named contigs, in their present order
+    def SelectContigs(self,contigs):
+
+        contigs = set(contigs)
+        selected = GeneCallSet()
+        selected.geneCaller  = self.geneCaller
+        selected.sectionName = self.sectionName
+        table = self.geneCallList
+        start = 0
+        while start < len(table):
+            end = start + 1
+            while end < len(table) and table.contigId[end] == table.contigId[start]:
+                end += 1
+            if table.contigNames[table.contigId[start]] in contigs:
+                selected.geneCallList.AppendTableRows(table,start,end)
+            start = end
+        selected.UpdateGeneCount()
+        return selected
+
+    # Load all gene calls in the file, reading it once (see ReadGeneCallSets())
+    # A file holding sections from different callers is loaded as a whole, with a warning; use
+    # ReadGeneCallSets() to obtain one GeneCallSet per section
     def AddGeneCalls(self,GENE_FILE_HANDLE):
 
-        fLines = GENE_FILE_HANDLE.read().splitlines()
-        for line in fLines:
-            match_caller = re.search(p_caller,line)
-            if match_caller:
-                caller = match_caller.group(1).lower()
-                match_callerName = re.search(p_callerName,caller)
-                if match_callerName:
-                    self.geneCaller = caller 
-                    self.GetGeneCalls(fLines,caller)
-                else:
-                    print "ERROR: gene caller not recognized in geneCall.GeneCallSet,", caller, line
+        for callSet in ReadGeneCallSets(GENE_FILE_HANDLE):
+            if self.geneCaller == "":
+                self.geneCaller  = callSet.geneCaller
+                self.sectionName = callSet.sectionName
+            elif callSet.geneCaller != self.geneCaller:
+                print "WARNING: gene calls from", callSet.geneCaller, "added to", self.geneCaller, "call set; use CGC_geneCall.ReadGeneCallSets() to separate sections"
+            if len(self.geneCallList) == 0 and not self.geneCallList.frozen:
+                self.geneCallList = callSet.geneCallList
+            else:
+                for i in xrange(0,len(callSet.geneCallList)):
+                    self.geneCallList.AppendTableRow(callSet.geneCallList,i)
+        self.UpdateGeneCount()
+        return
+
+    # Load calls parsed from a gene caller's raw output, i.e., (geneNo,strand,leftEnd,rightEnd,length,contig)
+    # tuples from CGC_parser.Parse(), with no intermediate normalized file
+    def AddParsedCalls(self,geneCaller,sourceName,calls):
+
+        self.geneCaller  = geneCaller
+        self.sectionName = "taken from file " + sourceName
+        for geneNumber, strand, leftEnd, rightEnd, geneLength, contig in calls:
+            self.geneCallList.AppendRow(geneNumber,strand,leftEnd,rightEnd,geneLength,contig,geneCaller)
+        self.UpdateGeneCount()
         return
 
     # Determine which of 2 gene calls occurs first along the sequence (left to right, regardless of orientation) 
@@ -142,17 +478,83 @@ class GeneCallSet(object):
         # If you're still here, then gene1 > gene2
         return False 
  
-    def SortGeneCalls(self):
+    # Compute integer (contig, leftEnd, rightEnd, strand) keys once per gene call
+    # Contig names are replaced by their rank, so keys order calls by contig name, then by position
+    def GetSortKeys(self):
+
+        return self.geneCallList.GetSortKeys()
+
+    # Fast check, so that input that is already in order is not sorted again
+    def IsSorted(self,keys):
+
+        for i in xrange(1,len(keys)):
+            if keys[i] < keys[i-1]:
+                return False
+        return True
+
+    def SortGeneCalls(self,mode=SORT_KEYED):
+
+        if mode == SORT_INSERTION:
+            self.InsertionSortGeneCalls()
+            return
+
+        # A table loaded from a sorted binary call file needs no check
+        if self.geneCallList.sorted:
+            return
+
+        # Parse keys once, then apply a stable sort (calls with identical keys keep their input order)
+        keys = self.GetSortKeys()
+        if not self.IsSorted(keys):
+            order = sorted(xrange(len(keys)), key=keys.__getitem__)
+            self.geneCallList.Reorder(order)
+        self.geneCallList.sorted = True
+        return
+
+    # Original sort, O(n^2) on input that is not nearly sorted; sorts on position only (see IsLesser)
+    def InsertionSortGeneCalls(self):
 
-        # Use insertion sort because it is fast when the list is nearly sorted to begin with 
         # Sort from lowest start position to highest; sort on end position if starts are equal
-        for index in xrange(0,len(self.geneCallList)-1):
-            currentValue = self.geneCallList[index]
+        geneCalls = list(self.geneCallList)
+        for index in xrange(1,len(geneCalls)):
+            currentValue = geneCalls[index]
             position = index
-            while (position > 0) and self.IsLesser(currentValue,self.geneCallList[position-1]):
-                self.geneCallList[position] = self.geneCallList[position-1]
+            while (position > 0) and self.IsLesser(currentValue,geneCalls[position-1]):
+                geneCalls[position] = geneCalls[position-1]
                 position = position - 1
-            self.geneCallList[position] = currentValue
+            geneCalls[position] = currentValue
+        self.geneCallList = GeneCallTable()
+        for geneCall in geneCalls:
+            self.geneCallList.AppendCall(geneCall)
+        return
+
+    # Write the call set as a binary call file (see Programmer's Notes) to OUT, opened in binary mode
+    # The set must hold a single caller's calls; sort it first (SortGeneCalls()) for the fastest load
+    def WriteBinary(self,OUT):
+
+        table = self.geneCallList
+        if len(table.callerNames) > 1:
+            raise ValueError("A binary call file holds a single caller's calls; found: " + ', '.join(table.callerNames))
+        flags = 0
+        if table.sorted:
+            flags |= BINARY_SORTED
+        names = [self.geneCaller, self.sectionName, None] + table.contigNames
+        header = [struct.pack('<4sII',BINARY_MAGIC,BINARY_VERSION,flags)]
+        for name in names:
+            if name is None:  # contig count precedes the contig names
+                header.append(struct.pack('<I',len(table.contigNames)))
+                continue
+            if isinstance(name,unicode):
+                name = name.encode('utf-8')
+            header.append(struct.pack('<I',len(name)) + name)
+        header.append(struct.pack('<I',len(table)))
+        header = ''.join(header)
+        OUT.write(header + '\0' * (-len(header) % 8))
+        for column in BINARY_COLUMNS:
+            data = array.array('i',getattr(table,column))
+            if sys.byteorder == 'big':
+                data.byteswap()
+            OUT.write(data.tostring())
+        OUT.write(table.strand.tostring())
         return
 
     def PrintAll(self):
@@ -170,3 +572,247 @@ class GeneCallSet(object):
         return
 
 
+
+# Read a normalized gene call file in a single pass, returning one GeneCallSet per section
+# Each "# <caller> gene calls" header line starts a section, so that one file may bundle several callers,
+# or several genomes or contigs, each under its own header. A "# END" line closes the current section;
+# data lines outside any section, or in a section whose caller is not recognized, are skipped
+def ReadGeneCallSets(GENE_FILE_HANDLE):
+    callSets = []
+    callSet  = None  # GeneCallSet of the current section
+    for line in GENE_FILE_HANDLE:
+        if line.startswith('#'):
+            match_caller = re.search(p_caller,line)
+            if match_caller:
+                caller = match_caller.group(1).lower()
+                match_callerName = re.search(p_callerName,caller)
+                if match_callerName:
+                    callSet = GeneCallSet()
+                    callSet.geneCaller  = caller
+                    callSet.sectionName = re.search(p_section,line).group(1).strip()
+                    callSets.append(callSet)
+                else:
+                    print "ERROR: gene caller not recognized in geneCall.ReadGeneCallSets,", caller, line
+                    callSet = None
+            elif re.search(p_end,line):
+                callSet = None
+            continue
+        if callSet is not None:
+            match_data = re.search(p_dataLine,line)
+            if match_data:
+                callSet.geneCallList.AppendRow(match_data.group(1),match_data.group(2),match_data.group(3),
+                                               match_data.group(4),match_data.group(5),match_data.group(6),
+                                               callSet.geneCaller)
+    for callSet in callSets:
+        callSet.UpdateGeneCount()
+    return callSets
+
+# Reads a normalized gene call file one line at a time, for comparisons whose memory use must not grow
+# with the size of the input (see CGC_compare.Comparison.CompareStreams()). The file's gene calls must
+# be sorted in SortKey() order: by contig, leftEnd, rightEnd, then strand ('+' before '-')
+class GeneCallStream(object):
+
+    def __init__(self,GENE_FILE_HANDLE):
+        self.fileHandle = GENE_FILE_HANDLE
+        self.geneCaller = ""
+        self.geneCount  = 0
+        self.firstLine  = None  # a data line read while looking for the header, if the file has no header
+        self.ReadHeader()
+
+    # Read up to the "<caller> gene calls" comment, so that the caller is known before any calls are read
+    def ReadHeader(self):
+        for line in self.fileHandle:
+            match_caller = re.search(p_caller,line)
+            if match_caller:
+                caller = match_caller.group(1).lower()
+                match_callerName = re.search(p_callerName,caller)
+                if match_callerName:
+                    self.geneCaller = caller
+                    return
+                else:
+                    print "ERROR: gene caller not recognized in geneCall.GeneCallStream,", caller, line
+            elif re.search(p_dataLine,line):
+                self.firstLine = line
+                return
+        return
+
+    # Yield (sort key, streamIndex, line number, GeneCall) tuples in file order, ready for heapq.merge()
+    # Raises ValueError if the file is not in SortKey() order
+    def IterKeyed(self,streamIndex=0):
+        lines = self.fileHandle
+        if self.firstLine is not None:
+            lines = itertools.chain([self.firstLine],self.fileHandle)
+        previousKey = None
+        for line in lines:
+            match_data = re.search(p_dataLine,line)
+            if match_data:
+                geneNumber = int(match_data.group(1))
+                strand     = match_data.group(2)
+                leftEnd    = int(match_data.group(3))
+                rightEnd   = int(match_data.group(4))
+                geneLength = int(match_data.group(5))
+                contig     = match_data.group(6)
+                key = (contig, leftEnd, rightEnd, STRAND_RANK.get(strand,2))
+                if previousKey is not None and key < previousKey:
+                    raise ValueError("gene calls from " + self.geneCaller + " are not sorted by contig, leftEnd, rightEnd, strand: " + line.rstrip())
+                previousKey = key
+                self.geneCount += 1
+                newGeneCall = FrozenGeneCall(self.geneCaller + '_' + str(geneNumber),self.geneCaller,geneNumber,
+                                             strand,leftEnd,rightEnd,geneLength,contig)
+                yield key, streamIndex, self.geneCount, newGeneCall
+        return
+
+# True if fileName is a binary call file (see GeneCallSet.WriteBinary())
+def IsBinaryFile(fileName):
+    BINARY_FILE = open(fileName,"rb")
+    magic = BINARY_FILE.read(len(BINARY_MAGIC))
+    BINARY_FILE.close()
+    return magic == BINARY_MAGIC
+
+# Returns the numpy module, or None if it is not installed; numpy is imported only when a binary call file
+# is loaded, since importing it takes longer than a small comparison
+def GetNumpy():
+    global numpy
+    if numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None  # binary call files are then read into arrays rather than memory-mapped
+    return numpy
+
+# Load a binary call file as a GeneCallSet; its columns are mapped from the file when numpy is
+# installed, so loading takes time independent of the number of calls
+def ReadBinaryGeneCallSet(fileName):
+
+    BINARY_FILE = open(fileName,"rb")
+    try:
+        data = mmap.mmap(BINARY_FILE.fileno(),0,access=mmap.ACCESS_READ)
+    finally:
+        BINARY_FILE.close()
+    magic, version, flags = struct.unpack_from('<4sII',data,0)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a version " + str(BINARY_VERSION) + " binary call file: " + fileName)
+    offset = struct.calcsize('<4sII')
+    names = []
+    for i in xrange(0,2):
+        size, = struct.unpack_from('<I',data,offset); offset += 4
+        names.append(data[offset:offset + size]); offset += size
+    contigCount, = struct.unpack_from('<I',data,offset); offset += 4
+    contigNames = []
+    for i in xrange(0,contigCount):
+        size, = struct.unpack_from('<I',data,offset); offset += 4
+        contigNames.append(data[offset:offset + size]); offset += size
+    rowCount, = struct.unpack_from('<I',data,offset); offset += 4
+    offset += -offset % 8
+
+    callSet = GeneCallSet()
+    callSet.geneCaller, callSet.sectionName = names
+    table = callSet.geneCallList
+    if callSet.geneCaller != "" or rowCount > 0:  # every row's callerId is 0: the caller is interned even if unnamed
+        table.InternCaller(callSet.geneCaller)
+    for contig in contigNames:
+        table.InternContig(contig)
+    if rowCount > 0 and GetNumpy() is not None:
+        columns = numpy.memmap(fileName,dtype=numpy.uint8,mode='r')
+        for column in BINARY_COLUMNS:
+            setattr(table,column,columns[offset:offset + 4 * rowCount].view('<i4'))
+            offset += 4 * rowCount
+        table.strand = columns[offset:offset + rowCount].view('S1')
+        table.mapped = True
+    else:
+        for column in BINARY_COLUMNS:
+            values = array.array('i',data[offset:offset + 4 * rowCount])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            setattr(table,column,values)
+            offset += 4 * rowCount
+        table.strand = array.array('c',data[offset:offset + rowCount])
+    data.close()
+    table.callerId = array.array('H',[0]) * rowCount
+    table.sorted = bool(flags & BINARY_SORTED)
+    callSet.UpdateGeneCount()
+    return callSet
+
+##### CONTIG INDEX
+
+# Write the contig index of a call file: index lists (contig, byte offset, byte length, calls) per contig
+def WriteContigIndex(fileName,index):
+    tempFile = fileName + CONTIG_INDEX_SUFFIX + ".tmp"
+    INDEX = open(tempFile,"w")
+    INDEX.write("# CGC contig index %d %d\n" % (CONTIG_INDEX_VERSION,os.path.getsize(fileName)))
+    for contig, offset, length, count in index:
+        INDEX.write("%s\t%d\t%d\t%d\n" % (contig,offset,length,count))
+    INDEX.close()
+    os.rename(tempFile,fileName + CONTIG_INDEX_SUFFIX)
+    return
+
+# Returns the contig index of a call file, as a list of (contig, byte offset, byte length, calls) in file
+# order, or None if the file has no index, or has changed since it was indexed
+def ReadContigIndex(fileName):
+    try:
+        INDEX = open(fileName + CONTIG_INDEX_SUFFIX,"r")
+    except IOError:
+        return None
+    fields = INDEX.readline().split()
+    if len(fields) != 6 or fields[4] != str(CONTIG_INDEX_VERSION) or fields[5] != str(os.path.getsize(fileName)):
+        INDEX.close()
+        return None
+    index = []
+    for line in INDEX:
+        contig, offset, length, count = line.rstrip('\n').split('\t')
+        index.append((contig,int(offset),int(length),int(count)))
+    INDEX.close()
+    return index
+
+# Rewrite a call file so that each contig's calls form one block, if a contig's calls are found in more
+# than one place; index lists the file's blocks, as from CGC_parser.WriteCalls(). Contigs keep the order of
+# their first block. Returns the index of the file as rewritten (or as it was, if no rewrite was needed)
+def GroupByContig(fileName,index):
+    blocks = {}; contigs = []
+    for contig, offset, length, count in index:
+        if contig not in blocks:
+            blocks[contig] = []
+            contigs.append(contig)
+        blocks[contig].append((offset,length,count))
+    if len(contigs) == len(index):
+        return index
+    tempFile = fileName + ".grouped.tmp"
+    INFILE = open(fileName,"rb"); OUT = open(tempFile,"wb")
+    OUT.write(INFILE.read(index[0][1]))  # header
+    newIndex = []; offset = index[0][1]
+    for contig in contigs:
+        start = offset; calls = 0
+        for blockOffset, length, count in blocks[contig]:
+            INFILE.seek(blockOffset)
+            while length > 0:
+                data = INFILE.read(min(length,COPY_BLOCK))
+                OUT.write(data)
+                length -= len(data); offset += len(data)
+            calls += count
+        newIndex.append((contig,start,offset - start,calls))
+    INFILE.seek(index[-1][1] + index[-1][2])
+    OUT.write(INFILE.read())  # the lines after the last call
+    INFILE.close(); OUT.close()
+    os.rename(tempFile,fileName)
+    return newIndex
+
+# Read the calls on the named contigs from an indexed call file, seeking to each contig's block, so that
+# the rest of the file is not read. Returns a list of GeneCallSet, as ReadGeneCallSets() does, or None if
+# the file has no (current) contig index
+def ReadContigCallSets(fileName,contigs):
+    index = ReadContigIndex(fileName)
+    if index is None:
+        return None
+    contigs = set(contigs)
+    INFILE = open(fileName,"rb")
+    if index:
+        lines = INFILE.read(index[0][1]).splitlines(True)  # the caller's header
+    else:
+        lines = INFILE.read().splitlines(True)
+    for contig, offset, length, count in index:
+        if contig in contigs:
+            INFILE.seek(offset)
+            lines.extend(INFILE.read(length).splitlines(True))
+    INFILE.close()
+    lines.append("# END\n")
+    return ReadGeneCallSets(lines)
@@ -0,0 +1,189 @@
+###################################################################################################
+#
+# Module:  CGC_grid.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module containing the writer for the gene call grid, the main output of a
+#    comparison: one row per unique gene call, with each caller's matching call in that caller's
+#    columns. Rows are built with join() from a precomputed caller => column map, and written in
+#    batches to a file or stream, optionally gzip-compressed.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: tsv and csv grids write every call of a caller that has several calls in a row
+#    16 Oct 2026: rows split into lines per call only in layered grids (matching not exact); exact grids as original
+#
+# Programmer's Notes:
+#    Grid formats:
+#        tsv:  the original grid: "count", then caller, strand, leftEnd, rightEnd, length and
+#              contig for each caller; a caller that did not make the call has empty columns. When
+#              matching is not exact (layered), a caller may have several calls in one row of the
+#              grid: the row is then written as several lines with the same count, one per call of
+#              that caller. With exact matching, a row is always one line: a caller's identical
+#              calls (duplicates in its input) fill its columns once, as in the original grid
+#        csv:  the same grid, comma separated (quoted where needed), with one column per caller
+#              and field, e.g., "prodigal_leftEnd"; the caller name columns are omitted
+#        long: sparse: one row per gene call, "call" (the grid row number), caller, strand,
+#              leftEnd, rightEnd, length and contig
+#
+# Classes and Methods:
+#    GridWriter(callerList,OUT,gridFormat,layered)
+#        WriteHeader()
+#        WriteCalls(count,geneCalls)
+#        WriteComparison(comparison)
+#        WriteRow(count,calls)
+#        AddLine(count,layer)
+#        GetLayers(calls)
+#        Flush()
+#    OpenReport(fileName,compress)
+#    WriteComments(text,OUT)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import csv
+import gzip
+
+##### GRID FORMATS
+
+GRID_TSV     = 'tsv'
+GRID_CSV     = 'csv'
+GRID_LONG    = 'long'
+GRID_FORMATS = (GRID_TSV, GRID_CSV, GRID_LONG)
+
+##### CONSTANTS
+
+WRITE_BATCH  = 10000    # rows are written in batches of this many rows
+WRITE_BUFFER = 1 << 20  # bytes of buffering for report files
+FIELDS       = ("strand","leftEnd","rightEnd","length","contig")
+EMPTY_CELL   = "\t\t\t\t\t\t"
+
+class GridWriter(object):
+
+    # layered: a caller may have several different calls in one row (matching is not exact; see WriteRow())
+    def __init__(self,callerList,OUT=None,gridFormat=GRID_TSV,layered=False):
+        if gridFormat not in GRID_FORMATS:
+            raise ValueError("unknown grid format: " + str(gridFormat))
+        if OUT is None:
+            OUT = sys.stdout
+        self.callerList   = callerList
+        self.callerColumn = dict([(caller,i) for i, caller in enumerate(callerList)])  # caller => column block
+        self.OUT          = OUT
+        self.gridFormat   = gridFormat
+        self.layered      = layered
+        self.rows         = []  # formatted rows (csv: lists of fields) not yet written
+        if gridFormat == GRID_CSV:
+            self.csvWriter = csv.writer(OUT,lineterminator="\n")
+
+    def WriteHeader(self):
+        if self.gridFormat == GRID_TSV:
+            self.OUT.write("count\t" + "caller\tstrand\tleftEnd\trightEnd\tlength\tcontig\t" * len(self.callerList) + "\n")
+        elif self.gridFormat == GRID_CSV:
+            self.csvWriter.writerow(["count"] + [caller + '_' + field for caller in self.callerList for field in FIELDS])
+        else:
+            self.OUT.write("call\tcaller\tstrand\tleftEnd\trightEnd\tlength\tcontig\n")
+        return
+
+    # Add grid row count, for calls given as (caller, strand, leftEnd, rightEnd, length, contig) tuples
+    # If a caller has more than one call in the row of a layered grid (matching is not exact), the tsv and
+    # csv grids get one line per call of that caller, each with the same count (see GetLayers()); otherwise
+    # a caller's last call fills its columns. The long format lists every call
+    def WriteRow(self,count,calls):
+        if self.gridFormat == GRID_LONG:
+            for call in calls:
+                self.rows.append("%s\t%s\t%s\t%s\t%s\t%s\t%s\n" % ((count,) + call))
+        elif self.layered:
+            for layer in self.GetLayers(calls):
+                self.AddLine(count,layer)
+        elif self.gridFormat == GRID_TSV:
+            cells = [EMPTY_CELL] * len(self.callerList)
+            for call in calls:
+                cells[self.callerColumn[call[0]]] = "%s\t%s\t%s\t%s\t%s\t%s\t" % call
+            self.rows.append(str(count) + " \t" + ''.join(cells) + "\n")
+        else:
+            row = [count] + [''] * (len(FIELDS) * len(self.callerList))
+            for call in calls:
+                start = 1 + len(FIELDS) * self.callerColumn[call[0]]
+                row[start:start + len(FIELDS)] = call[1:]
+            self.rows.append(row)
+        if len(self.rows) >= WRITE_BATCH:
+            self.Flush()
+        return
+
+    # Add one tsv or csv line of grid row count, for a layer of (column block, call) pairs (see GetLayers())
+    def AddLine(self,count,layer):
+        if self.gridFormat == GRID_TSV:
+            cells = [EMPTY_CELL] * len(self.callerList)
+            for column, call in layer:
+                cells[column] = "%s\t%s\t%s\t%s\t%s\t%s\t" % call
+            self.rows.append(str(count) + " \t" + ''.join(cells) + "\n")
+        else:
+            row = [count] + [''] * (len(FIELDS) * len(self.callerList))
+            for column, call in layer:
+                start = 1 + len(FIELDS) * column
+                row[start:start + len(FIELDS)] = call[1:]
+            self.rows.append(row)
+        return
+
+    # Split the calls of a grid row into lines of (column block, call) pairs, at most one call per caller
+    # in each line: a caller's first call goes in the first line, its second call in the second, and so on
+    def GetLayers(self,calls):
+        layers = [[]]; layerColumns = [set()]
+        for call in calls:
+            column = self.callerColumn[call[0]]
+            layer = 0
+            while layer < len(layers) and column in layerColumns[layer]:
+                layer += 1
+            if layer == len(layers):
+                layers.append([]); layerColumns.append(set())
+            layers[layer].append((column,call))
+            layerColumns[layer].add(column)
+        return layers
+
+    # Add grid row count, for a list of CGC_geneCall.GeneCall objects
+    def WriteCalls(self,count,geneCalls):
+        self.WriteRow(count,[(geneCall.geneCaller,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,
+                              geneCall.geneLength,geneCall.contig) for geneCall in geneCalls])
+        return
+
+    # Add a row for each unique gene call of a CGC_compare.Comparison, in order, reading the calls
+    # straight from the callers' table columns; returns the number of rows
+    def WriteComparison(self,comparison):
+        tables = comparison.callSets
+        tableIndex = comparison.mergeList.tableIndex; rows = comparison.mergeList.row
+        groups = comparison.uniqueList
+        for groupIndex in xrange(0,len(groups)):
+            start = groups.starts[groupIndex]
+            calls = []
+            for i in xrange(start,start + groups.GetGroupSize(groupIndex)):
+                table = tables[tableIndex[i]]; row = rows[i]
+                calls.append((table.callerNames[table.callerId[row]],table.strand[row],table.leftEnd[row],
+                              table.rightEnd[row],table.geneLength[row],table.contigNames[table.contigId[row]]))
+            self.WriteRow(groupIndex + 1,calls)
+        self.Flush()
+        return len(groups)
+
+    def Flush(self):
+        if self.gridFormat == GRID_CSV:
+            self.csvWriter.writerows(self.rows)
+        else:
+            self.OUT.write(''.join(self.rows))
+        self.rows = []
+        return
+
+# Open a report file for writing, with a large buffer, or gzip-compressed if compress is True
+def OpenReport(fileName,compress=False):
+    if compress:
+        return gzip.open(fileName,"wb")
+    return open(fileName,"w",WRITE_BUFFER)
+
+# Write text to OUT as comment lines ("# " prefix), e.g., report statistics ahead of a CSV grid
+def WriteComments(text,OUT=None):
+    if OUT is None:
+        OUT = sys.stdout
+    OUT.write(''.join(["# " + line + "\n" for line in text.splitlines()]))
+    return
@@ -0,0 +1,233 @@
+###################################################################################################
+#
+# Module:  CGC_input.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module for reading input files that may be compressed: gene caller outputs and
+#    normalized call files stored as .gz or .zst files are read line by line, as they are
+#    decompressed, with no decompressed copy on disk or in memory. Decompression runs in a
+#    background thread (or, for .zst without the zstandard module, in a zstd process), so that
+#    it overlaps the parsing of the lines already decompressed.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: GetChunks() reads CHUNK_SIZE when called, so that it may be changed (e.g., by tests)
+#
+# Programmer's Notes:
+#    Compression is recognized by the file's first bytes, not by its name. A gzip file may hold
+#    several members (e.g., concatenated, or bgzip), which are read in turn. Reading .zst files
+#    requires the zstandard module, or else the zstd command on the PATH.
+#    The reader is an iterator over lines, as a file is: iteration may stop, and resume later
+#    where it stopped (see CGC_geneCall.GeneCallStream). Lines keep their line endings.
+#    The background thread reads ahead at most QUEUE_BLOCKS blocks, which bounds memory use.
+#
+# Classes and Methods:
+#    DecompressingReader(fileName,compression)
+#        next()
+#        close()
+#
+# Functions:
+#    GetCompression(fileName)
+#    StripCompressionSuffix(fileName)
+#    OpenInput(fileName)
+#    GetChunks(fileName,chunkSize)
+#    ReadChunk(fileName,start,end)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import zlib
+import Queue
+import threading
+import subprocess
+try:
+    import zstandard  # optional: .zst files are otherwise decompressed by the zstd command
+except ImportError:
+    zstandard = None
+
+##### CONSTANTS
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+MAGIC = ((COMPRESSION_GZIP, "\x1f\x8b"), (COMPRESSION_ZSTD, "\x28\xb5\x2f\xfd"))
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+ZSTD_COMMAND = "zstd"
+
+READ_BLOCK   = 1 << 20   # bytes of compressed input read at a time
+QUEUE_BLOCKS = 8         # decompressed blocks read ahead by the background thread
+CHUNK_SIZE   = 16 << 20  # bytes of an uncompressed file per chunk, for parsing in parallel (see GetChunks())
+
+##### FUNCTIONS
+
+# Returns COMPRESSION_GZIP or COMPRESSION_ZSTD if the file is compressed, otherwise None
+def GetCompression(fileName):
+    INFILE = open(fileName,"rb")
+    start = INFILE.read(4)
+    INFILE.close()
+    for compression, magic in MAGIC:
+        if start.startswith(magic):
+            return compression
+    return None
+
+# The file name without its compression suffix, if any (e.g., "x.genes.sco.gz" => "x.genes.sco")
+def StripCompressionSuffix(fileName):
+    for suffix in COMPRESSED_SUFFIXES:
+        if fileName.endswith(suffix):
+            return fileName[:-len(suffix)]
+    return fileName
+
+# Open an input file for reading lines, decompressing it if it is compressed
+# Raises IOError if the file cannot be opened, or is compressed in a way that cannot be read here
+def OpenInput(fileName):
+    compression = GetCompression(fileName)
+    if compression is None:
+        return open(fileName,"r")
+    return DecompressingReader(fileName,compression)
+
+# Yield the decompressed blocks of a gzip file, which may hold several members
+def IterGzipBlocks(RAW):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = RAW.read(READ_BLOCK)
+    while data:
+        block = decompressor.decompress(data)
+        if block:
+            yield block
+        data = decompressor.unused_data
+        if data:  # the next member begins in this block
+            block = decompressor.flush()
+            if block:
+                yield block
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            data = RAW.read(READ_BLOCK)
+    block = decompressor.flush()
+    if block:
+        yield block
+    return
+
+def IterZstdBlocks(RAW):
+    decompressor = zstandard.ZstdDecompressor()
+    try:
+        reader = decompressor.stream_reader(RAW,read_across_frames=True)
+    except TypeError:  # zstandard versions before 0.18 stop at the end of the first frame
+        reader = decompressor.stream_reader(RAW)
+    block = reader.read(READ_BLOCK)
+    while block:
+        yield block
+        block = reader.read(READ_BLOCK)
+    return
+
+def IterBlocks(RAW):
+    block = RAW.read(READ_BLOCK)
+    while block:
+        yield block
+        block = RAW.read(READ_BLOCK)
+    return
+
+# Reads the lines of a compressed file; blocks are decompressed in a background thread, into a bounded queue
+class DecompressingReader(object):
+
+    def __init__(self,fileName,compression):
+        self.fileName = fileName
+        self.process  = None
+        if compression == COMPRESSION_GZIP:
+            self.RAW = open(fileName,"rb")
+            blocks = IterGzipBlocks(self.RAW)
+        elif zstandard is not None:
+            self.RAW = open(fileName,"rb")
+            blocks = IterZstdBlocks(self.RAW)
+        else:
+            try:
+                self.process = subprocess.Popen([ZSTD_COMMAND,"-dc",fileName],stdout=subprocess.PIPE)
+            except OSError:
+                raise IOError("cannot read " + fileName + ": install the zstandard module, or the zstd command, to read .zst files")
+            self.RAW = self.process.stdout
+            blocks = IterBlocks(self.RAW)
+        self.queue   = Queue.Queue(QUEUE_BLOCKS)
+        self.stopped = False
+        self.lines   = []  # decompressed lines not yet returned, in reverse order
+        self.partial = ""  # the start of a line continued in the next block
+        self.done    = False
+        self.thread  = threading.Thread(target=self.Decompress,args=(blocks,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    # Runs in the background thread: queue each decompressed block, then None at the end of the file,
+    # or the exception that ended decompression
+    def Decompress(self,blocks):
+        try:
+            for block in blocks:
+                if self.stopped:
+                    return
+                self.queue.put(block)
+            self.queue.put(None)
+        except Exception as e:
+            self.queue.put(e)
+        return
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        while not self.lines:
+            if self.done:
+                raise StopIteration
+            block = self.queue.get()
+            if isinstance(block,Exception):
+                self.done = True
+                raise IOError("cannot decompress " + self.fileName + ": " + str(block))
+            if block is None:
+                self.done = True
+                if self.partial:
+                    self.lines = [self.partial]; self.partial = ""
+                continue
+            lines = (self.partial + block).split('\n')
+            self.partial = lines.pop()
+            lines.reverse()
+            self.lines = [line + '\n' for line in lines]
+        return self.lines.pop()
+
+    def close(self):
+        self.stopped = True
+        while self.thread.is_alive():  # let the thread see that reading has stopped
+            try:
+                self.queue.get(True,0.1)
+            except Queue.Empty:
+                pass
+        self.RAW.close()
+        if self.process is not None:
+            self.process.wait()
+        return
+
+# Split an uncompressed file into (start, end) byte ranges of about chunkSize bytes (default CHUNK_SIZE), each ending at a line end
+def GetChunks(fileName,chunkSize=None):
+    if chunkSize is None:  # CHUNK_SIZE as it is now, not as it was when this module was loaded
+        chunkSize = CHUNK_SIZE
+    fileSize = os.path.getsize(fileName)
+    chunks = []
+    INFILE = open(fileName,"rb")
+    start = 0
+    while start < fileSize:
+        INFILE.seek(min(start + chunkSize,fileSize))
+        INFILE.readline()  # to the end of the line
+        end = min(INFILE.tell(),fileSize)
+        chunks.append((start,end))
+        start = end
+    INFILE.close()
+    return chunks
+
+# Returns the lines of bytes start to end of a file (see GetChunks())
+def ReadChunk(fileName,start,end):
+    INFILE = open(fileName,"rb")
+    INFILE.seek(start)
+    lines = INFILE.read(end - start).split('\n')
+    INFILE.close()
+    last = lines.pop()  # empty, unless the chunk ends the file without a line end
+    lines = [line + '\n' for line in lines]
+    if last:
+        lines.append(last)
+    return lines
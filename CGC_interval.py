@@ -0,0 +1,102 @@
+###################################################################################################
+#
+# Module:  CGC_interval.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module containing an interval index over gene calls, used by CGC_compare.py to
+#    match calls that are not identical: calls that share a stop codon but differ in start, and
+#    calls whose extents overlap by at least a given fraction of both calls' lengths.
+#
+# Updates:
+#    16 Oct 2026: begin
+#
+# Programmer's Notes:
+#    Intervals are kept per (contig, strand), since only calls on the same contig and strand can
+#    match. Same-stop matches are found by sorting on the stop position; overlap matches by a
+#    sweep over intervals sorted by left end, keeping the intervals still open in a heap ordered
+#    by right end. Both run in O((n + matches) log n), where matches counts the pairs of calls
+#    that overlap at all (gene calls from a single caller rarely overlap more than a few others).
+#
+# Classes and Methods:
+#    IntervalIndex()
+#        AddInterval(contig,strand,leftEnd,rightEnd,intervalId)
+#        IterSameStop()
+#        IterOverlaps(minOverlap)
+#    UnionFind(size)
+#        Find(item)
+#        Union(item1,item2)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import array
+import heapq
+
+class IntervalIndex(object):
+
+    def __init__(self):
+        self.intervals = {}  # (contig, strand) => list of (leftEnd, rightEnd, intervalId)
+
+    def AddInterval(self,contig,strand,leftEnd,rightEnd,intervalId):
+        key = (contig,strand)
+        if key not in self.intervals:
+            self.intervals[key] = []
+        self.intervals[key].append((leftEnd,rightEnd,intervalId))
+        return
+
+    # Yield (intervalId1, intervalId2) for each pair of consecutive intervals that share a stop position:
+    # the right end on the '+' strand, the left end on the '-' strand. Consecutive pairs suffice to join
+    # every interval with the same stop into one group (see UnionFind)
+    def IterSameStop(self):
+        for (contig, strand), intervals in sorted(self.intervals.items()):
+            if strand == '-':
+                stops = sorted([(leftEnd,intervalId) for leftEnd, rightEnd, intervalId in intervals])
+            else:
+                stops = sorted([(rightEnd,intervalId) for leftEnd, rightEnd, intervalId in intervals])
+            for i in xrange(1,len(stops)):
+                if stops[i][0] == stops[i-1][0]:
+                    yield stops[i-1][1], stops[i][1]
+        return
+
+    # Yield (intervalId1, intervalId2) for each pair of intervals whose overlap covers at least
+    # minOverlap (a fraction, 0 < minOverlap <= 1) of the length of each of the two intervals
+    def IterOverlaps(self,minOverlap):
+        for key, intervals in sorted(self.intervals.items()):
+            intervals = sorted(intervals)
+            active = []  # heap of (rightEnd, leftEnd, intervalId) for intervals that may still overlap
+            for leftEnd, rightEnd, intervalId in intervals:
+                while active and active[0][0] < leftEnd:
+                    heapq.heappop(active)  # ends before this interval (and every later one) begins
+                length = rightEnd - leftEnd + 1
+                for otherRight, otherLeft, otherId in active:
+                    overlap = min(rightEnd,otherRight) - leftEnd + 1  # otherLeft <= leftEnd
+                    if overlap >= minOverlap * length and overlap >= minOverlap * (otherRight - otherLeft + 1):
+                        yield otherId, intervalId
+                heapq.heappush(active,(rightEnd,leftEnd,intervalId))
+        return
+
+# Disjoint sets over the integers 0..size-1, for joining matched gene calls into groups
+class UnionFind(object):
+
+    def __init__(self,size):
+        self.parent = array.array('i',xrange(0,size))
+
+    def Find(self,item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:  # path compression
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    # Join the sets of item1 and item2; the smaller root becomes the root of the joined set
+    def Union(self,item1,item2):
+        root1 = self.Find(item1); root2 = self.Find(item2)
+        if root1 < root2:
+            self.parent[root2] = root1
+        elif root2 < root1:
+            self.parent[root1] = root2
+        return
@@ -1,171 +1,593 @@
-#!/usr/bin/env python
-
-################################################################
-#
-# CGC_main.py  # Compare Gene Calls Main
-#
-# Programmer: Carol Zhou
-#
-# Description:  Accepts a list of input files, each comprising a set of
-#    gene calls from a given gene caller program (e.g., Prodigal, Glimmer,
-#    GeneMark, PhATE).  Outputs comparisons accross the gene calls. 
-#    Note:  The input files are re-formatted using CGC_parser.py, so that
-#    they have a common format and identify the gene caller in the comments
-#    at the top of the file.
-#
-# Updates:
-#    17 May 2016: begin
-#    3 June 2016: adding CGC_geneCall.py
-#    21 June 2016: ready for code release
-#    6 July 2016: added RAST; added Prodigal gff; capturing contig when given
-#
-# Programmer's Notes:
-#
-################################################################
-
-# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
-# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
-
-import sys
-import os
-import re
-import string
-import copy
-from subprocess import call
-import CGC_geneCall
-import CGC_compare
-
-##### FILES
-
-CODE_BASE = "./CGC_main"
-CODE_FILE = CODE_BASE + ".py"
-LOG_FILE  = CODE_BASE + ".log"
-OUT_FILE  = CODE_BASE + ".out"
-
-infile = ""
-OUT = open(OUT_FILE,"w") 
-LOG = open(LOG_FILE,"w")
-
-##### PATTERNS
-
-p_comment  = re.compile('^#')
-p_order    = re.compile('Order')
-
-##### PRINT CONTROL 
-
-CHATTY = True  # This will print status as the code executes
-#CHATTY = False
-
-#DEBUG = True    # Print even more!
-DEBUG = False
-
-##### CONSTANTS
-
-HELP_STRING = "This code inputs a list of at least 2 files comprising gene calls (generated by a gene caller program) and outputs the genes that are in common and unique with respect to each caller.  Type: python " + CODE_FILE + " usage|input|detail for more information\n"
-
-USAGE_STRING = "Usage:  python " + CODE_FILE + " <infile>n\n"
-
-INPUT_STRING = "Input for " + CODE_FILE + " comprises a list of path/filenames comprising outputs generated by gene caller programs, with each separated by a single space. The output files are to have been prepared using code \"CGC_parser.py\" to assure that they have a common pre-defined format and indicate the name of the gene caller in the comments section.\nExample:  python " + CODE_FILE + " genemark.calls prodigal.calls\n"
-
-INFO_STRING = "This code currently supports the following gene callers:  GeneMark, Glimmer, Prodigal, RAST, and PhATE. For more information regarding input to " + CODE_FILE + ", type:  " + CODE_FILE + " input"
-
-##### GET INPUT PARAMETERS
-
-fileSet = []
-argCount = len(sys.argv)
-if argCount > 1:
-    match = re.search("help", sys.argv[1].lower())
-    if match:
-        print HELP_STRING
-        LOG.close(); exit(0)
-    match = re.search("input", sys.argv[1].lower())
-    if match:
-        print INPUT_STRING
-        LOG.close(); exit(0)
-    match = re.search("usage", sys.argv[1].lower())
-    if match:
-        print USAGE_STRING
-        LOG.close(); exit(0)
-    match = re.search("detail", sys.argv[1].lower())
-    if match:
-        print INFO_STRING
-        LOG.close(); exit(0)
-    match = re.search("info", sys.argv[1].lower())
-    if match:
-        print INFO_STRING
-        LOG.close(); exit(0)
-    else:
-        fileSet = sys.argv[1:]  # skip 0th element = name of code
-else:
-    LOG.write("%s\n" % ("Incorrect number of command-line arguments provided"))
-    print USAGE_STRING
-    LOG.close(); exit(0)
-
-##### BEGIN MAIN 
-
-count = 0
-callerList = []
-callSet_obj = CGC_geneCall.GeneCallSet()
-
-# For each user-provided gene call file, create a call set and add to list of call sets
-
-if CHATTY:
-    print "Main: Iterating through fileSet..."
-
-for geneFile in fileSet:
-    callSet = copy.deepcopy(callSet_obj)
-    geneFile_handle = open(geneFile,"r")
-    if CHATTY:
-        print "Adding Calls from file", geneFile
-    callSet.AddGeneCalls(geneFile_handle)
-    geneFile_handle.close()
-    callerList.append(callSet)
-
-if CHATTY:
-    print "Main: callerList is", 
-    for caller in callerList:
-        print caller.geneCaller, ', ',
-    print 
-
-# Check
-if DEBUG:
-    print "\n******************Original Lists:"
-    for caller in callerList:
-        caller.PrintAll()
-        print
-
-# Sort calls in each list
-
-if CHATTY:
-    print "Main: Sorting gene calls for each caller..."
-
-for caller in callerList:
-    caller.SortGeneCalls()
-
-# Check
-if DEBUG:
-    print "\n******************Sorted Lists:"
-    for caller in callerList:
-        caller.PrintAll()
-        print
-
-# Compare across the call sets
-
-if CHATTY:
-    print "Main: Comparing accross the call sets..."
-
-compareGCs = CGC_compare.Comparison()
-for caller in callerList:
-    compareGCs.Merge(caller.geneCallList)
-compareGCs.Compare()
-compareGCs.IdentifyCommonCore()
-compareGCs.PrintReport()
-
-# Check
-if DEBUG:
-    compareGCs.PrintAll()
-
-##### CLEAN UP
-
-OUT.close()
-LOG.close()
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_main.py  # Compare Gene Calls Main
+#
+# Programmer: Carol Zhou
+#
+# Description:  Accepts a list of input files, each comprising a set of
+#    gene calls from a given gene caller program (e.g., Prodigal, Glimmer,
+#    GeneMark, PhATE).  Outputs comparisons accross the gene calls. 
+#    Note:  The input files are re-formatted using CGC_parser.py, so that
+#    they have a common format and identify the gene caller in the comments
+#    at the top of the file.
+#
+# Updates:
+#    17 May 2016: begin
+#    3 June 2016: adding CGC_geneCall.py
+#    21 June 2016: ready for code release
+#    6 July 2016: added RAST; added Prodigal gff; capturing contig when given
+#    16 Oct 2026: added --stream option (bounded-memory comparison of sorted call files)
+#    16 Oct 2026: input files may hold several caller sections
+#    16 Oct 2026: added --workers=N option (per-contig comparison in a process pool)
+#    16 Oct 2026: added --outdir=DIR option; comparison is callable as RunComparison() (see CGC_batch.py)
+#    16 Oct 2026: added --match and --min-overlap options (same-stop and overlap matching)
+#    16 Oct 2026: raw gene caller outputs may be given as <caller>:<file>, parsed in-process by CGC_parser
+#    16 Oct 2026: binary call files (CGC_parser.py --binary) are loaded memory-mapped
+#    16 Oct 2026: added --cache=DIR and --cache-size=MB options (loaded and sorted call sets are cached)
+#    16 Oct 2026: added --subsets option (counts for every combination of callers; pairwise matrices)
+#    16 Oct 2026: added --stats option (per-caller and per-contig statistics as text, TSV and JSON)
+#    16 Oct 2026: added --grid=tsv|csv|long, --outfile and --gzip options (report format and destination)
+#    16 Oct 2026: added --save-state=DIR, --load-state=DIR and --remove-caller=NAME options (incremental comparison)
+#    16 Oct 2026: added --metrics and --profile=cprofile|memory options (phase timing and memory; CGC_profile.py)
+#    16 Oct 2026: input files may be compressed (.gz, .zst); with --workers, raw Prodigal GFF and RAST GFF3 outputs are parsed in parallel chunks
+#    16 Oct 2026: added --contigs option (compare selected contigs; indexed call files are read by contig)
+#    16 Oct 2026: unused imports removed; RunComparison() may be given a worker pool to reuse (see CGC_server.py)
+#    16 Oct 2026: added --backend=python|numpy option (numpy: calls merged and grouped as arrays; CGC_vector.py)
+#    16 Oct 2026: a refused or stopped streaming comparison records its error (Comparison.error) for its caller
+#    16 Oct 2026: parser, input, cache, state and profile modules imported only when used; runs are measured only with --metrics
+#    16 Oct 2026: --profile=memory (object census by type, peak RSS) replaces --profile=tracemalloc, which Python 2 lacks
+#
+# Programmer's Notes:
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import os
+import re
+from contextlib import contextmanager
+import CGC_geneCall
+import CGC_compare
+import CGC_grid
+# CGC_parser, CGC_input, CGC_cache, CGC_state and CGC_profile are imported where they are used, so that a
+# run that does not parse, cache, save or measure does not pay for loading them
+
+##### FILES
+
+CODE_BASE = "./CGC_main"
+CODE_FILE = CODE_BASE + ".py"
+LOG_FILE  = CODE_BASE + ".log"
+OUT_FILE  = CODE_BASE + ".out"
+SUBSET_COUNTS_FILE     = CODE_BASE + ".subsets.tsv"     # --subsets: UpSet-ready combination counts
+SUBSET_MEMBERSHIP_FILE = CODE_BASE + ".membership.tsv"  # --subsets: callers of each unique gene call (0/1)
+JACCARD_FILE           = CODE_BASE + ".jaccard.tsv"     # --subsets: pairwise Jaccard matrix
+AGREEMENT_FILE         = CODE_BASE + ".agreement.tsv"   # --subsets: pairwise agreement matrix
+STATS_TEXT_FILE        = CODE_BASE + ".stats.txt"       # --stats: caller and contig statistics, readable
+STATS_TSV_FILE         = CODE_BASE + ".stats.tsv"       # --stats: the same, one row per caller or contig
+STATS_JSON_FILE        = CODE_BASE + ".stats.json"      # --stats: the same, with length histograms
+METRICS_FILE           = CODE_BASE + ".metrics.json"    # --metrics: time, CPU and memory for each phase of the run
+
+##### PATTERNS
+
+p_comment  = re.compile('^#')
+p_order    = re.compile('Order')
+
+##### PRINT CONTROL 
+
+CHATTY = True  # This will print status as the code executes
+#CHATTY = False
+
+#DEBUG = True    # Print even more!
+DEBUG = False
+
+##### OPTIONS (given on the command line, prefixed with "--")
+
+STREAM  = False  # --stream: compare sorted call files line by line; memory use does not grow with input size
+WORKERS = 1      # --workers=N: compare contigs in parallel, in a pool of N processes
+OUT_DIR = ""     # --outdir=DIR: write the .log and .out files to DIR instead of the current directory
+MATCH_MODE  = CGC_compare.MATCH_EXACT          # --match=exact|same-stop|overlap: how gene calls are matched
+MIN_OVERLAP = CGC_compare.DEFAULT_MIN_OVERLAP  # --min-overlap=F: for --match=overlap, fraction of both calls' lengths
+CACHE_DIR   = ""  # --cache=DIR: keep loaded, sorted call sets in DIR, keyed by input content, for later runs
+GRID_FORMAT = CGC_grid.GRID_TSV  # --grid=tsv|csv|long: format of the gene call grid (see CGC_grid.py)
+OUTFILE     = False  # --outfile: write the report to OUT_FILE instead of standard out
+GZIP        = False  # --gzip: write the report to OUT_FILE, gzip-compressed (OUT_FILE + ".gz")
+STATS       = False  # --stats: write caller and contig statistics (see STATS_TEXT_FILE, etc.)
+SUBSETS     = False  # --subsets: write caller-combination counts and pairwise matrices (see SUBSET_COUNTS_FILE, etc.)
+CACHE_SIZE  = 1024  # --cache-size=MB (default: CGC_cache.DEFAULT_MAX_BYTES): least recently used entries are evicted beyond this
+SAVE_STATE  = ""  # --save-state=DIR: save the completed comparison in DIR (see CGC_state.py)
+LOAD_STATE  = ""  # --load-state=DIR: start from the comparison saved in DIR; input files add callers to it
+REMOVE_CALLERS = []  # --remove-caller=NAME: with --load-state, remove a caller from the saved comparison (repeatable)
+METRICS     = False  # --metrics: write wall time, CPU time, peak memory and item counts for each phase (see METRICS_FILE)
+PROFILE     = ""     # --profile=cprofile|memory: profile the run (see CGC_profile.py)
+CONTIGS     = []     # --contigs=NAME[,NAME...]: compare only the calls on these contigs
+BACKEND     = CGC_compare.BACKEND_PYTHON  # --backend=python|numpy: how calls are merged and grouped (see CGC_compare.NewComparison())
+
+##### CONSTANTS
+
+HELP_STRING = "This code inputs a list of at least 2 files comprising gene calls (generated by a gene caller program) and outputs the genes that are in common and unique with respect to each caller.  Type: python " + CODE_FILE + " usage|input|detail for more information\n"
+
+USAGE_STRING = "Usage:  python " + CODE_FILE + " [--stream] [--workers=N] [--outdir=DIR] [--match=exact|same-stop|overlap] [--min-overlap=F] [--cache=DIR] [--cache-size=MB] [--subsets] [--stats] [--grid=tsv|csv|long] [--outfile] [--gzip] [--save-state=DIR] [--load-state=DIR [--remove-caller=NAME ...]] [--metrics] [--profile=cprofile|memory] [--contigs=NAME[,NAME...]] [--backend=python|numpy] <infile>|<caller>:<rawfile> ...\n"
+
+INPUT_STRING = ("Input for " + CODE_FILE + " comprises a list of path/filenames comprising outputs generated by gene caller programs, with each separated by a single space. The output files are to have been prepared using code \"CGC_parser.py\" to assure that they have a common pre-defined format and indicate the name of the gene caller in the comments section.\n"
+                "Example:  python " + CODE_FILE + " genemark.calls prodigal.calls\n"
+                "A gene caller's raw output may be given instead, prefixed by the gene caller's name, and is then parsed as by CGC_parser.py, with no intermediate file. Example:  python " + CODE_FILE + " genemark:genome.fasta.lst prodigal:genome.genes.sco\n"
+                "Binary call files (written by CGC_parser.py --binary) are recognized, and loaded without parsing or sorting.\n"
+                "Any input file (other than a binary call file) may be compressed, as .gz or .zst; it is decompressed as it is read. With --workers=N, a large raw output in a format whose lines are independent (Prodigal GFF, RAST GFF3) is parsed in N parallel chunks.\n"
+                "With --cache=DIR, the call sets loaded from each input are stored in DIR, already sorted, and later runs over an input with the same content load them from there; the cache is limited to --cache-size=MB megabytes (default " + str(CACHE_SIZE) + ").\n"
+                "With --subsets, the number of unique gene calls made by each combination of callers is written to " + SUBSET_COUNTS_FILE + ", the callers of each unique gene call to " + SUBSET_MEMBERSHIP_FILE + " (both in a form suited to UpSet plots), and pairwise Jaccard and agreement matrices to " + JACCARD_FILE + " and " + AGREEMENT_FILE + ".\n"
+                "With --stats, statistics for each caller and for each caller's calls on each contig (number of calls; min, max, mean and median length; length histogram; calls per strand) are written to " + STATS_TEXT_FILE + ", " + STATS_TSV_FILE + " and " + STATS_JSON_FILE + "; with --stream, statistics are kept for each caller only, so that memory use does not grow with the number of contigs.\n"
+                "The report is written to standard out, or with --outfile to " + OUT_FILE + " (with --gzip, compressed, to " + OUT_FILE + ".gz). Option --grid selects the format of the gene call grid: tsv (default), csv (one column per caller and field), or long (one row per gene call); for csv and long, the statistics that precede the grid are written as comment lines, beginning with '#'.\n"
+                "With option --stream, each file must be sorted by contig, leftEnd, rightEnd and strand, for example:  LC_ALL=C sort -t \"<tab>\" -k6,6 -k3,3n -k4,4n -k2,2 (comment lines are ignored).\n"
+                "By default, gene calls match only if identical (same contig, strand, leftEnd and rightEnd). With --match=same-stop, calls on the same contig and strand match if they share a stop position; with --match=overlap, if they overlap by at least a fraction F (--min-overlap=F, default 0.8) of both calls' lengths.\n"
+                "With --save-state=DIR, the completed comparison is saved in DIR. A later run with --load-state=DIR starts from the saved comparison: its input files (if any) add callers to it, and --remove-caller=NAME removes a caller from it, without reading or sorting the saved callers' calls again; combine with --save-state to keep the updated comparison. A saved comparison keeps its match mode.\n"
+                "With --metrics, the wall time, CPU time, peak memory and number of items handled in each phase of the run (load or parse, and sort, for each caller; compare; common core; report) are written to " + METRICS_FILE + ", and summarized in the log. With --profile=cprofile, the run is profiled with cProfile (" + CODE_BASE + ".prof, and a summary in " + CODE_BASE + ".profile.txt); with --profile=memory, the objects in memory at the end of the run are counted by type, with the types that grew most and the run's peak memory (" + CODE_BASE + ".profile.txt).\n"
+                "With --contigs=NAME[,NAME...], only the calls on the named contigs are compared. A call file written by CGC_parser.py is indexed by contig (<call file>.contigs), and only the named contigs' calls are read from it.\n"
+                "With --backend=numpy, the calls of all callers are merged, grouped and counted as numpy arrays rather than one at a time, which is much faster for large inputs; the report is the same. numpy must be installed.\n")
+
+INFO_STRING = "This code currently supports the following gene callers:  GeneMark, Glimmer, Prodigal, RAST, and PhATE. For more information regarding input to " + CODE_FILE + ", type:  " + CODE_FILE + " input"
+
+##### FUNCTIONS
+
+# Stands in for a CGC_profile.RunMetrics when a run is not measured: its phases record nothing
+class NoMetrics(object):
+
+    @contextmanager
+    def Phase(self,phase,caller=None,source=None):
+        yield {}
+
+# If geneFile names a gene caller's raw output, as <caller>:<file>, return (caller, file); otherwise None
+def GetRawInput(geneFile):
+    geneCaller, colon, rawFile = geneFile.partition(':')
+    if colon == "" or rawFile == "" or os.path.exists(geneFile):
+        return None
+    import CGC_parser
+    if CGC_parser.GetParser(geneCaller) is None:
+        return None
+    return (geneCaller.lower(), rawFile)
+
+# Load the call sets of the gene call files (or raw outputs, or binary call files) in fileSet
+# If cache (a CGC_cache.CallSetCache) is given, call sets are loaded from, or added to, the cache
+# If metrics (a CGC_profile.RunMetrics) is given, each file's load (or parse) is measured as a phase
+# Files may be compressed (see CGC_input.py); with workers > 1, raw outputs are parsed in parallel chunks where possible
+# If contigs (a list of contig names) is given, only the calls on those contigs are kept; a call file with a
+# contig index (see CGC_parser.py) is then read only where those contigs' calls are
+def LoadCallSets(fileSet,LOG,cache=None,metrics=None,workers=1,contigs=None):
+
+    import CGC_input
+    if metrics is None:
+        metrics = NoMetrics()
+    callerList = []
+
+    # For each user-provided gene call file, create a call set and add to list of call sets
+
+    if CHATTY:
+        print "Main: Iterating through fileSet..."
+
+    # A file may bundle several sections (callers, or genomes), each of which becomes its own call set
+    # A raw gene caller output (<caller>:<file>) is parsed directly into a call set
+    for geneFile in fileSet:
+        rawInput = GetRawInput(geneFile)
+        with metrics.Phase("load",source=geneFile) as record:
+            callSets = None
+            if rawInput is None and CGC_geneCall.IsBinaryFile(geneFile):
+                if CHATTY:
+                    print "Loading binary calls from file", geneFile
+                callSets = [CGC_geneCall.ReadBinaryGeneCallSet(geneFile)]
+                record['format'] = "binary"
+            elif contigs and rawInput is None and CGC_geneCall.ReadContigIndex(geneFile) is not None:
+                if CHATTY:
+                    print "Loading calls on", len(contigs), "contig(s) from indexed file", geneFile
+                callSets = CGC_geneCall.ReadContigCallSets(geneFile,contigs)
+                record['format'] = "indexed"
+            elif cache is not None:
+                if rawInput is not None:
+                    cacheKey = cache.GetKey(rawInput[1],rawInput[0])
+                else:
+                    cacheKey = cache.GetKey(geneFile)
+                callSets = cache.Load(cacheKey)
+                if callSets is not None:
+                    if CHATTY:
+                        print "Loading cached calls for file", geneFile
+                    record['format'] = "cache"
+            if callSets is None:
+                if rawInput is not None:
+                    geneCaller, rawFile = rawInput
+                    if CHATTY:
+                        print "Parsing", geneCaller, "calls from file", rawFile
+                    import CGC_parser
+                    callSet = CGC_geneCall.GeneCallSet()
+                    callSet.AddParsedCalls(geneCaller,rawFile,CGC_parser.Parse(geneCaller,rawFile,workers))
+                    callSets = [callSet]
+                    record['phase'] = "parse"
+                else:
+                    geneFile_handle = CGC_input.OpenInput(geneFile)
+                    if CHATTY:
+                        print "Adding Calls from file", geneFile
+                    callSets = CGC_geneCall.ReadGeneCallSets(geneFile_handle)
+                    geneFile_handle.close()
+                    record['format'] = "text"
+                if cache is not None:
+                    cache.Store(cacheKey,callSets)  # sorts the call sets
+            if contigs:
+                callSets = [callSet.SelectContigs(contigs) for callSet in callSets]
+            record['caller'] = ','.join([callSet.geneCaller for callSet in callSets])
+            record['items']  = sum([len(callSet.geneCallList) for callSet in callSets])
+        callerList.extend(callSets)
+
+    if cache is not None:
+        LOG.write("%s\n" % (cache.GetSummary()))
+        if CHATTY:
+            print "Main:", cache.GetSummary()
+
+    return callerList
+
+# Load, sort and compare the gene call files in fileSet, and write the report to OUT
+# Returns the Comparison object; called by the main program below, and by CGC_batch.py for each genome
+# If cache (a CGC_cache.CallSetCache) is given, call sets are loaded from, or added to, the cache
+# If metrics (a CGC_profile.RunMetrics) is given, each phase of the run is measured (see CGC_profile.py)
+# If contigs (a list of contig names) is given, only the calls on those contigs are compared
+# If pool (a multiprocessing.Pool of workers processes) is given, contigs are compared in it rather than in a new pool
+# backend selects the Comparison used (see CGC_compare.NewComparison()); a streaming comparison always uses Comparison
+# A comparison that is refused (e.g., streaming raw outputs) or stopped (e.g., by an unsorted file) is logged as an
+# ERROR, and its error is recorded in the returned Comparison's error, for callers that do not read the log
+def RunComparison(fileSet,OUT,LOG,stream=False,workers=1,matchMode=CGC_compare.MATCH_EXACT,minOverlap=CGC_compare.DEFAULT_MIN_OVERLAP,cache=None,
+                  gridFormat=CGC_grid.GRID_TSV,metrics=None,contigs=None,pool=None,backend=CGC_compare.BACKEND_PYTHON):
+
+    if metrics is None:
+        metrics = NoMetrics()
+
+    # Streaming mode: merge and compare the sorted files line by line, writing grid rows as they are formed
+
+    if stream:
+        if CHATTY:
+            print "Main: Streaming comparison of sorted call files..."
+        rawFiles = [geneFile for geneFile in fileSet if GetRawInput(geneFile) is not None or CGC_geneCall.IsBinaryFile(geneFile)]
+        if rawFiles:  # raw outputs are not sorted: they must be loaded
+            LOG.write("%s%s\n" % ("ERROR: --stream requires sorted call files, not raw gene caller outputs or binary call files: ",' '.join(rawFiles)))
+            print "ERROR: --stream requires sorted call files, not raw gene caller outputs or binary call files:", ' '.join(rawFiles)
+            compareGCs = CGC_compare.Comparison()
+            compareGCs.error = "streaming requires sorted call files, not raw gene caller outputs or binary call files: " + ' '.join(rawFiles)
+            return compareGCs
+        import CGC_input
+        fileHandles = [CGC_input.OpenInput(geneFile) for geneFile in fileSet]
+        compareGCs = CGC_compare.Comparison()
+        compareGCs.matchMode  = matchMode
+        compareGCs.gridFormat = gridFormat
+        try:
+            with metrics.Phase("stream") as record:
+                compareGCs.CompareStreams([CGC_geneCall.GeneCallStream(handle) for handle in fileHandles],OUT)
+                record['items'] = sum([compareGCs.stats.GetCallerStats(caller).count for caller in compareGCs.callerList])
+        except ValueError as e:
+            LOG.write("%s%s\n" % ("ERROR: ",e))
+            print "ERROR:", e
+            compareGCs.error = str(e)
+        for handle in fileHandles:
+            handle.close()
+        return compareGCs
+
+    callerList = LoadCallSets(fileSet,LOG,cache,metrics,workers,contigs)
+
+    if CHATTY:
+        print "Main: callerList is", 
+        for caller in callerList:
+            print caller.geneCaller, ', ',
+        print 
+
+    # Check
+    if DEBUG:
+        print "\n******************Original Lists:"
+        for caller in callerList:
+            caller.PrintAll()
+            print
+
+    # Sort calls in each list
+
+    if CHATTY:
+        print "Main: Sorting gene calls for each caller..."
+
+    for caller in callerList:
+        with metrics.Phase("sort",caller.geneCaller) as record:
+            caller.SortGeneCalls()
+            record['items'] = len(caller.geneCallList)
+
+    # Check
+    if DEBUG:
+        print "\n******************Sorted Lists:"
+        for caller in callerList:
+            caller.PrintAll()
+            print
+
+    # Compare across the call sets
+
+    if CHATTY:
+        print "Main: Comparing accross the call sets..."
+
+    # The k-way merge is consumed by Compare() as it runs, so merging is measured as part of the compare phase
+    if workers > 1:
+        # Each contig is merged and compared independently, in a pool of worker processes
+        with metrics.Phase("compare") as record:
+            compareGCs = CGC_compare.CompareByContig(callerList,workers,matchMode,minOverlap,pool,backend)
+            record['items'] = len(compareGCs.mergeList); record['groups'] = len(compareGCs.uniqueList)
+            record['commonCore'] = len(compareGCs.commonCore); record['workers'] = workers
+    else:
+        compareGCs = CGC_compare.NewComparison(backend)
+        compareGCs.matchMode  = matchMode
+        compareGCs.minOverlap = minOverlap
+        with metrics.Phase("compare") as record:
+            mergeStream = compareGCs.MergeAll([caller.geneCallList for caller in callerList])
+            compareGCs.Compare(mergeStream)
+            record['items'] = len(compareGCs.mergeList); record['groups'] = len(compareGCs.uniqueList)
+        with metrics.Phase("commonCore") as record:
+            compareGCs.IdentifyCommonCore()
+            record['items'] = len(compareGCs.commonCore)
+    compareGCs.gridFormat = gridFormat
+    with metrics.Phase("report") as record:
+        compareGCs.PrintReport(OUT)
+        record['items'] = len(compareGCs.uniqueList)
+
+    # Check
+    if DEBUG:
+        compareGCs.PrintAll()
+
+    return compareGCs
+
+# Load a comparison saved with --save-state, add the callers of the gene call files in fileSet and remove
+# the callers named in removeCallers, then write the report to OUT; the saved callers' calls are neither
+# parsed nor sorted again. Returns the Comparison object, or None if the saved state cannot be updated
+def UpdateComparison(stateDir,fileSet,removeCallers,OUT,LOG,cache=None,gridFormat=CGC_grid.GRID_TSV,metrics=None):
+
+    import CGC_state
+    if metrics is None:
+        metrics = NoMetrics()
+    if CHATTY:
+        print "Main: Loading saved comparison from", stateDir
+    try:
+        with metrics.Phase("loadState",source=stateDir) as record:
+            compareGCs = CGC_state.LoadComparison(stateDir)
+            record['items'] = len(compareGCs.mergeList)
+    except (IOError, ValueError) as e:
+        LOG.write("%s%s\n" % ("ERROR: cannot load saved comparison: ",e))
+        print "ERROR: cannot load saved comparison:", e
+        return None
+    compareGCs.gridFormat = gridFormat
+
+    try:
+        for caller in LoadCallSets(fileSet,LOG,cache,metrics):
+            with metrics.Phase("sort",caller.geneCaller) as record:
+                caller.SortGeneCalls()
+                record['items'] = len(caller.geneCallList)
+            if CHATTY:
+                print "Main: Adding caller", caller.geneCaller
+            with metrics.Phase("addCaller",caller.geneCaller) as record:
+                compareGCs.AddCaller(caller.geneCallList)
+                record['items'] = len(caller.geneCallList)
+        for geneCaller in removeCallers:
+            if CHATTY:
+                print "Main: Removing caller", geneCaller
+            with metrics.Phase("removeCaller",geneCaller) as record:
+                compareGCs.RemoveCaller(geneCaller)
+                record['items'] = len(compareGCs.mergeList)
+    except ValueError as e:
+        LOG.write("%s%s\n" % ("ERROR: ",e))
+        print "ERROR:", e
+        return None
+    with metrics.Phase("report") as record:
+        compareGCs.PrintReport(OUT)
+        record['items'] = len(compareGCs.uniqueList)
+    return compareGCs
+
+# Write the caller-combination tables of a completed comparison; fileBase holds the directory (if any) for the files
+# A streaming comparison keeps combination counts only, so its membership table is not written
+def WriteSubsetTables(comparison,fileBase,stream=False):
+    if not stream:
+        comparison.IdentifySubsets()
+    TABLE = open(fileBase + SUBSET_COUNTS_FILE,"w")
+    comparison.PrintSubsetCounts(TABLE)
+    TABLE.close()
+    if not stream:
+        TABLE = open(fileBase + SUBSET_MEMBERSHIP_FILE,"w")
+        comparison.PrintSubsetMembership(TABLE)
+        TABLE.close()
+    TABLE = open(fileBase + JACCARD_FILE,"w")
+    comparison.PrintPairwiseMatrix(TABLE,CGC_compare.MEASURE_JACCARD)
+    TABLE.close()
+    TABLE = open(fileBase + AGREEMENT_FILE,"w")
+    comparison.PrintPairwiseMatrix(TABLE,CGC_compare.MEASURE_AGREEMENT)
+    TABLE.close()
+    return
+
+# Write the caller and contig statistics of a completed comparison, as text, TSV and JSON
+def WriteStatsFiles(comparison,fileBase):
+    TABLE = open(fileBase + STATS_TEXT_FILE,"w")
+    comparison.stats.PrintText(TABLE)
+    TABLE.close()
+    TABLE = open(fileBase + STATS_TSV_FILE,"w")
+    comparison.stats.PrintTSV(TABLE)
+    TABLE.close()
+    TABLE = open(fileBase + STATS_JSON_FILE,"w")
+    comparison.stats.PrintJSON(TABLE)
+    TABLE.close()
+    return
+
+##### BEGIN MAIN 
+
+if __name__ == "__main__":
+
+    ##### GET INPUT PARAMETERS
+
+    # Separate options from input files
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    badOption = ""
+    for option in options:
+        if option == "--stream":
+            STREAM = True
+        elif option == "--subsets":
+            SUBSETS = True
+        elif option == "--stats":
+            STATS = True
+        elif option.startswith("--grid=") and option[len("--grid="):] in CGC_grid.GRID_FORMATS:
+            GRID_FORMAT = option[len("--grid="):]
+        elif option == "--outfile":
+            OUTFILE = True
+        elif option == "--gzip":
+            GZIP = True
+        elif option.startswith("--workers=") and option[len("--workers="):].isdigit():
+            WORKERS = max(1,int(option[len("--workers="):]))
+        elif option.startswith("--outdir=") and option[len("--outdir="):] != "":
+            OUT_DIR = option[len("--outdir="):]
+        elif option.startswith("--match=") and option[len("--match="):] in CGC_compare.MATCH_MODES:
+            MATCH_MODE = option[len("--match="):]
+        elif option.startswith("--min-overlap="):
+            try:
+                MIN_OVERLAP = float(option[len("--min-overlap="):])
+            except ValueError:
+                badOption = option
+            if not 0.0 < MIN_OVERLAP <= 1.0:
+                badOption = option
+        elif option.startswith("--cache=") and option[len("--cache="):] != "":
+            CACHE_DIR = option[len("--cache="):]
+        elif option.startswith("--cache-size=") and option[len("--cache-size="):].isdigit():
+            CACHE_SIZE = int(option[len("--cache-size="):])
+        elif option.startswith("--save-state=") and option[len("--save-state="):] != "":
+            SAVE_STATE = option[len("--save-state="):]
+        elif option.startswith("--load-state=") and option[len("--load-state="):] != "":
+            LOAD_STATE = option[len("--load-state="):]
+        elif option.startswith("--contigs=") and option[len("--contigs="):].strip(',') != "":
+            CONTIGS = [contig for contig in option[len("--contigs="):].split(',') if contig != ""]
+        elif option.startswith("--backend=") and option[len("--backend="):] in CGC_compare.BACKENDS:
+            BACKEND = option[len("--backend="):]
+        elif option == "--metrics":
+            METRICS = True
+        elif option.startswith("--profile="):
+            import CGC_profile
+            if option[len("--profile="):] in CGC_profile.PROFILE_MODES:
+                PROFILE = option[len("--profile="):]
+            else:
+                badOption = option
+        elif option.startswith("--remove-caller=") and option[len("--remove-caller="):] != "":
+            REMOVE_CALLERS.append(option[len("--remove-caller="):])
+        else:
+            badOption = option
+
+    # Runs in parallel must not share log/out files: use --outdir to separate them
+    fileBase = ""
+    if OUT_DIR:
+        if not os.path.isdir(OUT_DIR):
+            os.makedirs(OUT_DIR)
+        LOG_FILE = os.path.join(OUT_DIR,os.path.basename(LOG_FILE))
+        OUT_FILE = os.path.join(OUT_DIR,os.path.basename(OUT_FILE))
+        fileBase = os.path.join(OUT_DIR,"")
+    if GZIP:
+        OUT = CGC_grid.OpenReport(OUT_FILE + ".gz",True)
+    else:
+        OUT = CGC_grid.OpenReport(OUT_FILE)
+    LOG = open(LOG_FILE,"w")
+
+    if (LOAD_STATE or SAVE_STATE) and STREAM:
+        badOption = "--stream (a streaming comparison cannot be saved or loaded)"
+    if CONTIGS and (STREAM or LOAD_STATE):
+        badOption = "--contigs (not available with --stream or --load-state)"
+    if BACKEND == CGC_compare.BACKEND_NUMPY and CGC_geneCall.GetNumpy() is None:
+        badOption = "--backend=numpy (numpy is not installed)"
+    if REMOVE_CALLERS and not LOAD_STATE:
+        badOption = "--remove-caller requires --load-state"
+    if badOption:
+        LOG.write("%s%s\n" % ("Unrecognized option: ",badOption))
+        print "Unrecognized option:", badOption
+        print USAGE_STRING
+        LOG.close(); exit(0)
+
+    fileSet = []
+    argCount = len(args) + 1
+    if argCount > 1:
+        match = re.search("help", args[0].lower())
+        if match:
+            print HELP_STRING
+            LOG.close(); exit(0)
+        match = re.search("input", args[0].lower())
+        if match:
+            print INPUT_STRING
+            LOG.close(); exit(0)
+        match = re.search("usage", args[0].lower())
+        if match:
+            print USAGE_STRING
+            LOG.close(); exit(0)
+        match = re.search("detail", args[0].lower())
+        if match:
+            print INFO_STRING
+            LOG.close(); exit(0)
+        match = re.search("info", args[0].lower())
+        if match:
+            print INFO_STRING
+            LOG.close(); exit(0)
+        else:
+            fileSet = args
+    elif not LOAD_STATE:
+        LOG.write("%s\n" % ("Incorrect number of command-line arguments provided"))
+        print USAGE_STRING
+        LOG.close(); exit(0)
+
+    cache = None
+    if CACHE_DIR and not STREAM:
+        import CGC_cache
+        cache = CGC_cache.CallSetCache(CACHE_DIR,CACHE_SIZE * 1024 * 1024)
+
+    profiler = None
+    if PROFILE:
+        try:
+            profiler = CGC_profile.Profiler(PROFILE)
+        except ValueError as e:
+            LOG.write("%s%s\n" % ("ERROR: ",e))
+            print "ERROR:", e
+            OUT.close(); LOG.close(); exit(1)
+        profiler.Start()
+    if METRICS:
+        import CGC_profile
+        metrics = CGC_profile.RunMetrics()
+    else:
+        metrics = NoMetrics()
+
+    if OUTFILE or GZIP:
+        REPORT = OUT
+    else:
+        REPORT = sys.stdout
+    if LOAD_STATE:
+        comparison = UpdateComparison(LOAD_STATE,fileSet,REMOVE_CALLERS,REPORT,LOG,cache,GRID_FORMAT,metrics)
+        if comparison is None:
+            OUT.close(); LOG.close(); exit(1)
+    else:
+        comparison = RunComparison(fileSet,REPORT,LOG,STREAM,WORKERS,MATCH_MODE,MIN_OVERLAP,cache,GRID_FORMAT,metrics,CONTIGS,None,BACKEND)
+    if SAVE_STATE and comparison.mergeList:
+        import CGC_state
+        with metrics.Phase("saveState",source=SAVE_STATE) as record:
+            CGC_state.SaveComparison(comparison,SAVE_STATE)
+            record['items'] = len(comparison.mergeList)
+        LOG.write("%s%s\n" % ("Comparison saved in ",SAVE_STATE))
+
+    if SUBSETS:
+        with metrics.Phase("subsets") as record:
+            WriteSubsetTables(comparison,fileBase,STREAM)
+            record['items'] = len(comparison.subsetCounts)
+    if STATS:
+        with metrics.Phase("stats") as record:
+            WriteStatsFiles(comparison,fileBase)
+            record['items'] = len(comparison.callerList)
+
+    if profiler is not None:
+        for profileFile in profiler.Stop(fileBase + CODE_BASE):
+            LOG.write("%s%s\n" % ("Profile written to ",profileFile))
+    if METRICS:
+        METRICS_OUT = open(fileBase + METRICS_FILE,"w")
+        metrics.WriteJSON(METRICS_OUT)
+        METRICS_OUT.close()
+        metrics.PrintSummary(LOG)
+
+    ##### CLEAN UP
+
+    OUT.close()
+    LOG.close()
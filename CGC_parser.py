@@ -1,383 +1,680 @@
-#!/usr/bin/env python
-
-################################################################
-#
-# CGC_parser.py
-#
-# Programmer:  Carol Zhou
-#
-# Description:  This code inputs the name of a gene caller plus
-#    the gene-caller's output file, and outputs a properly formatted
-#    file for input to CGC_main.py.  The purpose of this code is to
-#    normalize all gene caller outputs to a standard format, which is
-#    recognized by CGC_main.py (a code that compares gene calls
-#    among gene callers.) Note that regardless of how the gene caller
-#    designates the start/end of a gene call, this code sets the 
-#    "leftEnd" to the smaller position number, and "rightEnd" to the
-#    larger position number.  The strand ('+' or '-') determines 
-#    whether these numbers represent start or end positions in the
-#    script output file. 
-#
-# Input Files:  For GeneMarkS, use the XXX.fasta.lst file; for
-#    Glimmer2, use the XXX.g2.coord file; and for Prodigal, use the
-#    XXX.genes.sco file, for Glimmer3, use the run3.coords file. 
-#
-# Updates:
-#    18 May 2016: begin
-#    07 Jul 2016: Parses Glimmer3, Prodigal, GenemarkS, RAST
-#    15 Aug 2016: upgraded to include PHATE parser
-#
-# Programmer's Notes:
-#
-################################################################
-
-# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
-# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
-
-
-import sys
-import os
-import re
-import string
-import copy
-from subprocess import call
-
-##### CONFIGURABLE
-
-# GLIMMER3 bool controls which version of glimmer was run
-# You get many more gene call matches when you adjust (by 3) the glimmer2 coordinates
-# Glimmer3 changed this, so it should match better to other gene calls 
-# You may adjust the Prodigal setting for the Prodigal out file you are using (sco vs. gff)
-# RAST needs further testing; we are not running RAST for phage genomes
-
-GLIMMER3 = True       # if False => glimmer2
-PRODIGAL_sco = True   # using the XXX.genes.sco file
-PRODIGAL_gff = False  # using the XXX.genes.gff file
-RAST_GFF3 = True      # using RAST gff3 file; other RAST formats not yet supported
-
-##### FILES
-
-CODE_BASE = "./CGC_parser"
-CODE      = CODE_BASE + ".py"
-logfile   = CODE_BASE + ".log"
-outfile   = CODE_BASE + ".out"
-infile    = ""  # user provided
-USER_OUT_PROVIDED = False 
-
-LOGFILE = open(logfile,"w")
-
-##### PATTERNS
-
-p_comment  = re.compile('^#')
-p_prodigal = re.compile('[Pp][Rr][Oo][Dd][Ii][Gg][Aa][Ll]')
-p_genemark = re.compile('[Gg][Ee][Nn][Ee][Mm][Aa][Rr][Kk]')
-p_glimmer  = re.compile('[Gg][Ll][Ii][Mm]+[Ee][Rr]')
-p_rast     = re.compile('[Rr][Aa][Ss][Tt]')
-p_phate    = re.compile('[Pp][Hh][Aa][Tt][Ee]')
-
-##### IDIOMS
-
-CHATTY = True
-#CHATTY = False
-
-##### CONSTANTS
-
-HELP_STRING = "Script " + CODE + " inputs the name of a gene caller plus the output file arising \nfrom that gene caller. Then, the script converts the data to a format that is acceptable as input to \nscript CGC_main.py, which compares gene calls among a set of gene caller outputs.\nType: python" + CODE + " usage|input for more information\n"
-
-USAGE_STRING = "Usage:  python " + CODE + " <geneCaller_name> <geneCall_filename> (optional)<output_filename>\n"
-
-INPUT_STRING = "You may enter the name of a gene caller (e.g., Prodigal, GeneMark, Glimmer, RAST, PHATE), followed by the gene-call file that the program produced. For Prodigal, use the Name.genes.sco file. For GeneMarkS, use the Name.fasta.lst file. For Glimmer2, use the Name.g2.coord file, but for Glimmer3 use the run3.coords file. For RAST, use gff3 output. For PhATE... TBD.\n"
-
-ACCEPTABLE_ARG_COUNT = (2,3,4)  # 2 if 'help'|'usage'|'input', or 3 if gene-caller and gene-caller.out, 4 if optional output file
-
-##### GET INPUT PARAMETERS
-
-geneCaller    = ""
-geneCallerOut = ""
-userOutfile   = ""
-
-argCount = len(sys.argv)
-if argCount in ACCEPTABLE_ARG_COUNT:
-    match = re.search("help", sys.argv[1].lower())
-    if match:
-        print HELP_STRING
-        LOGFILE.close(); exit(0)
-    match = re.search("input", sys.argv[1].lower())
-    if match:
-        print INPUT_STRING
-        LOGFILE.close(); exit(0)
-    match = re.search("usage", sys.argv[1].lower())
-    if match:
-        print USAGE_STRING
-        LOGFILE.close(); exit(0)
-
-    # Capture name of gene caller and its output file
-    if argCount == 3 or argCount == 4:
-        geneCaller    = sys.argv[1].lower()  # case insensitive
-        geneCallerOut = sys.argv[2]
-    else:
-        print USAGE_STRING
-        LOGFILE.write("%s\n" % ("Incorrect number of command-line arguments provided"))
-        LOGFILE.close(); exit(0)
-    if argCount == 4:
-        USER_OUT_PROVIDED = True
-        userOutfile   = sys.argv[3]
-else:
-    print USAGE_STRING
-    LOGFILE.write("%s\n" % ("Incorrect number of command-line arguments provided"))
-    LOGFILE.close(); exit(0)
-
-# Open file
-
-fileError = False
-
-try:
-    INFILE = open(geneCallerOut,"r")
-except IOError as e:
-    fileError = True
-    print e
-
-try:
-    OUTFILE = open(outfile,"w")
-except IOError as e:
-    fileError = True
-    print e
-
-if fileError:
-    LOGFILE.write("%s%s%s\n" % ("ERROR: problem with input file:",geneCallerOut,e))
-    LOGFILE.close(); exit(0)
-
-if USER_OUT_PROVIDED:
-    try:
-        USER_OUT = open(userOutfile,"w")
-    except IOError as e:
-        fileError = True
-        print e
-
-##### FUNCTIONS
-
-def ProcessGenemark(fLines,OUT):
-    geneNo = 0; contig = ''; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; cclass = '' 
-    p_dataLine   = re.compile('\s+(\d+)\s+([+-])\s+([\d\>\<]+)\s+(\d+)\s+(\d+)\s+\d+')
-    p_contigLine = re.compile('FASTA\sdefinition\sline:\s(.*)\s+length=\d+')
-    for line in fLines:
-        match_comment    = re.search(p_comment,line)
-        match_contigLine = re.search(p_contigLine,line)
-        match_dataLine   = re.search(p_dataLine,line)
-        if match_comment:
-            continue 
-        elif match_contigLine:
-            contig = match_contigLine.group(1)
-        elif match_dataLine:
-            geneNo   = int(match_dataLine.group(1))
-            strand   =     match_dataLine.group(2)     
-            leftEnd  =     match_dataLine.group(3)   # Note: left/right end could have '<' or '>' symbol
-            rightEnd =     match_dataLine.group(4)
-            length   = int(match_dataLine.group(5))
-            #cclass   =     match_dataLine.group(6)  # skip for now
-            # Note: left/right end could have '>' or '<' symbol, if gene call spanned across contigs
-            # I am removing the symbol, so if start=1 this may imply a gene that spans 
-            # For a gene spanning 2 contigs or wrapping around, genemark estimates length based on
-            # raw start/stop without symbol
-            if re.search('^>',leftEnd) or re.search('^<',leftEnd):
-                leftEnd = leftEnd[1:] 
-            if re.search('^>',rightEnd) or re.search('^<',rightEnd):
-                rightEnd = rightEnd[1:] 
-            if strand != '+' and strand != '-':
-                LOGFILE.write("%s%s\n" % ("ERROR: unknown strand designator, ",strand))
-                OUT.write("%s\n" ("ERROR encountered: unknown strand designator\n"))
-                if USER_OUT_PROVIDED:
-                    USER_OUT.write("%s\n" ("ERROR encountered: unknown strand designator\n"))
-                print "ERROR: unexpected strand designator,", strand
-                return
-            if contig == '':
-                contig = 'unknown'  # Contig name may be absent in input file
-            OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-            if USER_OUT_PROVIDED:
-                USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-    return
-            
-def ProcessGlimmer(fLines,OUT):
-    # NOTE:  Glimmer2 appears to truncate the initial met (sometimes?): test with other data sets (e.g., + strand calls)
-    geneNo = 0; contig = ''; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
-    p_contigLine = re.compile('^>(.*)\s+length=\d+\s+numreads=\d+') # Matches only for glimmer3
-
-    if GLIMMER3:
-        p_dataLine   = re.compile('orf(\d+)\s+(\d+)\s+(\d+)\s+([+-])\d\s+([\d\.]+)')
-    else:
-        p_dataLine = re.compile('\s+(\d+)\s+(\d+)\s+(\d+)\s+\[([+-])\d\sL=\s*(\d+)\sr=.*\]') 
-
-    for line in fLines:
-        match_comment    = re.search(p_comment,line)
-        match_contigLine = re.search(p_contigLine,line)
-        match_dataLine   = re.search(p_dataLine,line)
-        if match_comment:
-            continue 
-        elif match_contigLine:
-            contig = match_contigLine.group(1)
-        elif match_dataLine:
-            geneNo   = int(match_dataLine.group(1))
-            left     = int(match_dataLine.group(2))
-            right    = int(match_dataLine.group(3))
-            strand   =     match_dataLine.group(4)
-            if strand == '+':
-                leftEnd  = left 
-                if GLIMMER3:
-                    rightEnd = right
-                else:
-                    rightEnd = right + 3
-            elif strand == '-':  
-                if GLIMMER3:
-                    leftEnd = right
-                else:
-                    leftEnd  = right - 3    
-                rightEnd = left  
-            else:
-                LOGFILE.write("%s%s\n" % ("ERROR: unknown strand designator, ",strand))
-                OUT.write("%s\n" ("ERROR encountered: unknown strand designator\n"))
-                if USER_OUT_PROVIDED:
-                    USER_OUT.write("%s\n" ("ERROR encountered: unknown strand designator\n"))
-                print "ERROR: unexpected strand designator,", strand
-                return
-
-            length = rightEnd - leftEnd + 1
-            if contig == '':    # contig name may be left out of input file
-                contig = 'unknown'
-            OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,str(leftEnd),str(rightEnd),str(length),contig))
-
-            if USER_OUT_PROVIDED:
-                USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,str(leftEnd),str(rightEnd),str(length),contig))
-    return
-
-def ProcessRAST(fLines,OUT):
-    geneNo = 0; contig = ""; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
-    if RAST_GFF3:
-        p_dataLine = re.compile('(.*)\t.*\tCDS\t(\d+)\t(\d+)\t\.\t([+-])\t\d\t.*')
-        for line in fLines:
-            match_comment = re.search(p_comment,line)
-            match_dataLine = re.search(p_dataLine,line) 
-            if match_comment:
-                continue
-            elif match_dataLine:
-                count += 1
-                geneNo = count 
-                contig    =     match_dataLine.group(1)
-                leftEnd   = int(match_dataLine.group(2))
-                rightEnd  = int(match_dataLine.group(3))
-                strand    =     match_dataLine.group(4) 
-                length = rightEnd - leftEnd + 1
-                OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,str(leftEnd),str(rightEnd),str(length),contig))
-                if USER_OUT_PROVIDED:
-                    USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,str(leftEnd),str(rightEnd),str(length),contig))
-    else:
-        pass # Not using other RAST format (for now)
-    return
- 
-def ProcessProdigal(fLines,OUT):
-    geneNo = 0; contig = "unknown"; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
-
-    if PRODIGAL_sco:  # using XXX.genes.sco file
-        p_dataLine = re.compile('^>(\d+)_(\d+)_(\d+)_([+-])')
-        for line in fLines:
-            match_comment = re.search(p_comment,line)
-            match_dataLine = re.search(p_dataLine,line)
-            if match_comment:
-                continue 
-            elif match_dataLine:
-                geneNo   = match_dataLine.group(1)
-                leftEnd  = int(match_dataLine.group(2))
-                rightEnd = int(match_dataLine.group(3))
-                strand   =     match_dataLine.group(4)
-                length   = int(rightEnd) - int(leftEnd) + 1 
-            OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-            if USER_OUT_PROVIDED:
-                USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-
-    else: # using XXX.genes file
-        p_dataLine = re.compile('(.*)\t.*\tCDS\t(\d+)\t(\d+)\t([\d\.]+)\t([+-])\t.\t(.*)') 
-        for line in fLines:
-            match_comment = re.search(p_comment,line)
-            match_dataLine = re.search(p_dataLine,line)
-            if match_comment:
-                continue 
-            elif match_dataLine:
-                count += 1
-                geneNo   = count 
-                contig   =     match_dataLine.group(1)
-                leftEnd  = int(match_dataLine.group(2))
-                rightEnd = int(match_dataLine.group(3))
-                strand   =     match_dataLine.group(5)
-                length   = int(rightEnd) - int(leftEnd) + 1
-            OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-            if USER_OUT_PROVIDED:
-                USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-    return
-
-def ProcessPhate(fLines,OUT):      # SDSU code
-    p_dataLine = re.compile('^(\d+)\t(\d+)\t([+-])')
-    geneNo = 0; contig = "unknown"; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0 
-    for line in fLines:
-        match_comment  = re.search(p_comment,line)
-        match_dataLine = re.search(p_dataLine,line)
-        if match_comment:
-            continue
-        if match_dataLine:
-            count += 1
-            geneNo = count
-            strand = match_dataLine.group(3)
-            if strand == '+':
-                leftEnd  = int(match_dataLine.group(1))
-                rightEnd = int(match_dataLine.group(2))
-            else:
-                rightEnd = int(match_dataLine.group(1))
-                leftEnd  = int(match_dataLine.group(2))
-            length = abs(rightEnd - leftEnd) + 1
-            OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-            if USER_OUT_PROVIDED:
-                USER_OUT.write("%s\t%s\t%s\t%s\t%s\t%s\n" % (geneNo,strand,leftEnd,rightEnd,length,contig))
-    return
-
-##### BEGIN MAIN 
-
-# First, determine which gene caller was used
-
-match_glimmer  = re.search(p_glimmer,geneCaller)
-match_genemark = re.search(p_genemark,geneCaller)
-match_prodigal = re.search(p_prodigal,geneCaller)
-match_rast     = re.search(p_rast,geneCaller)
-match_phate    = re.search(p_phate,geneCaller)
-
-OUTFILE.write("%s%s%s%s%s\n" % ('# ',geneCaller, " gene calls",", taken from file ",geneCallerOut))
-OUTFILE.write("%s\n" % ("Gene No.\tStrand\tLeftEnd\tRightEnd\tLength\tContig"))
-
-if USER_OUT_PROVIDED:
-    USER_OUT.write("%s%s%s%s%s\n" % ('# ',geneCaller, " gene calls",", taken from file ",geneCallerOut))
-    USER_OUT.write("%s\n" % ("Gene No.\tStrand\tLeftEnd\tRightEnd\tLength\tContig"))
-
-fileLines = INFILE.read().splitlines()
-
-if match_genemark:
-    ProcessGenemark(fileLines,OUTFILE)
-elif match_glimmer:
-    ProcessGlimmer(fileLines,OUTFILE)
-elif match_prodigal:
-    ProcessProdigal(fileLines,OUTFILE)
-elif match_rast:
-    ProcessRAST(fileLines,OUTFILE)
-elif match_phate:
-    ProcessPhate(fileLines,OUTFILE)
-else:
-    LOGFILE.write("%s%s\n" % ("ERROR: Cannot process unknown gene caller output file:",geneCaller))
-
-if USER_OUT_PROVIDED:
-    USER_OUT.write("%s\n" % ("# END"))
-OUTFILE.write("%s\n" % ("# END"))
-
-##### CLEAN UP
-
-INFILE.close()
-OUTFILE.close()
-if USER_OUT_PROVIDED:
-    USER_OUT.close()
-LOGFILE.write("%s\n" % ("Processing complete"))
-LOGFILE.close()
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_parser.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  This code inputs the name of a gene caller plus
+#    the gene-caller's output file, and outputs a properly formatted
+#    file for input to CGC_main.py.  The purpose of this code is to
+#    normalize all gene caller outputs to a standard format, which is
+#    recognized by CGC_main.py (a code that compares gene calls
+#    among gene callers.) Note that regardless of how the gene caller
+#    designates the start/end of a gene call, this code sets the 
+#    "leftEnd" to the smaller position number, and "rightEnd" to the
+#    larger position number.  The strand ('+' or '-') determines 
+#    whether these numbers represent start or end positions in the
+#    script output file. 
+#
+# Input Files:  For GeneMarkS, use the XXX.fasta.lst file; for
+#    Glimmer2, use the XXX.g2.coord file; and for Prodigal, use the
+#    XXX.genes.sco file, for Glimmer3, use the run3.coords file. 
+#
+# Updates:
+#    18 May 2016: begin
+#    07 Jul 2016: Parses Glimmer3, Prodigal, GenemarkS, RAST
+#    15 Aug 2016: upgraded to include PHATE parser
+#    16 Oct 2026: faster parsing: split() for fixed formats, one regex per line otherwise; batched writes
+#    16 Oct 2026: importable as a library (Parse, GetParser, WriteCalls); no work done at import time
+#    16 Oct 2026: multi-input mode: many <caller>:<file|glob> inputs, parsed in a process pool
+#    16 Oct 2026: --binary option: write sorted binary call files (see CGC_geneCall.py)
+#    16 Oct 2026: compressed (.gz, .zst) inputs read as streams (CGC_input.py); large Prodigal GFF and
+#                 RAST GFF3 files parsed in chunks, in parallel
+#    16 Oct 2026: contigs tracked in every format (Prodigal sco seqhdr, PhATE ">contig" lines); output
+#                 grouped by contig, with a contig index (<output file>.contigs)
+#    16 Oct 2026: GeneMark contig names are the first word of the FASTA definition line, not the whole line,
+#                 as in every other format; calls cached before this change are read again (PARSER_VERSION 6)
+#    16 Oct 2026: Glimmer3 contig lines: any FASTA header ('>name ...'), not only Newbler's (length=, numreads=)
+#    16 Oct 2026: multi-input mode: the process pool is terminated however parsing ends
+#    16 Oct 2026: multi-input mode: any error in parsing an input fails that input only; its temporary files are removed
+#    16 Oct 2026: Prodigal GFF: lines whose score is not a number (digits and '.') are skipped again, as before split()
+#
+# Programmer's Notes:
+#    Other codes may import this module and parse gene caller outputs in-process:
+#        for (geneNo,strand,leftEnd,rightEnd,length,contig) in CGC_parser.Parse("prodigal","x.genes.sco"): ...
+#    Parse() accepts a path or an open file (or any iterable of lines), and returns an iterator
+#    over the calls, which are read one line at a time. The gene caller name is matched against
+#    the patterns in PARSERS, which registers the parsing function for each gene caller.
+#    Multi-input mode normalizes many files in one invocation:
+#        python CGC_parser.py [--workers=N] [--outdir=DIR] [--binary] <caller>:<file|glob> [<caller>:<file|glob> ...]
+#    Each input is written to its own file, <outdir>/<input file name>.cgc, by way of a temporary
+#    file that is renamed once complete, so an output file is never seen half written.
+#    With --binary, the calls are sorted and written as a binary call file, <input file name>.cgb,
+#    which CGC_main.py loads (memory-mapped) without parsing or sorting.
+#    Inputs may be compressed (.gz or .zst): they are decompressed as they are read, in a
+#    background thread (see CGC_input.py), and the output file name omits the .gz or .zst suffix.
+#    Formats whose lines are parsed independently of one another (Prodigal GFF, RAST GFF3)
+#    are parsed in chunks of an uncompressed file, split at line ends, in a pool of worker
+#    processes, when Parse() is given workers > 1; the chunks' calls are joined in file order and
+#    numbered as when parsed in one pass. With a single input, --workers sets the number of chunk
+#    workers; with several, the inputs are parsed in parallel instead.
+#    PhATE, Prodigal sco, GeneMark and Glimmer outputs are always parsed in one pass (see IsChunkable()):
+#    a call's contig is given by a header line (PhATE ">contig", sco "seqhdr", GeneMark and Glimmer3
+#    FASTA headers) somewhere above it, which a chunk starting below that line would not see.
+#    Every parser reports each call's contig: the first word of the contig's FASTA header (GeneMark
+#    and Glimmer3 contig lines, Prodigal sco "seqhdr", PhATE ">" lines) or sequence id (GFF column
+#    1), or "unknown" where the output names none (e.g., Glimmer2).
+#    Contig ids: once loaded, each call's contig is an integer id, interned per call set by
+#    GeneCallTable.InternContig() (column contigId, names in contigNames); binary call files store
+#    these ids, and a contig's id in a contig index is its position there. The parsers' tuples and
+#    the normalized text format keep contig names (as intern()ed strings): a text file must stand
+#    on its own, for CGC_main.py and other readers, and ids would only be meaningful alongside a
+#    name table for each stream. Chunked parsing passes contig ids between processes (ParseChunk()).
+#    A normalized output file holds each contig's calls in one block, contigs in order of first
+#    appearance, and is indexed by contig in <output file>.contigs (see CGC_geneCall.py), which
+#    CGC_main.py --contigs uses to read only the selected contigs' blocks. Binary outputs are
+#    sorted, so grouped by contig, and are not indexed.
+#
+# Functions:
+#    GetParser(geneCaller)
+#    Parse(geneCaller,source,workers)
+#    IsChunkable(parser)
+#    ParseChunk(job)
+#    ParseChunked(parser,fileName,workers)
+#    WriteCalls(geneCaller,sourceName,calls,outHandles,index)
+#    IndexCallFile(fileName,index)
+#    ExpandInputs(specs)
+#    GetOutputPath(inFile,outDir,suffix)
+#    ParseToFile(job)
+#    ParseFiles(jobs,workers)
+#    ParseGenemark(lines), ParseGlimmer(lines), ParseProdigal(lines), ParseRAST(lines), ParsePhate(lines)
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+
+import sys
+import os
+import re
+import glob
+import array
+from itertools import izip
+import multiprocessing
+import CGC_geneCall
+import CGC_input
+
+##### CONFIGURABLE
+
+# GLIMMER3 bool controls which version of glimmer was run
+# You get many more gene call matches when you adjust (by 3) the glimmer2 coordinates
+# Glimmer3 changed this, so it should match better to other gene calls 
+# You may adjust the Prodigal setting for the Prodigal out file you are using (sco vs. gff)
+# RAST needs further testing; we are not running RAST for phage genomes
+
+GLIMMER3 = True       # if False => glimmer2
+PRODIGAL_sco = True   # using the XXX.genes.sco file
+PRODIGAL_gff = False  # using the XXX.genes.gff file
+RAST_GFF3 = True      # using RAST gff3 file; other RAST formats not yet supported
+
+##### FILES
+
+CODE_BASE = "./CGC_parser"
+CODE      = CODE_BASE + ".py"
+logfile   = CODE_BASE + ".log"
+outfile   = CODE_BASE + ".out"
+
+##### PATTERNS
+
+p_comment  = re.compile('^#')
+p_prodigal = re.compile('[Pp][Rr][Oo][Dd][Ii][Gg][Aa][Ll]')
+p_genemark = re.compile('[Gg][Ee][Nn][Ee][Mm][Aa][Rr][Kk]')
+p_glimmer  = re.compile('[Gg][Ll][Ii][Mm]+[Ee][Rr]')
+p_rast     = re.compile('[Rr][Aa][Ss][Tt]')
+p_phate    = re.compile('[Pp][Hh][Aa][Tt][Ee]')
+p_seqhdr   = re.compile('seqhdr="([^"]*)"')
+
+##### IDIOMS
+
+CHATTY = True
+#CHATTY = False
+
+##### CONSTANTS
+
+OUT_SUFFIX = ".cgc"  # multi-input mode: output file name is the input file name plus this suffix
+
+HELP_STRING = "Script " + CODE + " inputs the name of a gene caller plus the output file arising \nfrom that gene caller. Then, the script converts the data to a format that is acceptable as input to \nscript CGC_main.py, which compares gene calls among a set of gene caller outputs.\nType: python" + CODE + " usage|input for more information\n"
+
+USAGE_STRING = "Usage:  python " + CODE + " <geneCaller_name> <geneCall_filename> (optional)<output_filename>\n        python " + CODE + " [--workers=N] [--outdir=DIR] [--binary] <geneCaller_name>:<geneCall_filename|glob> ...\n"
+
+INPUT_STRING = "You may enter the name of a gene caller (e.g., Prodigal, GeneMark, Glimmer, RAST, PHATE), followed by the gene-call file that the program produced. For Prodigal, use the Name.genes.sco file. For GeneMarkS, use the Name.fasta.lst file. For Glimmer2, use the Name.g2.coord file, but for Glimmer3 use the run3.coords file. For RAST, use gff3 output. For PhATE, use the tab-separated start, stop and strand output; a line beginning '>' names the contig of the calls that follow it.\nAny input may be compressed (.gz or .zst).\nTo normalize many files in one invocation, give each as <geneCaller_name>:<geneCall_filename>, where the file name may be a glob pattern (quote it); e.g., prodigal:'*.genes.sco' genemark:genome.fasta.lst. The files are parsed in parallel (--workers=N, default: number of CPUs), each to <outdir>/<geneCall_filename>" + OUT_SUFFIX + " (--outdir=DIR, default: current directory). With --binary, the calls are sorted and written in binary form, to <outdir>/<geneCall_filename>" + CGC_geneCall.BINARY_SUFFIX + ", for fastest loading by CGC_main.py.\n"
+
+PARSER_VERSION = 6  # increase whenever a change to the parsers changes the calls read from any input
+
+GFF_SCORE_CHARS = "0123456789."  # a Prodigal GFF score holds only these characters
+
+WRITE_BATCH = 10000  # output rows are formatted once, then written in batches of this many rows
+
+ACCEPTABLE_ARG_COUNT = (2,3,4)  # 2 if 'help'|'usage'|'input', or 3 if gene-caller and gene-caller.out, 4 if optional output file
+
+COLUMN_HEADER = "Gene No.\tStrand\tLeftEnd\tRightEnd\tLength\tContig"
+
+##### FUNCTIONS
+
+# Contig name from a FASTA header or sequence id: its first word, interned, so that all calls on a
+# contig share one string (and contigs compare by identity first); "unknown" if there is none
+# Loaded calls refer to contigs by integer id (see Programmer's Notes)
+def GetContigName(header):
+    words = header.split(None,1)
+    if not words:
+        return "unknown"
+    return intern(words[0])
+
+# Each parser inputs the lines of a gene caller's output file, and yields one tuple per gene call:
+#     (geneNo, strand, leftEnd, rightEnd, length, contig), with leftEnd <= rightEnd
+# Each line is tested by at most one regular expression (contig and data lines combined); 
+# fixed-column formats are split rather than matched
+def ParseGenemark(lines):
+    geneNo = 0; contig = ''; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; cclass = '' 
+    p_line = re.compile('FASTA\sdefinition\sline:\s(.*)\s+length=\d+|\s+(\d+)\s+([+-])\s+([\d\>\<]+)\s+(\d+)\s+(\d+)\s+\d+')
+    for line in lines:
+        if line.startswith('#'):
+            continue 
+        match_line = p_line.search(line)
+        if match_line is None:
+            continue
+        if match_line.group(1) is not None:  # contig line
+            contig = GetContigName(match_line.group(1))
+            continue
+        geneNo   = int(match_line.group(2))
+        strand   =     match_line.group(3)     
+        leftEnd  =     match_line.group(4)   # Note: left/right end could have '<' or '>' symbol
+        rightEnd =     match_line.group(5)
+        length   = int(match_line.group(6))
+        # Note: left/right end could have '>' or '<' symbol, if gene call spanned across contigs
+        # I am removing the symbol, so if start=1 this may imply a gene that spans 
+        # For a gene spanning 2 contigs or wrapping around, genemark estimates length based on
+        # raw start/stop without symbol
+        if leftEnd[0] in '<>':
+            leftEnd = leftEnd[1:] 
+        if rightEnd[0] in '<>':
+            rightEnd = rightEnd[1:] 
+        if contig == '':
+            contig = 'unknown'  # Contig name may be absent in input file
+        yield (geneNo,strand,int(leftEnd),int(rightEnd),length,contig)
+    return
+            
+def ParseGlimmer(lines):
+    # NOTE:  Glimmer2 appears to truncate the initial met (sometimes?): test with other data sets (e.g., + strand calls)
+    geneNo = 0; contig = ''; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
+    p_contigLine = '^>(.*)'  # glimmer3 FASTA header line; the contig is its first word
+
+    if GLIMMER3:
+        p_dataLine = 'orf(\d+)\s+(\d+)\s+(\d+)\s+([+-])\d\s+([\d\.]+)'
+    else:
+        p_dataLine = '\s+(\d+)\s+(\d+)\s+(\d+)\s+\[([+-])\d\sL=\s*(\d+)\sr=.*\]'
+    p_line = re.compile(p_contigLine + '|' + p_dataLine)
+
+    for line in lines:
+        if line.startswith('#'):
+            continue 
+        match_line = p_line.search(line)
+        if match_line is None:
+            continue
+        if match_line.group(1) is not None:  # contig line
+            contig = GetContigName(match_line.group(1))
+            continue
+        geneNo   = int(match_line.group(2))
+        left     = int(match_line.group(3))
+        right    = int(match_line.group(4))
+        strand   =     match_line.group(5)
+        if strand == '+':
+            leftEnd  = left 
+            if GLIMMER3:
+                rightEnd = right
+            else:
+                rightEnd = right + 3
+        else:  # strand is '-'
+            if GLIMMER3:
+                leftEnd = right
+            else:
+                leftEnd  = right - 3    
+            rightEnd = left  
+
+        length = rightEnd - leftEnd + 1
+        if contig == '':    # contig name may be left out of input file
+            contig = 'unknown'
+        yield (geneNo,strand,leftEnd,rightEnd,length,contig)
+    return
+
+# GFF3: fixed tab-separated columns, so lines are split rather than matched
+def ParseRAST(lines):
+    geneNo = 0; contig = ""; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
+    if not RAST_GFF3:
+        return  # Not using other RAST format (for now)
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        # Columns: contig, source, type, start, end, score, strand, phase, attributes
+        if len(fields) < 9 or fields[2] != 'CDS' or fields[5] != '.' or fields[6] not in ('+','-') \
+           or not fields[3].isdigit() or not fields[4].isdigit() or not fields[7].isdigit():
+            continue
+        count += 1
+        geneNo = count 
+        contig    = GetContigName(fields[0])
+        leftEnd   = int(fields[3])
+        rightEnd  = int(fields[4])
+        strand    = fields[6]
+        length = rightEnd - leftEnd + 1
+        yield (geneNo,strand,leftEnd,rightEnd,length,contig)
+    return
+ 
+# Both Prodigal formats are fixed: ">geneNo_left_right_strand" lines (sco) or tab-separated GFF columns
+def ParseProdigal(lines):
+    geneNo = 0; contig = "unknown"; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0; 
+
+    if PRODIGAL_sco:  # using XXX.genes.sco file
+        for line in lines:
+            if not line.startswith('>'):
+                if line.startswith('# Sequence Data:'):  # contig line: ...;seqhdr="<FASTA header>"
+                    match_contig = p_seqhdr.search(line)
+                    if match_contig:
+                        contig = GetContigName(match_contig.group(1))
+                continue 
+            fields = line[1:].split('_',3)
+            if len(fields) < 4 or not fields[0].isdigit() or not fields[1].isdigit() or not fields[2].isdigit() \
+               or fields[3][:1] not in ('+','-'):
+                continue
+            geneNo   = int(fields[0])
+            leftEnd  = int(fields[1])
+            rightEnd = int(fields[2])
+            strand   = fields[3][0]
+            length   = rightEnd - leftEnd + 1 
+            yield (geneNo,strand,leftEnd,rightEnd,length,contig)
+
+    else: # using XXX.genes file
+        for line in lines:
+            if line.startswith('#'):
+                continue 
+            fields = line.split('\t')
+            # Columns: contig, source, type, start, end, score, strand, phase, attributes
+            if len(fields) < 9 or fields[2] != 'CDS' or fields[6] not in ('+','-') \
+               or not fields[3].isdigit() or not fields[4].isdigit() or not fields[5] or fields[5].strip(GFF_SCORE_CHARS):
+                continue
+            count += 1
+            geneNo   = count 
+            contig   = GetContigName(fields[0])
+            leftEnd  = int(fields[3])
+            rightEnd = int(fields[4])
+            strand   = fields[6]
+            length   = rightEnd - leftEnd + 1
+            yield (geneNo,strand,leftEnd,rightEnd,length,contig)
+    return
+
+# PhATE: tab-separated "start, stop, strand" lines, each contig's calls following a ">contig" line, if any
+def ParsePhate(lines):      # SDSU code
+    geneNo = 0; contig = "unknown"; strand = ''; leftEnd = ''; rightEnd = ''; length = 0; count = 0 
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        if line.startswith('>'):  # contig line
+            contig = GetContigName(line[1:])
+            continue
+        fields = line.split('\t',3)
+        if len(fields) < 3 or not fields[0].isdigit() or not fields[1].isdigit() or fields[2][:1] not in ('+','-'):
+            continue
+        count += 1
+        geneNo = count
+        strand = fields[2][0]
+        if strand == '+':
+            leftEnd  = int(fields[0])
+            rightEnd = int(fields[1])
+        else:
+            rightEnd = int(fields[0])
+            leftEnd  = int(fields[1])
+        length = abs(rightEnd - leftEnd) + 1
+        yield (geneNo,strand,leftEnd,rightEnd,length,contig)
+    return
+
+##### PARSER REGISTRY
+
+# Gene caller name pattern => parsing function; the first pattern that matches the name is used
+PARSERS = [
+    (p_genemark, ParseGenemark),
+    (p_glimmer,  ParseGlimmer),
+    (p_prodigal, ParseProdigal),
+    (p_rast,     ParseRAST),
+    (p_phate,    ParsePhate),
+    ]
+
+# Return the parsing function for the named gene caller, or None if the caller is not supported
+def GetParser(geneCaller):
+    for pattern, parser in PARSERS:
+        if re.search(pattern,geneCaller):
+            return parser
+    return None
+
+# Parse a gene caller's output; source is a path, or an open file (or other iterable of lines)
+# A path may name a compressed file; with workers > 1, a large uncompressed file in a format that
+# IsChunkable() is parsed in chunks, in parallel
+# Returns an iterator over (geneNo, strand, leftEnd, rightEnd, length, contig) tuples
+# Raises ValueError if the gene caller is not supported, IOError if the file cannot be opened
+def Parse(geneCaller,source,workers=1):
+    parser = GetParser(geneCaller)
+    if parser is None:
+        raise ValueError("Cannot process unknown gene caller output file: " + geneCaller)
+    if isinstance(source,basestring):
+        if workers > 1 and IsChunkable(parser) and os.path.getsize(source) > CGC_input.CHUNK_SIZE \
+           and CGC_input.GetCompression(source) is None:
+            return ParseChunked(parser,source,workers)
+        return ParseFile(parser,source)
+    return parser(source)
+
+# True if the parser reads each line independently of the lines before it, other than to number the
+# calls, so that a file may be parsed in chunks; formats with contig header lines are read in one pass
+def IsChunkable(parser):
+    return parser is ParseRAST or (parser is ParseProdigal and not PRODIGAL_sco)
+
+# Parse the lines of one chunk of a file; runs in a worker process
+# job is (parser name, file name, start, end); returns the chunk's calls as columns, which are passed back
+# to the main process much faster than tuples: (strands, leftEnds, rightEnds, lengths, contig ids, contig names),
+# where strands is a string and the others but contig names are int arrays, as strings
+def ParseChunk(job):
+    parserName, fileName, start, end = job
+    strands = []; leftEnds = array.array('i'); rightEnds = array.array('i'); lengths = array.array('i')
+    contigIds = array.array('i'); contigNames = []; contigIndex = {}
+    for geneNo, strand, leftEnd, rightEnd, length, contig in globals()[parserName](CGC_input.ReadChunk(fileName,start,end)):
+        if contig not in contigIndex:
+            contigIndex[contig] = len(contigNames)
+            contigNames.append(contig)
+        strands.append(strand); leftEnds.append(leftEnd); rightEnds.append(rightEnd); lengths.append(length)
+        contigIds.append(contigIndex[contig])
+    return (''.join(strands),leftEnds.tostring(),rightEnds.tostring(),lengths.tostring(),contigIds.tostring(),contigNames)
+
+# Parse an uncompressed file in chunks, in a pool of worker processes; the chunks' calls are yielded
+# in file order, numbered in sequence, as the parser numbers them when reading the file in one pass
+def ParseChunked(parser,fileName,workers):
+    jobs = [(parser.__name__,fileName,start,end) for start, end in CGC_input.GetChunks(fileName)]
+    pool = multiprocessing.Pool(min(workers,len(jobs)))
+    try:
+        count = 0
+        for strands, leftEnds, rightEnds, lengths, contigIds, contigNames in pool.imap(ParseChunk,jobs):
+            for strand, leftEnd, rightEnd, length, contigId in izip(strands,array.array('i',leftEnds),array.array('i',rightEnds),
+                                                                   array.array('i',lengths),array.array('i',contigIds)):
+                count += 1
+                yield (count,strand,leftEnd,rightEnd,length,contigNames[contigId])
+    finally:
+        pool.terminate()
+        pool.join()
+    return
+
+def ParseFile(parser,fileName):
+    INFILE = CGC_input.OpenInput(fileName)
+    try:
+        for call in parser(INFILE):
+            yield call
+    finally:
+        INFILE.close()
+    return
+
+# Write calls in the normalized format read by CGC_main.py, to each of the open files in outHandles
+# Rows are formatted once, then written in batches of WRITE_BATCH rows; returns the number of calls
+# If index is a list, a (contig, byte offset, byte length, calls) entry is appended to it for each run of
+# consecutive calls on one contig (see CGC_geneCall.WriteContigIndex())
+def WriteCalls(geneCaller,sourceName,calls,outHandles,index=None):
+    header = "%s%s%s%s%s\n%s\n" % ('# ',geneCaller, " gene calls",", taken from file ",sourceName,COLUMN_HEADER)
+    for OUT in outHandles:
+        OUT.write(header)
+    count = 0; rows = []
+    offset = len(header); contig = None; blockStart = offset; blockCount = 0
+    for call in calls:
+        row = "%s\t%s\t%s\t%s\t%s\t%s\n" % call
+        if call[5] != contig:
+            if blockCount and index is not None:
+                index.append((contig,blockStart,offset - blockStart,blockCount))
+            contig = call[5]; blockStart = offset; blockCount = 0
+        blockCount += 1
+        offset += len(row)
+        rows.append(row)
+        if len(rows) >= WRITE_BATCH:
+            text = ''.join(rows)
+            for OUT in outHandles:
+                OUT.write(text)
+            count += len(rows); rows = []
+    if blockCount and index is not None:
+        index.append((contig,blockStart,offset - blockStart,blockCount))
+    text = ''.join(rows) + "# END\n"
+    for OUT in outHandles:
+        OUT.write(text)
+    count += len(rows)
+    return count
+
+# Group a call file written by WriteCalls() by contig, if need be, and write its contig index; index is as
+# filled by WriteCalls() (see CGC_geneCall.GroupByContig() and WriteContigIndex())
+def IndexCallFile(fileName,index):
+    CGC_geneCall.WriteContigIndex(fileName,CGC_geneCall.GroupByContig(fileName,index))
+    return
+
+# Expand multi-input specifications, <caller>:<file|glob>, into a list of (caller, file) pairs
+# A pattern that matches no file is kept as given, so that the missing file is reported
+def ExpandInputs(specs):
+    inputs = []
+    for spec in specs:
+        geneCaller, colon, pattern = spec.partition(':')
+        if colon == "" or pattern == "":
+            raise ValueError("Input must be given as <geneCaller_name>:<geneCall_filename>: " + spec)
+        if GetParser(geneCaller) is None:
+            raise ValueError("Cannot process unknown gene caller output file: " + geneCaller)
+        fileNames = sorted(glob.glob(pattern))
+        if not fileNames:
+            fileNames = [pattern]
+        for fileName in fileNames:
+            inputs.append((geneCaller.lower(),fileName))
+    return inputs
+
+# The output file name is the input file name, less any compression suffix, plus suffix
+def GetOutputPath(inFile,outDir,suffix=OUT_SUFFIX):
+    return os.path.join(outDir,os.path.basename(CGC_input.StripCompressionSuffix(inFile)) + suffix)
+
+# Parse one input file to its own output file; runs in a worker process, unless there is a single input
+# job is (geneCaller, input file, output file, binary, chunk workers); returns (input file, output file,
+# call count, error message). Chunk workers (see Parse()) may be more than 1 only if run in the main process
+# The calls are written to a temporary file in the output directory, which is renamed when complete; its contig
+# index is written first, and renamed last, after any old index of the output file has been removed, so that
+# an old index is never read with the new output file. Any error fails this input only, and is returned as its
+# error message; the temporary files are removed however the parse ends
+def ParseToFile(job):
+    geneCaller, inFile, outFile, binary, workers = job
+    tempFile = "%s.%d.tmp" % (outFile,os.getpid())
+    try:
+        if binary:
+            callSet = CGC_geneCall.GeneCallSet()
+            callSet.AddParsedCalls(geneCaller,inFile,Parse(geneCaller,inFile,workers))
+            callSet.SortGeneCalls()
+            OUT = open(tempFile,"wb")
+        else:
+            OUT = open(tempFile,"w")
+        try:
+            if binary:
+                callSet.WriteBinary(OUT)
+                count = callSet.geneCount
+            else:
+                index = []
+                count = WriteCalls(geneCaller,inFile,Parse(geneCaller,inFile,workers),[OUT],index)
+        finally:
+            OUT.close()
+        if not binary:  # the index of the temporary file is that of the output file, which has the same bytes
+            index = CGC_geneCall.GroupByContig(tempFile,index)
+            CGC_geneCall.WriteContigIndex(tempFile,index)
+        if os.path.exists(outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX):  # never read with the new output file
+            os.remove(outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX)
+        os.rename(tempFile,outFile)
+        if not binary:
+            os.rename(tempFile + CGC_geneCall.CONTIG_INDEX_SUFFIX,outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX)
+    except (IOError, OSError, ValueError) as e:
+        return (inFile,outFile,0,str(e))
+    except Exception as e:  # e.g., IndexError on a malformed line: any failure ends this input only
+        return (inFile,outFile,0,"%s: %s" % (type(e).__name__,e))
+    finally:  # left only if the output was not completed
+        for fileName in (tempFile,tempFile + CGC_geneCall.CONTIG_INDEX_SUFFIX):
+            if os.path.exists(fileName):
+                os.remove(fileName)
+    return (inFile,outFile,count,"")
+
+# Parse each (caller, input file, output file, binary) job, in a pool of worker processes
+# The largest files are started first, so that the run takes about as long as the largest file
+# A single input is parsed in the main process, in chunks in parallel where its format allows
+# Yields ParseToFile() results as the files complete
+def ParseFiles(jobs,workers=1):
+    jobs = sorted(jobs,key=lambda job: os.path.getsize(job[1]) if os.path.isfile(job[1]) else 0,reverse=True)
+    if workers > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(min(workers,len(jobs)))
+        try:
+            for result in pool.imap_unordered(ParseToFile,[job + (1,) for job in jobs]):
+                yield result
+        finally:  # also if the caller stops early, or is interrupted: no worker is left running
+            pool.terminate()
+            pool.join()
+    else:
+        for job in jobs:
+            yield ParseToFile(job + (workers,))
+    return
+
+##### BEGIN MAIN 
+
+if __name__ == "__main__":
+
+    infile    = ""  # user provided
+    USER_OUT_PROVIDED = False 
+
+    LOGFILE = open(logfile,"w")
+
+    ##### MULTI-INPUT MODE: options, or inputs given as <caller>:<file>
+
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    if options or (args and ':' in args[0] and not os.path.exists(args[0])):
+        workers = multiprocessing.cpu_count()
+        outDir  = "."
+        binary  = False
+        for option in options:
+            if option == "--binary":
+                binary = True
+            elif option.startswith("--workers=") and option[len("--workers="):].isdigit():
+                workers = max(1,int(option[len("--workers="):]))
+            elif option.startswith("--outdir=") and option[len("--outdir="):] != "":
+                outDir = option[len("--outdir="):]
+            else:
+                print "Unrecognized option:", option
+                print USAGE_STRING
+                LOGFILE.close(); exit(0)
+        try:
+            inputs = ExpandInputs(args)
+        except ValueError as e:
+            print "ERROR:", e
+            LOGFILE.write("%s%s\n" % ("ERROR: ",e))
+            LOGFILE.close(); exit(0)
+        if not inputs:
+            print USAGE_STRING
+            LOGFILE.write("%s\n" % ("No input files provided"))
+            LOGFILE.close(); exit(0)
+        if not os.path.isdir(outDir):
+            os.makedirs(outDir)
+        jobs = []; outFiles = set()
+        for geneCaller, inFile in inputs:
+            if binary:
+                outFile = GetOutputPath(inFile,outDir,CGC_geneCall.BINARY_SUFFIX)
+            else:
+                outFile = GetOutputPath(inFile,outDir)
+            if outFile in outFiles:  # inputs in different directories, with the same file name
+                print "ERROR: more than one input would be written to", outFile, "; skipped:", inFile
+                LOGFILE.write("%s%s%s%s\n" % ("ERROR: more than one input would be written to ",outFile,"; skipped: ",inFile))
+                continue
+            outFiles.add(outFile)
+            jobs.append((geneCaller,inFile,outFile,binary))
+        for inFile, outFile, count, error in ParseFiles(jobs,workers):
+            if error:
+                print "ERROR: problem with input file:", inFile, error
+                LOGFILE.write("%s%s %s\n" % ("ERROR: problem with input file:",inFile,error))
+            else:
+                if CHATTY:
+                    print "Parsed", count, "calls from", inFile, "to", outFile
+                LOGFILE.write("%s\t%s\t%s\n" % (inFile,outFile,count))
+        LOGFILE.write("%s\n" % ("Processing complete"))
+        LOGFILE.close(); exit(0)
+
+    ##### GET INPUT PARAMETERS
+
+    geneCaller    = ""
+    geneCallerOut = ""
+    userOutfile   = ""
+
+    argCount = len(sys.argv)
+    if argCount in ACCEPTABLE_ARG_COUNT:
+        match = re.search("help", sys.argv[1].lower())
+        if match:
+            print HELP_STRING
+            LOGFILE.close(); exit(0)
+        match = re.search("input", sys.argv[1].lower())
+        if match:
+            print INPUT_STRING
+            LOGFILE.close(); exit(0)
+        match = re.search("usage", sys.argv[1].lower())
+        if match:
+            print USAGE_STRING
+            LOGFILE.close(); exit(0)
+
+        # Capture name of gene caller and its output file
+        if argCount == 3 or argCount == 4:
+            geneCaller    = sys.argv[1].lower()  # case insensitive
+            geneCallerOut = sys.argv[2]
+        else:
+            print USAGE_STRING
+            LOGFILE.write("%s\n" % ("Incorrect number of command-line arguments provided"))
+            LOGFILE.close(); exit(0)
+        if argCount == 4:
+            USER_OUT_PROVIDED = True
+            userOutfile   = sys.argv[3]
+    else:
+        print USAGE_STRING
+        LOGFILE.write("%s\n" % ("Incorrect number of command-line arguments provided"))
+        LOGFILE.close(); exit(0)
+
+    # Open files
+
+    try:
+        INFILE  = CGC_input.OpenInput(geneCallerOut)
+        OUTFILE = open(outfile,"w")
+    except IOError as e:
+        print e
+        LOGFILE.write("%s%s%s\n" % ("ERROR: problem with input file:",geneCallerOut,e))
+        LOGFILE.close(); exit(0)
+
+    outHandles = [OUTFILE]
+    if USER_OUT_PROVIDED:
+        try:
+            outHandles.append(open(userOutfile,"w"))
+        except IOError as e:
+            print e
+
+    # Determine which gene caller was used, then parse and write the calls
+
+    index = []
+    if GetParser(geneCaller) is None:
+        LOGFILE.write("%s%s\n" % ("ERROR: Cannot process unknown gene caller output file:",geneCaller))
+        WriteCalls(geneCaller,geneCallerOut,[],outHandles,index)
+    else:
+        WriteCalls(geneCaller,geneCallerOut,Parse(geneCaller,INFILE),outHandles,index)
+
+    ##### CLEAN UP
+
+    INFILE.close()
+    for OUT in outHandles:
+        OUT.close()
+        IndexCallFile(OUT.name,index)  # calls grouped by contig, and each contig's location in the file
+    LOGFILE.write("%s\n" % ("Processing complete"))
+    LOGFILE.close()
@@ -0,0 +1,205 @@
+###################################################################################################
+#
+# Module:  CGC_profile.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module for measuring a comparison run, phase by phase (load, parse, sort, compare,
+#    common core, report): wall time, CPU time, peak resident memory and the number of items handled,
+#    for each phase and each caller. The measurements are written as a JSON metrics file. A profiler
+#    (cProfile, or a census of the objects in memory) may be run over the whole run.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: cProfile and pstats are imported only when a profiler runs
+#    16 Oct 2026: memory profiler: object census by type (gc) and peak RSS, replacing tracemalloc (Python 3 only)
+#
+# Programmer's Notes:
+#    Peak resident memory (ru_maxrss) is the process's peak up to the end of the phase; it never
+#    decreases, so a phase that raises it is the phase that sized the process. Work done in worker
+#    processes (--workers) is reported separately, as child CPU time and the largest child's peak.
+#    Phases are measured with getrusage() and time.time() only, which cost microseconds. CGC_main.py
+#    loads this module, and measures a run, only with --metrics or --profile (see CGC_main.NoMetrics).
+#    The memory profiler counts the objects reachable from the garbage collector's tracked objects
+#    (containers and instances, and the strings, numbers and arrays they refer to directly), by type,
+#    at Start() and at Stop(), and lists the types that grew most, with the peak RSS of the run.
+#    Objects freed before Stop() are not counted; the per-phase peak RSS (RunMetrics) covers them.
+#
+# Classes and Methods:
+#    RunMetrics()
+#        Phase(phase,caller=None,source=None)
+#        GetTotals()
+#        WriteJSON(OUT)
+#        PrintSummary(OUT)
+#    GetCensus()
+#    Profiler(mode)
+#        Start()
+#        Stop(fileBase)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import gc
+import sys
+import time
+import json
+import resource
+from contextlib import contextmanager
+
+##### CONSTANTS
+
+METRICS_VERSION = 1
+PROFILE_CPROFILE    = "cprofile"
+PROFILE_MEMORY      = "memory"
+PROFILE_MODES = (PROFILE_CPROFILE, PROFILE_MEMORY)
+PROFILE_DATA_FILE = ".prof"          # suffix of the cProfile data file (readable with pstats)
+PROFILE_TEXT_FILE = ".profile.txt"   # suffix of the profiler's readable summary
+PROFILE_TOP = 40                     # functions (or source lines) listed in the summary
+
+# ru_maxrss is in KB on Linux, in bytes on Mac OS X
+if sys.platform == "darwin":
+    RSS_UNIT = 1024.0 * 1024.0
+else:
+    RSS_UNIT = 1024.0
+
+# Returns (CPU seconds of this process, CPU seconds of its finished children, peak RSS (MB), largest child's peak RSS (MB))
+def GetUsage():
+    usage    = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (usage.ru_utime + usage.ru_stime, children.ru_utime + children.ru_stime,
+            usage.ru_maxrss / RSS_UNIT, children.ru_maxrss / RSS_UNIT)
+
+class RunMetrics(object):
+
+    def __init__(self):
+        self.phases  = []  # one dict per phase measured, in the order run
+        self.started = time.time()
+        self.startUsage = GetUsage()
+
+    # Measure the block of a with statement as a phase; the block may set record['items'] (calls, groups,
+    # rows) and other counts on the record yielded. caller and source (file name) are recorded if given
+    @contextmanager
+    def Phase(self,phase,caller=None,source=None):
+        record = {'phase':phase, 'items':0}
+        if caller is not None:
+            record['caller'] = caller
+        if source is not None:
+            record['source'] = source
+        cpuBefore, childBefore, peakBefore, childPeakBefore = GetUsage()
+        start = time.time()
+        try:
+            yield record
+        finally:
+            wall = time.time() - start
+            cpuAfter, childAfter, peakAfter, childPeakAfter = GetUsage()
+            record['wall']   = round(wall,6)
+            record['cpu']    = round(cpuAfter - cpuBefore,6)
+            record['peakRSS_MB'] = round(peakAfter,1)
+            record['rssGrowth_MB'] = round(peakAfter - peakBefore,1)
+            if childAfter > childBefore:
+                record['childCpu'] = round(childAfter - childBefore,6)
+                record['childPeakRSS_MB'] = round(childPeakAfter,1)
+            self.phases.append(record)
+        return
+
+    # Returns phase name => {'wall', 'cpu', 'items', 'count'}, summed over the phase's records (e.g., over callers)
+    def GetTotals(self):
+        totals = {}
+        for record in self.phases:
+            total = totals.setdefault(record['phase'],{'wall':0.0, 'cpu':0.0, 'items':0, 'count':0})
+            total['wall']  += record['wall']
+            total['cpu']   += record['cpu'] + record.get('childCpu',0.0)
+            total['items'] += record['items']
+            total['count'] += 1
+        for total in totals.values():
+            total['wall'] = round(total['wall'],6); total['cpu'] = round(total['cpu'],6)
+        return totals
+
+    def WriteJSON(self,OUT):
+        cpu, childCpu, peak, childPeak = GetUsage()
+        metrics = {'version':METRICS_VERSION, 'command':sys.argv, 'python':sys.version.split()[0],
+                   'phases':self.phases, 'totals':self.GetTotals(),
+                   'run':{'wall':round(time.time() - self.started,6), 'cpu':round(cpu - self.startUsage[0],6),
+                          'childCpu':round(childCpu - self.startUsage[1],6), 'peakRSS_MB':round(peak,1),
+                          'childPeakRSS_MB':round(childPeak,1)}}
+        json.dump(metrics,OUT,indent=1,sort_keys=True)
+        OUT.write("\n")
+        return
+
+    # One line per phase, in the order the phases were first run, for the log
+    def PrintSummary(self,OUT=None):
+        totals = self.GetTotals()
+        printed = set()
+        for record in self.phases:
+            phase = record['phase']
+            if phase in printed:
+                continue
+            printed.add(phase)
+            total = totals[phase]
+            print >>OUT, "Phase %-12s wall %8.3f s  cpu %8.3f s  items %9d  peak RSS %8.1f MB" % \
+                  (phase,total['wall'],total['cpu'],total['items'],max([r['peakRSS_MB'] for r in self.phases if r['phase'] == phase]))
+        return
+
+# Count the objects in memory by type: returns type name => [objects, bytes], over the objects tracked by the
+# garbage collector and the objects they refer to directly (each counted once)
+def GetCensus():
+    census = {}; seen = set()
+    for tracked in gc.get_objects():
+        for item in [tracked] + gc.get_referents(tracked):
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            entry = census.setdefault(type(item).__name__,[0,0])
+            entry[0] += 1
+            entry[1] += sys.getsizeof(item,0)
+    return census
+
+# Runs cProfile, or takes a census of memory, from Start() to Stop(); Stop() writes the results to files
+# beginning with fileBase
+class Profiler(object):
+
+    def __init__(self,mode):
+        if mode not in PROFILE_MODES:
+            raise ValueError("unknown profiler: " + str(mode))
+        self.mode    = mode
+        self.profile = None
+        self.census  = None  # memory: the census at Start()
+
+    def Start(self):
+        if self.mode == PROFILE_CPROFILE:
+            import cProfile  # imported here: most runs are not profiled
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.census = GetCensus()
+        return
+
+    # Returns the list of files written
+    def Stop(self,fileBase):
+        TEXT = open(fileBase + PROFILE_TEXT_FILE,"w")
+        if self.mode == PROFILE_CPROFILE:
+            import pstats
+            self.profile.disable()
+            self.profile.dump_stats(fileBase + PROFILE_DATA_FILE)
+            stats = pstats.Stats(self.profile,stream=TEXT)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            stats.sort_stats("time").print_stats(PROFILE_TOP)
+            files = [fileBase + PROFILE_DATA_FILE, fileBase + PROFILE_TEXT_FILE]
+        else:
+            census = GetCensus()
+            cpu, childCpu, peak, childPeak = GetUsage()
+            TEXT.write("Peak RSS %.1f MB (largest child process %.1f MB)\n" % (peak,childPeak))
+            TEXT.write("Objects in memory at the end of the run, by type, most bytes gained first:\n")
+            TEXT.write("%-24s %12s %12s %14s %14s\n" % ("type","objects","gained","bytes","gained"))
+            growth = []
+            for typeName, (count, size) in census.items():
+                startCount, startSize = self.census.get(typeName,(0,0))
+                growth.append((size - startSize,typeName,count,count - startCount,size))
+            growth.sort(reverse=True)
+            for sizeGain, typeName, count, countGain, size in growth[:PROFILE_TOP]:
+                TEXT.write("%-24s %12d %12d %14d %14d\n" % (typeName,count,countGain,size,sizeGain))
+            files = [fileBase + PROFILE_TEXT_FILE]
+        TEXT.close()
+        return files
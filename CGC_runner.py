@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_runner.py  # Compare Gene Calls, Runner
+#
+# Programmer: Carol Zhou
+#
+# Description:  Runs the comparisons of a large queue of genomes as a
+#    pipeline of stages: parse (raw gene caller outputs are normalized,
+#    as by CGC_parser.py) then compare (the call files are loaded and
+#    compared, as by CGC_main.py). Each stage runs a bounded number of
+#    jobs at a time, the queues between stages are bounded, so that a
+#    slow stage holds back the stages before it, and each job may be
+#    given a time limit and a number of retries. Throughput (genomes and
+#    gene calls per second) is reported as the run proceeds.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: --match, --min-overlap, --grid, --backend and --stream options, as for CGC_main.py
+#
+# Programmer's Notes:
+#    Manifest format: as for CGC_batch.py; a genome's files may be call
+#    files, or raw outputs given as <caller>:<file>.
+#    Output, for each genome:  <outdir>/<genome id>/CGC_main.out (report, as written by CGC_main.py)
+#                              <outdir>/<genome id>/CGC_main.log
+#                              <outdir>/<genome id>/<file>.<caller>.cgb (raw outputs, parsed)
+#                              (with --stream, <outdir>/<genome id>/<file>.<caller>.cgc: sorted call files)
+#    Summary of all genomes:   <outdir>/CGC_runner.summary.tsv (as CGC_batch.py, in order of completion)
+#    Each stage has its own threads, as many as the jobs it may run at a
+#    time. A thread runs each job's parsing or comparison in a process of
+#    its own, forked for the job, so that CPU-bound work runs in parallel
+#    and a job that exceeds its time limit can be stopped. Loading is part
+#    of the compare stage: passing loaded call sets between processes
+#    would cost more than loading them. Raw outputs are parsed to binary
+#    call files, which load without parsing or sorting; with --stream, to
+#    call files sorted as a streaming comparison reads them.
+#    A job that times out, or whose process dies, is retried (--retries);
+#    a job that fails with an error (e.g., a missing file) is not, since
+#    it would fail again.
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import os
+import re
+import time
+import Queue
+import threading
+import multiprocessing
+import CGC_geneCall
+import CGC_compare
+import CGC_grid
+import CGC_parser
+import CGC_main
+import CGC_batch
+
+##### FILES
+
+CODE_BASE    = "./CGC_runner"
+CODE_FILE    = CODE_BASE + ".py"
+SUMMARY_FILE = "CGC_runner.summary.tsv"
+
+##### PRINT CONTROL
+
+CHATTY = True
+#CHATTY = False
+
+##### CONSTANTS
+
+STAGE_PARSE   = "parse"
+STAGE_COMPARE = "compare"
+
+DEFAULT_RETRIES  = 1
+DEFAULT_INTERVAL = 5.0   # seconds between throughput reports
+QUEUE_PER_WORKER = 4     # default queue size, per compare worker
+
+RESULT_OK     = "ok"      # the job's function returned
+RESULT_ERROR  = "error"   # the job's function raised an exception: not retried
+RESULT_FAILED = "failed"  # the job timed out, or its process died: retried
+
+HELP_STRING = "This code compares gene calls for each genome listed in a manifest, as a pipeline of parse and compare stages, each running a bounded number of jobs at a time, with time limits and retries. Type: python " + CODE_FILE + " usage|input for more information\n"
+
+USAGE_STRING = "Usage:  python " + CODE_FILE + " [--parse-workers=N] [--compare-workers=N] [--queue-size=N] [--timeout=SECONDS] [--retries=N] [--interval=SECONDS] [--match=exact|same-stop|overlap] [--min-overlap=F] [--grid=tsv|csv|long] [--backend=python|numpy] [--stream] <manifest> <outdir>\n"
+
+INPUT_STRING = "The manifest lists one genome per line: a genome id, followed by its gene call files (prepared by CGC_parser.py), or its gene callers' raw outputs given as <caller>:<file>, separated by tabs. Lines beginning with '#' are skipped. Raw outputs are parsed in the parse stage, by up to --parse-workers=N jobs at a time; genomes are compared in the compare stage, by up to --compare-workers=N jobs at a time (each default: number of CPUs). At most --queue-size=N genomes (default: " + str(QUEUE_PER_WORKER) + " per compare worker) wait between stages. A job that runs longer than --timeout=SECONDS (default: no limit) is stopped, and retried up to --retries=N times (default " + str(DEFAULT_RETRIES) + "). Throughput is reported every --interval=SECONDS (default " + str(DEFAULT_INTERVAL) + "). Options --match, --min-overlap, --grid, --backend and --stream select the comparison of each genome, as for CGC_main.py (--stream: exact matching only). The report and log for each genome are written to <outdir>/<genome id>/, and a summary of all genomes to <outdir>/" + SUMMARY_FILE + "\n"
+
+##### FUNCTIONS
+
+# Runs in a job's process: send (RESULT_OK, result) or (RESULT_ERROR, message) to the parent
+def CallInProcess(SENDER,function,args):
+    try:
+        result = (RESULT_OK,function(*args))
+    except Exception as e:
+        result = (RESULT_ERROR,"%s: %s" % (type(e).__name__,e))
+    SENDER.send(result)
+    SENDER.close()
+    return
+
+# Run function(*args) in a process of its own; the process is stopped if it runs longer than timeout seconds
+# (None: no limit). Returns (RESULT_OK, result), (RESULT_ERROR, message) or (RESULT_FAILED, message)
+def RunInProcess(function,args,timeout=None):
+    RECEIVER, SENDER = multiprocessing.Pipe(False)
+    process = multiprocessing.Process(target=CallInProcess,args=(SENDER,function,args))
+    process.daemon = True
+    process.start()
+    SENDER.close()  # the child's end: the parent sees end of file if the child dies
+    if RECEIVER.poll(timeout):
+        try:
+            result = RECEIVER.recv()
+        except EOFError:
+            result = (RESULT_FAILED,"worker process exited with status " + str(process.exitcode))
+    else:
+        process.terminate()
+        result = (RESULT_FAILED,"timed out after %g s" % (timeout))
+    process.join()
+    RECEIVER.close()
+    return result
+
+# Parse a raw output to a call file sorted by contig, leftEnd, rightEnd and strand, as a streaming comparison reads it
+# Returns the number of calls; raises IOError or ValueError if the raw output cannot be parsed
+def WriteSortedCalls(geneCaller,rawFile,outFile):
+    callSet = CGC_geneCall.GeneCallSet()
+    callSet.AddParsedCalls(geneCaller,rawFile,CGC_parser.Parse(geneCaller,rawFile))
+    callSet.SortGeneCalls()
+    calls = [(geneCall.geneNumber,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,geneCall.geneLength,geneCall.contig)
+             for geneCall in callSet.geneCallList]
+    OUT = open(outFile,"w")
+    try:
+        count = CGC_parser.WriteCalls(geneCaller,rawFile,calls,[OUT])
+    finally:
+        OUT.close()
+    return count
+
+# Parse the raw outputs (<caller>:<file>) among a genome's files to binary call files in genomeDir
+# (with stream, to sorted call files; see WriteSortedCalls())
+# Returns (the genome's call files, number of calls parsed); raises ValueError if a raw output cannot be parsed
+def ParseGenome(fileSet,genomeDir,stream=False):
+    if not os.path.isdir(genomeDir):
+        os.makedirs(genomeDir)
+    callFiles = []
+    count = 0
+    for geneFile in fileSet:
+        rawInput = CGC_main.GetRawInput(geneFile)
+        if rawInput is None:
+            callFiles.append(geneFile)
+            continue
+        geneCaller, rawFile = rawInput
+        if stream:
+            outFile = CGC_parser.GetOutputPath(rawFile,genomeDir,"." + geneCaller + CGC_parser.OUT_SUFFIX)
+            try:
+                fileCount = WriteSortedCalls(geneCaller,rawFile,outFile)
+            except (IOError, ValueError) as e:
+                raise ValueError("cannot parse " + rawFile + ": " + str(e))
+            callFiles.append(outFile)
+            count += fileCount
+            continue
+        outFile = CGC_parser.GetOutputPath(rawFile,genomeDir,"." + geneCaller + CGC_geneCall.BINARY_SUFFIX)
+        inFile, outFile, fileCount, error = CGC_parser.ParseToFile((geneCaller,rawFile,outFile,True,1))
+        if error:
+            raise ValueError("cannot parse " + rawFile + ": " + error)
+        callFiles.append(outFile)
+        count += fileCount
+    return callFiles, count
+
+##### CLASSES
+
+# A stage of the pipeline: concurrency threads take jobs from inQueue, run them, and put them on outQueue
+# A job is a dict (see JobRunner.Feed()); a job that has failed passes through later stages untouched
+class Stage(object):
+
+    def __init__(self,name,function,concurrency,inQueue,outQueue,timeout=None,retries=DEFAULT_RETRIES):
+        self.name        = name
+        self.function    = function   # called with the job; returns (result status, result or message)
+        self.concurrency = concurrency
+        self.inQueue     = inQueue
+        self.outQueue    = outQueue
+        self.timeout     = timeout
+        self.retries     = retries
+        self.lock        = threading.Lock()
+        self.running     = 0     # threads not yet finished
+        self.ended       = False # the end of inQueue has been reached (its None stays on the queue)
+        self.active      = 0     # jobs being run
+        self.attempts    = 0
+        self.retried     = 0
+        self.busySeconds = 0.0   # summed over jobs
+        self.threads     = []
+
+    def Start(self):
+        self.running = self.concurrency
+        for i in xrange(0,self.concurrency):
+            thread = threading.Thread(target=self.Work,name=self.name + str(i))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        return
+
+    # Runs in each of the stage's threads; a None job marks the end of the queue
+    def Work(self):
+        while True:
+            job = self.inQueue.get()
+            if job is None:
+                self.ended = True
+                self.inQueue.put(None)  # for the stage's other threads
+                break
+            if job['status'] == RESULT_OK:
+                self.RunJob(job)
+            self.outQueue.put(job)  # blocks while the next stage's queue is full
+        with self.lock:
+            self.running -= 1
+            last = self.running == 0
+        if last:
+            self.outQueue.put(None)
+        return
+
+    # Returns the number of jobs waiting on inQueue
+    def GetQueued(self):
+        if self.ended:
+            return max(0,self.inQueue.qsize() - 1)
+        return self.inQueue.qsize()
+
+    # Run the stage on a job, with retries; the job records the outcome
+    def RunJob(self,job):
+        with self.lock:
+            self.active += 1
+        start = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            status, value = self.function(job,self.timeout)
+            if status != RESULT_FAILED or attempt > self.retries:
+                break
+            with self.lock:
+                self.retried += 1
+        with self.lock:
+            self.active -= 1
+            self.attempts += attempt
+            self.busySeconds += time.time() - start
+        job['attempts'][self.name] = attempt
+        if status == RESULT_OK:
+            job[self.name] = value
+        else:
+            job['status'] = status
+            job['error']  = self.name + ": " + value
+        return
+
+# Runs the genomes of a manifest through the parse and compare stages
+# stream, matchMode, minOverlap, gridFormat and backend select each genome's comparison (see CGC_batch.CompareGenome())
+class JobRunner(object):
+
+    def __init__(self,outDir,parseWorkers=1,compareWorkers=1,queueSize=None,timeout=None,retries=DEFAULT_RETRIES,interval=DEFAULT_INTERVAL,
+                 stream=False,matchMode=CGC_compare.MATCH_EXACT,minOverlap=CGC_compare.DEFAULT_MIN_OVERLAP,gridFormat=CGC_grid.GRID_TSV,
+                 backend=CGC_compare.BACKEND_PYTHON):
+        self.outDir   = outDir
+        self.interval = interval
+        self.stream   = stream
+        self.compareOptions = (stream,matchMode,minOverlap,gridFormat,backend)  # CompareGenome()'s arguments after outDir
+        if queueSize is None:
+            queueSize = QUEUE_PER_WORKER * compareWorkers
+        self.parseQueue   = Queue.Queue(queueSize)
+        self.compareQueue = Queue.Queue(queueSize)
+        self.resultQueue  = Queue.Queue(queueSize)
+        self.stages = [Stage(STAGE_PARSE,self.Parse,parseWorkers,self.parseQueue,self.compareQueue,timeout,retries),
+                       Stage(STAGE_COMPARE,self.Compare,compareWorkers,self.compareQueue,self.resultQueue,timeout,retries)]
+        self.jobCount    = 0
+        self.doneCount   = 0
+        self.failedCount = 0
+        self.callCount   = 0
+        self.started     = time.time()
+
+    # Stage functions: each takes a job and a time limit, and returns (result status, result or message)
+
+    def Parse(self,job,timeout):
+        if not [geneFile for geneFile in job['files'] if CGC_main.GetRawInput(geneFile) is not None]:
+            return (RESULT_OK,(job['files'],0))  # nothing to parse: no process needed
+        return RunInProcess(ParseGenome,(job['files'],CGC_batch.GetGenomeDir(self.outDir,job['genomeId']),self.stream),timeout)
+
+    def Compare(self,job,timeout):
+        callFiles, parsedCount = job[STAGE_PARSE]
+        return RunInProcess(CGC_batch.CompareGenome,(job['genomeId'],callFiles,self.outDir) + self.compareOptions,timeout)
+
+    # Put each genome on the parse queue; runs in its own thread, and waits whenever the queue is full
+    def Feed(self,genomes):
+        for genomeId, fileSet in genomes:
+            self.parseQueue.put({'genomeId':genomeId, 'files':fileSet, 'status':RESULT_OK, 'error':"", 'attempts':{}})
+        self.parseQueue.put(None)
+        return
+
+    # Returns a line reporting progress and throughput so far
+    def GetProgress(self):
+        seconds = max(time.time() - self.started,1e-6)
+        line = "Runner: %d of %d genomes done (%d failed); %.1f genomes/s, %.0f calls/s;" % \
+               (self.doneCount,self.jobCount,self.failedCount,self.doneCount / seconds,self.callCount / seconds)
+        for stage in self.stages:
+            line += " %s: %d running, %d queued;" % (stage.name,stage.active,stage.GetQueued())
+        return line.rstrip(';')
+
+    # Run every genome, writing summary lines to SUMMARY as genomes complete; returns the number of genomes done
+    def Run(self,genomes,SUMMARY):
+        if not os.path.isdir(self.outDir):
+            os.makedirs(self.outDir)
+        self.jobCount = len(genomes)
+        self.started  = time.time()
+        for stage in self.stages:
+            stage.Start()
+        feeder = threading.Thread(target=self.Feed,args=(genomes,))
+        feeder.daemon = True
+        feeder.start()
+        SUMMARY.write(CGC_batch.SUMMARY_HEADER)
+        lastReport = time.time()
+        while True:
+            try:
+                job = self.resultQueue.get(True,self.interval)
+            except Queue.Empty:
+                job = False
+            if job is None:
+                break
+            if job:
+                self.WriteResult(job,SUMMARY)
+            if CHATTY and time.time() - lastReport >= self.interval:
+                print self.GetProgress()
+                sys.stdout.flush()
+                lastReport = time.time()
+        if CHATTY:
+            print self.GetProgress()
+            for stage in self.stages:
+                print "Runner: stage %s: %d attempt(s), %d retried, %.1f job-seconds" % (stage.name,stage.attempts,stage.retried,stage.busySeconds)
+        return self.doneCount
+
+    def WriteResult(self,job,SUMMARY):
+        self.doneCount += 1
+        if job['status'] == RESULT_OK:
+            status, summary = job[STAGE_COMPARE]
+            self.callCount += sum(summary['callerCounts'].values())
+            if status != "ok":
+                self.failedCount += 1
+        else:
+            status  = "error: " + job['error'].replace('\t',' ').replace('\n',' ')
+            summary = {'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}}
+            self.failedCount += 1
+        SUMMARY.write(CGC_batch.FormatSummaryLine(job['genomeId'],status,summary))
+        return
+
+##### BEGIN MAIN
+
+if __name__ == "__main__":
+
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    parseWorkers   = multiprocessing.cpu_count()
+    compareWorkers = multiprocessing.cpu_count()
+    queueSize = None
+    timeout   = None
+    retries   = DEFAULT_RETRIES
+    interval  = DEFAULT_INTERVAL
+    stream     = False
+    matchMode  = CGC_compare.MATCH_EXACT
+    minOverlap = CGC_compare.DEFAULT_MIN_OVERLAP
+    gridFormat = CGC_grid.GRID_TSV
+    backend    = CGC_compare.BACKEND_PYTHON
+    badOption  = ""
+    for option in options:
+        name, equals, value = option.partition('=')
+        if name == "--parse-workers" and value.isdigit():
+            parseWorkers = max(1,int(value))
+        elif name == "--compare-workers" and value.isdigit():
+            compareWorkers = max(1,int(value))
+        elif name == "--queue-size" and value.isdigit():
+            queueSize = max(1,int(value))
+        elif name == "--retries" and value.isdigit():
+            retries = int(value)
+        elif name in ("--timeout", "--interval") and re.match('^\d+(\.\d*)?$',value) and float(value) > 0:
+            if name == "--timeout":
+                timeout = float(value)
+            else:
+                interval = float(value)
+        elif option == "--stream":
+            stream = True
+        elif name == "--match" and value in CGC_compare.MATCH_MODES:
+            matchMode = value
+        elif name == "--min-overlap" and re.match('^\d*\.?\d+$',value) and 0.0 < float(value) <= 1.0:
+            minOverlap = float(value)
+        elif name == "--grid" and value in CGC_grid.GRID_FORMATS:
+            gridFormat = value
+        elif name == "--backend" and value in CGC_compare.BACKENDS:
+            backend = value
+        else:
+            badOption = option
+
+    if stream and matchMode != CGC_compare.MATCH_EXACT:
+        badOption = "--stream (a streaming comparison matches identical calls only: --match=exact)"
+    if backend == CGC_compare.BACKEND_NUMPY and CGC_geneCall.GetNumpy() is None:
+        badOption = "--backend=numpy (numpy is not installed)"
+    if badOption:
+        print "Unrecognized option:", badOption
+        print USAGE_STRING
+        exit(0)
+
+    if len(args) == 1 and re.search("help", args[0].lower()):
+        print HELP_STRING
+        exit(0)
+    if len(args) == 1 and re.search("input", args[0].lower()):
+        print INPUT_STRING
+        exit(0)
+    if len(args) != 2:
+        print USAGE_STRING
+        exit(0)
+
+    manifestFile, outDir = args
+    try:
+        MANIFEST = open(manifestFile,"r")
+    except IOError as e:
+        print "ERROR: cannot open manifest:", e
+        exit(1)
+    genomes = CGC_batch.ReadManifest(MANIFEST)
+    MANIFEST.close()
+
+    CGC_main.CHATTY = False
+    runner = JobRunner(outDir,parseWorkers,compareWorkers,queueSize,timeout,retries,interval,stream,matchMode,minOverlap,gridFormat,backend)
+    if not os.path.isdir(outDir):
+        os.makedirs(outDir)
+    SUMMARY = open(os.path.join(outDir,SUMMARY_FILE),"w")
+    runner.Run(genomes,SUMMARY)
+    SUMMARY.close()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+
+################################################################
+#
+# CGC_server.py  # Compare Gene Calls, Server
+#
+# Programmer: Carol Zhou
+#
+# Description:  Runs comparisons in a long-lived process, so that many
+#    small comparisons (e.g., of phage genomes) do not each pay for
+#    starting Python and importing the CGC modules. Comparison jobs are
+#    read as JSON lines, from standard input or from a Unix socket, and
+#    each is answered with one JSON line holding its result. Modules,
+#    compiled patterns, the call set cache and the pool of worker
+#    processes stay loaded from one job to the next.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: "backend" request field (see CGC_compare.NewComparison())
+#    16 Oct 2026: a job that fails with any exception is answered with an error; the server keeps running
+#    16 Oct 2026: a comparison refused by CGC_main.RunComparison() is answered with its own error
+#
+# Programmer's Notes:
+#    Request (one JSON object per line); only "files" is required:
+#        {"id": <any>, "files": [<infile>|<caller>:<rawfile>, ...],
+#         "match": "exact"|"same-stop"|"overlap", "minOverlap": F,
+#         "grid": "tsv"|"csv"|"long", "contigs": [<contig>, ...],
+#         "stream": true|false, "backend": "python"|"numpy", "outfile": <path>}
+#    The files and options are those of CGC_main.py. With "outfile", the
+#    report is written to that file; otherwise it is returned in the
+#    response, as "report".
+#    Response (one JSON object per line, in the order of the requests):
+#        {"id": <the request's id>, "status": "ok"|"error", "error": <message>,
+#         "summary": {"distinct", "common", "lone", "callerCounts"},
+#         "report": <text>, "log": <text>, "phases": <CGC_profile totals>,
+#         "seconds": <time taken by the job>}
+#    {"command": "ping"} is answered with {"status": "ok"}; {"command":
+#    "shutdown"} stops the server. Jobs are run one at a time, in the
+#    order received; a job that fails is answered with status "error" (and,
+#    for an unexpected failure, its traceback in "log"), and the server goes
+#    on to the next job. Use --workers=N to compare each job's contigs in N
+#    worker processes (a pool kept open for the life of the server).
+#    When jobs are read from standard input, responses are the only
+#    output written to standard out; messages go to standard error.
+#
+################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import sys
+import os
+import re
+import time
+import json
+import traceback
+import multiprocessing
+import SocketServer
+from cStringIO import StringIO
+import CGC_main
+import CGC_compare
+import CGC_grid
+import CGC_cache
+import CGC_profile
+
+##### FILES
+
+CODE_BASE = "./CGC_server"
+CODE_FILE = CODE_BASE + ".py"
+
+##### PRINT CONTROL
+
+CHATTY = True
+#CHATTY = False
+
+##### CONSTANTS
+
+HELP_STRING = "This code runs gene call comparisons, as by CGC_main.py, in a long-lived process: comparison jobs are read as JSON lines from standard input (or from a Unix socket, with --socket=PATH), and the result of each is written as a JSON line. Type: python " + CODE_FILE + " usage|input for more information\n"
+
+USAGE_STRING = "Usage:  python " + CODE_FILE + " [--socket=PATH] [--workers=N] [--cache=DIR] [--cache-size=MB]\n"
+
+INPUT_STRING = "Each line of input is a JSON object describing one comparison job, for example:\n    {\"id\": 1, \"files\": [\"genemark.cgc\", \"prodigal.cgc\"], \"match\": \"exact\"}\nOptional fields: \"match\" (exact, same-stop or overlap), \"minOverlap\", \"grid\" (tsv, csv or long), \"contigs\" (list of contig names), \"stream\" (true or false), \"backend\" (python or numpy), and \"outfile\" (write the report to this file rather than return it). Each job is answered by one line: a JSON object holding the job's id, status, summary counts, report (unless written to \"outfile\"), log and time taken. {\"command\": \"ping\"} checks that the server is running; {\"command\": \"shutdown\"} stops it.\n"
+
+COMMAND_COMPARE  = "compare"
+COMMAND_PING     = "ping"
+COMMAND_SHUTDOWN = "shutdown"
+
+EMPTY_SUMMARY = {'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}}
+
+##### FUNCTIONS
+
+# JSON strings are read as unicode; file and contig names are used as (UTF-8) byte strings, as on the command line
+def ToStr(value):
+    if isinstance(value,unicode):
+        return value.encode('utf-8')
+    return value
+
+##### CLASSES
+
+# The state kept from one job to the next
+class ComparisonServer(object):
+
+    def __init__(self,workers=1,cache=None):
+        self.workers = workers
+        self.cache   = cache  # a CGC_cache.CallSetCache, or None
+        self.pool    = None
+        if workers > 1:
+            self.pool = multiprocessing.Pool(workers)
+        self.jobCount = 0
+        self.stopped  = False
+
+    # Run the job of one request (a dict); returns the response (a dict)
+    def RunJob(self,request):
+        response = {'id':request.get('id')}
+        command = request.get('command',COMMAND_COMPARE)
+        if command == COMMAND_PING:
+            response['status'] = "ok"
+            return response
+        if command == COMMAND_SHUTDOWN:
+            self.stopped = True
+            response['status'] = "ok"
+            return response
+        if command != COMMAND_COMPARE:
+            response['status'] = "error"; response['error'] = "unknown command: " + str(command)
+            return response
+
+        start = time.time()
+        LOG = StringIO()
+        metrics = CGC_profile.RunMetrics()
+        outFile = request.get('outfile')
+        OUT = None
+        try:
+            fileSet = request['files']
+            if not isinstance(fileSet,list) or not fileSet:
+                raise ValueError("\"files\" must list at least one gene call file")
+            fileSet = [ToStr(geneFile) for geneFile in fileSet]
+            matchMode = request.get('match',CGC_compare.MATCH_EXACT)
+            if matchMode not in CGC_compare.MATCH_MODES:
+                raise ValueError("unknown match mode: " + str(matchMode))
+            minOverlap = float(request.get('minOverlap',CGC_compare.DEFAULT_MIN_OVERLAP))
+            if not 0.0 < minOverlap <= 1.0:
+                raise ValueError("minOverlap must be greater than 0 and at most 1")
+            gridFormat = request.get('grid',CGC_grid.GRID_TSV)
+            if gridFormat not in CGC_grid.GRID_FORMATS:
+                raise ValueError("unknown grid format: " + str(gridFormat))
+            contigs = request.get('contigs') or []
+            if not isinstance(contigs,list):
+                raise ValueError("\"contigs\" must be a list of contig names")
+            contigs = [ToStr(contig) for contig in contigs]
+            stream  = bool(request.get('stream',False))
+            backend = request.get('backend',CGC_compare.BACKEND_PYTHON)
+            if backend not in CGC_compare.BACKENDS:
+                raise ValueError("unknown comparison backend: " + str(backend))
+            if contigs and stream:
+                raise ValueError("\"contigs\" is not available with \"stream\"")
+            if outFile:
+                OUT = CGC_grid.OpenReport(ToStr(outFile))
+            else:
+                OUT = StringIO()
+            cache = None
+            if not stream:
+                cache = self.cache
+            comparison = CGC_main.RunComparison(fileSet,OUT,LOG,stream,self.workers,matchMode,minOverlap,cache,
+                                                gridFormat,metrics,contigs,self.pool,str(backend))
+            if comparison.error:  # refused, or stopped, e.g., streaming with a match mode other than exact
+                response['status']  = "error"
+                response['error']   = comparison.error
+                response['summary'] = EMPTY_SUMMARY
+            elif comparison.statsSummary:
+                response['status']  = "ok"
+                response['summary'] = comparison.statsSummary
+            else:
+                response['status']  = "error"
+                response['error']   = "no gene calls were compared"
+                response['summary'] = EMPTY_SUMMARY
+            if not outFile:
+                response['report'] = OUT.getvalue()
+        except (KeyError, TypeError) as e:
+            response['status'] = "error"; response['error'] = "bad request: " + str(e)
+        except (IOError, ValueError) as e:
+            response['status'] = "error"; response['error'] = str(e)
+        except Exception as e:  # any other failure ends this job only, not the server
+            response['status'] = "error"; response['error'] = "%s: %s" % (type(e).__name__,e)
+            LOG.write(traceback.format_exc())
+        if OUT is not None:
+            OUT.close()
+        response['log']     = LOG.getvalue()
+        response['phases']  = metrics.GetTotals()
+        response['seconds'] = round(time.time() - start,6)
+        self.jobCount += 1
+        return response
+
+    # Answer each line read from INFILE with a line written to OUTFILE, until the end of INFILE or a shutdown
+    def Serve(self,INFILE,OUTFILE):
+        line = INFILE.readline()
+        while line:
+            if line.strip() != "":
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request,dict):
+                        raise ValueError("a request must be a JSON object")
+                    response = self.RunJob(request)
+                except ValueError as e:
+                    response = {'id':None, 'status':"error", 'error':"bad request: " + str(e)}
+                OUTFILE.write(json.dumps(response,sort_keys=True) + "\n")
+                OUTFILE.flush()
+                if self.stopped:
+                    break
+            line = INFILE.readline()
+        return
+
+    def Close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        return
+
+# Serves the requests of one socket connection, in turn
+class ConnectionHandler(SocketServer.StreamRequestHandler):
+
+    def handle(self):
+        self.server.comparisonServer.Serve(self.rfile,self.wfile)
+        return
+
+# Listen on a Unix socket at socketPath; connections are served one at a time, until a shutdown request
+def ServeSocket(comparisonServer,socketPath):
+    if os.path.exists(socketPath):
+        os.remove(socketPath)
+    server = SocketServer.UnixStreamServer(socketPath,ConnectionHandler)
+    server.comparisonServer = comparisonServer
+    if CHATTY:
+        print "Server: listening on", socketPath
+    try:
+        while not comparisonServer.stopped:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.remove(socketPath)
+    return
+
+##### BEGIN MAIN
+
+if __name__ == "__main__":
+
+    args    = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    workers    = 1
+    socketPath = ""
+    cacheDir   = ""
+    cacheSize  = CGC_cache.DEFAULT_MAX_BYTES / (1024 * 1024)
+    for option in options:
+        if option.startswith("--workers=") and option[len("--workers="):].isdigit():
+            workers = max(1,int(option[len("--workers="):]))
+        elif option.startswith("--socket=") and option[len("--socket="):] != "":
+            socketPath = option[len("--socket="):]
+        elif option.startswith("--cache=") and option[len("--cache="):] != "":
+            cacheDir = option[len("--cache="):]
+        elif option.startswith("--cache-size=") and option[len("--cache-size="):].isdigit():
+            cacheSize = int(option[len("--cache-size="):])
+        else:
+            print "Unrecognized option:", option
+            print USAGE_STRING
+            exit(0)
+
+    if len(args) == 1 and re.search("help", args[0].lower()):
+        print HELP_STRING
+        exit(0)
+    if len(args) == 1 and re.search("input", args[0].lower()):
+        print INPUT_STRING
+        exit(0)
+    if len(args) != 0:
+        print USAGE_STRING
+        exit(0)
+
+    CGC_main.CHATTY = False
+    cache = None
+    if cacheDir:
+        cache = CGC_cache.CallSetCache(cacheDir,cacheSize * 1024 * 1024)
+    comparisonServer = ComparisonServer(workers,cache)
+
+    try:
+        if socketPath:
+            ServeSocket(comparisonServer,socketPath)
+        else:
+            # Standard out carries the responses only: anything else printed goes to standard error
+            RESPONSES = sys.stdout
+            sys.stdout = sys.stderr
+            comparisonServer.Serve(sys.stdin,RESPONSES)
+    except KeyboardInterrupt:
+        pass
+    comparisonServer.Close()
+    if CHATTY:
+        print >>sys.stderr, "Server: completed", comparisonServer.jobCount, "job(s)"
@@ -0,0 +1,159 @@
+###################################################################################################
+#
+# Module:  CGC_state.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module for saving a completed comparison (CGC_compare.Comparison) to disk and loading
+#    it again, so that a caller can later be added to, or removed from, the comparison (see
+#    Comparison.AddCaller() and RemoveCaller()) without reading and sorting the other callers' calls.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: one table file per caller: a contig-by-contig comparison's tables are joined (JoinTables())
+#
+# Programmer's Notes:
+#    A saved comparison is a directory holding:
+#        comparison.json:  version, match mode, callers, table files, and summary counts
+#        <i>.cgb:          the comparison's gene call tables, as binary call files (CGC_geneCall.py);
+#                          one per caller, even after a comparison by contig (--workers), which holds
+#                          one table per caller per contig: a caller's tables are joined, in order
+#        groups.bin:       the unique gene calls: merged references to table rows, and the start of
+#                          each group of matching calls (little-endian int32: count, then values,
+#                          for each of tableIndex, row and group starts)
+#    The common core and statistics are derived again on loading, in one pass over the groups and
+#    tables. The directory is written under a temporary name and renamed, replacing any earlier
+#    state of the same name only once the new state is complete.
+#
+# Functions:
+#    JoinTables(callSets)
+#    SaveComparison(comparison,stateDir)
+#    LoadComparison(stateDir)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import sys
+import json
+import array
+import shutil
+import struct
+import tempfile
+from itertools import izip
+import CGC_geneCall
+import CGC_compare
+
+##### CONSTANTS
+
+STATE_VERSION = 1
+STATE_FILE    = "comparison.json"
+GROUPS_FILE   = "groups.bin"
+
+# Write an int32 array as its length followed by its values, little-endian
+def WriteColumn(OUT,values):
+    values = array.array('i',values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    OUT.write(struct.pack('<I',len(values)))
+    OUT.write(values.tostring())
+    return
+
+def ReadColumn(INFILE):
+    count, = struct.unpack('<I',INFILE.read(4))
+    values = array.array('i',INFILE.read(4 * count))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+# Join the tables of each caller (or set of callers), in order, into one table
+# Returns the joined tables, and for each table of callSets, the index of its joined table and the
+# offset of its first row there; a caller with a single table keeps it as it is
+def JoinTables(callSets):
+    joinedParts = []; joinedIndex = {}  # callers => index of their joined table
+    for table in callSets:
+        callers = tuple(table.callerNames)
+        if callers not in joinedIndex:
+            joinedIndex[callers] = len(joinedParts)
+            joinedParts.append([])
+        joinedParts[joinedIndex[callers]].append(table)
+    joinedTables = []; tableMap = {}  # id of a table => (joined table index, row offset)
+    for parts in joinedParts:
+        if len(parts) == 1:
+            joined = parts[0]
+        else:
+            joined = CGC_geneCall.GeneCallTable()
+            for table in parts:
+                tableMap[id(table)] = (len(joinedTables), len(joined))
+                joined.AppendTableRows(table,0,len(table))
+            joined.sorted = parts[0].sorted  # sorted if every part is, and each part follows the one before (contigs in order)
+            for previous, table in izip(parts,parts[1:]):
+                if not table.sorted or (previous and table and previous.GetKey(len(previous) - 1) > table.GetKey(0)):
+                    joined.sorted = False
+        tableMap.setdefault(id(parts[0]),(len(joinedTables),0))
+        joinedTables.append(joined)
+    return joinedTables, [tableMap[id(table)] for table in callSets]
+
+def SaveComparison(comparison,stateDir):
+    parentDir = os.path.dirname(os.path.abspath(stateDir))
+    tempDir = tempfile.mkdtemp(prefix=".tmp.",dir=parentDir)
+    try:
+        joinedTables, tableMap = JoinTables(comparison.callSets)
+        tableFiles = []
+        for tableIndex, table in enumerate(joinedTables):
+            callSet = CGC_geneCall.GeneCallSet()
+            callSet.geneCallList = table
+            if table.callerNames:
+                callSet.geneCaller = table.callerNames[0]
+            tableFiles.append(str(tableIndex) + CGC_geneCall.BINARY_SUFFIX)
+            OUT = open(os.path.join(tempDir,tableFiles[-1]),"wb")
+            callSet.WriteBinary(OUT)
+            OUT.close()
+        OUT = open(os.path.join(tempDir,GROUPS_FILE),"wb")
+        WriteColumn(OUT,[tableMap[tableIndex][0] for tableIndex in comparison.mergeList.tableIndex])
+        WriteColumn(OUT,[tableMap[tableIndex][1] + row for tableIndex, row in izip(comparison.mergeList.tableIndex,comparison.mergeList.row)])
+        WriteColumn(OUT,comparison.uniqueList.starts)
+        OUT.close()
+        state = {'version':STATE_VERSION, 'matchMode':comparison.matchMode, 'minOverlap':comparison.minOverlap,
+                 'callerList':comparison.callerList, 'tables':tableFiles,
+                 'distinct':len(comparison.uniqueList), 'common':len(comparison.commonCore)}
+        OUT = open(os.path.join(tempDir,STATE_FILE),"w")
+        json.dump(state,OUT,indent=1,sort_keys=True)
+        OUT.close()
+        if os.path.isdir(stateDir):  # replace the earlier state only now that the new one is complete
+            oldDir = tempfile.mkdtemp(prefix=".old.",dir=parentDir)
+            os.rename(stateDir,os.path.join(oldDir,"state"))
+            os.rename(tempDir,stateDir)
+            shutil.rmtree(oldDir,ignore_errors=True)
+        else:
+            os.rename(tempDir,stateDir)
+    except:
+        shutil.rmtree(tempDir,ignore_errors=True)
+        raise
+    return
+
+# Returns the saved CGC_compare.Comparison, with its common core identified again
+# Raises ValueError if stateDir does not hold a comparison saved by this version of the code
+def LoadComparison(stateDir):
+    INFILE = open(os.path.join(stateDir,STATE_FILE),"r")
+    state = json.load(INFILE)
+    INFILE.close()
+    if state.get('version') != STATE_VERSION:
+        raise ValueError("Not a version " + str(STATE_VERSION) + " saved comparison: " + stateDir)
+    comparison = CGC_compare.Comparison()
+    comparison.matchMode  = str(state['matchMode'])
+    comparison.minOverlap = state['minOverlap']
+    comparison.callerList = [str(caller) for caller in state['callerList']]
+    for tableFile in state['tables']:
+        callSet = CGC_geneCall.ReadBinaryGeneCallSet(os.path.join(stateDir,tableFile))
+        comparison.AddCallSet(callSet.geneCallList)
+    INFILE = open(os.path.join(stateDir,GROUPS_FILE),"rb")
+    comparison.mergeList.tableIndex = ReadColumn(INFILE)
+    comparison.mergeList.row        = ReadColumn(INFILE)
+    comparison.uniqueList.starts    = ReadColumn(INFILE)
+    INFILE.close()
+    if comparison.mergeList:
+        comparison.IdentifyCommonCore()
+    return comparison
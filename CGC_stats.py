@@ -0,0 +1,245 @@
+###################################################################################################
+#
+# Module:  CGC_stats.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module containing gene-call statistics for a comparison: per caller, and per caller
+#    and contig, the number of calls, length summary (min, max, mean, median), a length histogram
+#    and strand balance. Statistics are gathered in a single pass over the callers' gene call
+#    tables (or call by call, for a streaming comparison), and are written as text, TSV or JSON.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: per-caller statistics only (ComparisonStats(perContig=False)), for streaming comparisons
+#
+# Programmer's Notes:
+#    Lengths are kept as counts per distinct length, so that memory use depends on the number of
+#    distinct lengths (at most a few thousand), not on the number of calls; medians and
+#    histograms are computed exactly from these counts.
+#    A streaming comparison keeps per-caller statistics only: per (caller, contig) statistics would
+#    grow with the number of contigs, which a streaming comparison's memory use must not. Its
+#    statistics files list no contig rows.
+#
+# Classes and Methods:
+#    LengthStats()
+#        Add(length,strand)
+#        AddStats(other)
+#        GetMin(), GetMax(), GetMean(), GetMedian()
+#        GetHistogram(binWidth)
+#        GetSummary()
+#    ComparisonStats(perContig)
+#        AddCall(geneCaller,contig,length,strand)
+#        AddTable(table)
+#        GetCallerStats(geneCaller)
+#        PrintText(OUT)
+#        PrintTSV(OUT)
+#        PrintJSON(OUT)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import json
+from itertools import izip
+
+##### CONSTANTS
+
+LENGTH_BIN_WIDTH = 300  # nucleotides per length histogram bin
+
+TSV_HEADER = "level\tcaller\tcontig\tcalls\ttotalLength\tminLength\tmaxLength\tmeanLength\tmedianLength\tplusStrand\tminusStrand\tplusFraction"
+
+# Length and strand statistics for a set of gene calls
+class LengthStats(object):
+
+    def __init__(self):
+        self.count        = 0
+        self.totalLength  = 0
+        self.plusCount    = 0
+        self.minusCount   = 0
+        self.lengthCounts = {}  # length => number of calls of that length
+
+    def Add(self,length,strand):
+        self.count += 1
+        self.totalLength += length
+        self.lengthCounts[length] = self.lengthCounts.get(length,0) + 1
+        if strand == '+':
+            self.plusCount += 1
+        elif strand == '-':
+            self.minusCount += 1
+        return
+
+    def AddStats(self,other):
+        self.count       += other.count
+        self.totalLength += other.totalLength
+        self.plusCount   += other.plusCount
+        self.minusCount  += other.minusCount
+        for length, count in other.lengthCounts.iteritems():
+            self.lengthCounts[length] = self.lengthCounts.get(length,0) + count
+        return
+
+    # Min, max, mean and median are None when there are no calls
+    def GetMin(self):
+        if self.count == 0:
+            return None
+        return min(self.lengthCounts)
+
+    def GetMax(self):
+        if self.count == 0:
+            return None
+        return max(self.lengthCounts)
+
+    def GetMean(self):
+        if self.count == 0:
+            return None
+        return float(self.totalLength) / self.count
+
+    # Median length; the mean of the two middle lengths when the number of calls is even
+    def GetMedian(self):
+        if self.count == 0:
+            return None
+        middle = [(self.count - 1) / 2, self.count / 2]  # 0-based ranks of the middle call(s)
+        values = []; rank = 0
+        for length in sorted(self.lengthCounts):
+            rank += self.lengthCounts[length]
+            while middle and middle[0] < rank:
+                values.append(length)
+                middle.pop(0)
+            if not middle:
+                break
+        return (values[0] + values[1]) / 2.0
+
+    # List of (bin start, number of calls) for bins of binWidth nucleotides, from the lowest bin holding
+    # a call to the highest; empty bins in between are included
+    def GetHistogram(self,binWidth=LENGTH_BIN_WIDTH):
+        if self.count == 0:
+            return []
+        bins = {}
+        for length, count in self.lengthCounts.iteritems():
+            binStart = (length / binWidth) * binWidth
+            bins[binStart] = bins.get(binStart,0) + count
+        return [(binStart,bins.get(binStart,0)) for binStart in xrange(min(bins),max(bins) + binWidth,binWidth)]
+
+    def GetSummary(self,binWidth=LENGTH_BIN_WIDTH):
+        plusFraction = None
+        if self.plusCount + self.minusCount > 0:
+            plusFraction = float(self.plusCount) / (self.plusCount + self.minusCount)
+        return {'calls':self.count, 'totalLength':self.totalLength, 'minLength':self.GetMin(),
+                'maxLength':self.GetMax(), 'meanLength':self.GetMean(), 'medianLength':self.GetMedian(),
+                'plusStrand':self.plusCount, 'minusStrand':self.minusCount, 'plusFraction':plusFraction,
+                'histogram':{'binWidth':binWidth, 'bins':self.GetHistogram(binWidth)}}
+
+# Statistics for all callers of a comparison, per caller and, if perContig, per (caller, contig)
+class ComparisonStats(object):
+
+    def __init__(self,perContig=True):
+        self.perContig   = perContig
+        self.callerStats = {}  # caller => LengthStats
+        self.contigStats = {}  # (caller, contig) => LengthStats; per-caller totals are summed from these if perContig
+
+    def AddCall(self,geneCaller,contig,length,strand):
+        if not self.perContig:
+            stats = self.callerStats.get(geneCaller)
+            if stats is None:
+                stats = self.callerStats[geneCaller] = LengthStats()
+            stats.Add(length,strand)
+            return
+        key = (geneCaller,contig)
+        if key not in self.contigStats:
+            self.contigStats[key] = LengthStats()
+        self.contigStats[key].Add(length,strand)
+        self.callerStats = {}  # per-caller totals are out of date
+        return
+
+    # Add every call of a CGC_geneCall.GeneCallTable, in one pass over its columns
+    def AddTable(self,table):
+        if not self.perContig:
+            for callerId, contigId, length, strand in izip(table.callerId,table.contigId,table.geneLength,table.strand):
+                self.AddCall(table.callerNames[callerId],None,int(length),strand)
+            return
+        keyStats = {}  # (callerId, contigId) => LengthStats
+        for callerId, contigId, length, strand in izip(table.callerId,table.contigId,table.geneLength,table.strand):
+            stats = keyStats.get((callerId,contigId))
+            if stats is None:
+                stats = keyStats[(callerId,contigId)] = LengthStats()
+            stats.count += 1
+            stats.lengthCounts[length] = stats.lengthCounts.get(length,0) + 1
+            if strand == '+':
+                stats.plusCount += 1
+            elif strand == '-':
+                stats.minusCount += 1
+        for (callerId, contigId), stats in keyStats.iteritems():
+            stats.lengthCounts = dict([(int(length),count) for length, count in stats.lengthCounts.iteritems()])
+            stats.totalLength  = sum([length * count for length, count in stats.lengthCounts.iteritems()])
+            key = (table.callerNames[callerId],table.contigNames[contigId])
+            if key in self.contigStats:
+                self.contigStats[key].AddStats(stats)
+            else:
+                self.contigStats[key] = stats
+        self.callerStats = {}
+        return
+
+    # LengthStats over all contigs for geneCaller; empty if the caller made no calls
+    def GetCallerStats(self,geneCaller):
+        if self.perContig and not self.callerStats:
+            for (caller, contig), stats in self.contigStats.iteritems():
+                if caller not in self.callerStats:
+                    self.callerStats[caller] = LengthStats()
+                self.callerStats[caller].AddStats(stats)
+        return self.callerStats.get(geneCaller,LengthStats())
+
+    def GetCallers(self):
+        if not self.perContig:
+            return sorted(self.callerStats)
+        return sorted(set([caller for caller, contig in self.contigStats]))
+
+    def GetRows(self):
+        rows = []
+        for caller in self.GetCallers():
+            rows.append(("caller",caller,"",self.GetCallerStats(caller)))
+            for contig in sorted([contig for key, contig in self.contigStats if key == caller]):
+                rows.append(("contig",caller,contig,self.contigStats[(caller,contig)]))
+        return rows
+
+    def PrintText(self,OUT=None):
+        for level, caller, contig, stats in self.GetRows():
+            if level == "caller":
+                print >>OUT, "Caller", caller, "produced", stats.count, "gene calls."
+            else:
+                print >>OUT, "   Contig", contig, ":", stats.count, "gene calls."
+            if stats.count == 0:
+                continue
+            indent = "   " * (level == "contig")
+            print >>OUT, indent + "   Length:  min: %d, max: %d, mean: %.1f, median: %.1f" % (stats.GetMin(),stats.GetMax(),stats.GetMean(),stats.GetMedian())
+            print >>OUT, indent + "   Strand:  +: %d, -: %d" % (stats.plusCount,stats.minusCount)
+            if level == "caller":
+                print >>OUT, "   Length histogram (bins of", LENGTH_BIN_WIDTH, "nt):"
+                for binStart, count in stats.GetHistogram():
+                    print >>OUT, "      %6d-%-6d %8d" % (binStart,binStart + LENGTH_BIN_WIDTH - 1,count)
+        return
+
+    def PrintTSV(self,OUT=None):
+        print >>OUT, TSV_HEADER
+        for level, caller, contig, stats in self.GetRows():
+            summary = stats.GetSummary()
+            values = [level,caller,contig]
+            for field in TSV_HEADER.split('\t')[3:]:
+                value = summary[field]
+                if value is None:
+                    value = "NA"
+                elif isinstance(value,float):
+                    value = "%.4f" % value
+                values.append(str(value))
+            print >>OUT, '\t'.join(values)
+        return
+
+    def PrintJSON(self,OUT=None):
+        callers = {}
+        for caller in self.GetCallers():
+            callers[caller] = self.GetCallerStats(caller).GetSummary()
+            if not self.perContig:
+                continue
+            callers[caller]['contigs'] = dict([(contig,stats.GetSummary()) for (key, contig), stats in self.contigStats.iteritems() if key == caller])
+        print >>OUT, json.dumps({'callers':callers}, indent=1, sort_keys=True)
+        return
@@ -0,0 +1,331 @@
+###################################################################################################
+#
+# Module:  CGC_vector.py
+#
+# Programmer:  Carol Zhou
+#
+# Description:  Module containing a Comparison that merges, groups and summarizes gene calls with
+#    numpy array operations, rather than one call at a time: all callers' calls are sorted together
+#    (numpy.lexsort), groups of identical calls begin wherever consecutive sort keys differ, and the
+#    callers of each group are combined as bitmasks (numpy.bitwise_or.reduceat). The common core,
+#    lone calls, caller subsets and caller statistics are computed from these arrays. Results, and
+#    so every report, are the same as those of CGC_compare.Comparison.
+#
+# Updates:
+#    16 Oct 2026: begin
+#    16 Oct 2026: lone calls counted by distinct callers when matching is not exact, as by Comparison
+#
+# Programmer's Notes:
+#    Requires numpy; use CGC_compare.NewComparison(CGC_compare.BACKEND_NUMPY), which checks for it.
+#    Results are kept in the structures of CGC_compare.Comparison (mergeList, uniqueList,
+#    subsetMasks, stats), so the grid, saved states and incremental updates (AddCaller(),
+#    RemoveCaller(), which use Comparison's methods) are unchanged. The common core is a
+#    CommonCoreList, which makes each common core GeneCall when it is read.
+#    The merged order is that of Comparison.IterMerged(): (contig, leftEnd, rightEnd, strand rank),
+#    then caller table, then row. A k-way merge gives that order only if each table is sorted; if a
+#    table is not, Compare() merges with Comparison's k-way merge instead, so results still match.
+#    Match modes other than exact regroup the merged calls with Comparison.GroupMatches().
+#
+# Classes and Methods:
+#    SortedMerge(comparison,firstIndex)
+#    CommonCoreList(tables,tableIndex,row)
+#    VectorComparison()
+#        MergeAll(geneSets)
+#        Compare(mergeStream)
+#        SortRows(firstIndex)
+#        GetGroupSizes()
+#        GetGroupMasks(callerBits)
+#        GetGroupCallerCounts()
+#        IdentifyCommonCore()
+#        IdentifySubsets()
+#        PrintStats(OUT)
+#        GatherStats()
+#
+# Functions:
+#    GetColumn(values,dtype)
+#    ToArray(typecode,values)
+#    IsSorted(contig,leftEnd,rightEnd,strandRank)
+#    SortKeys(contig,leftEnd,rightEnd,strandRank)
+#    AddTableStats(stats,table)
+#
+###################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import array
+import CGC_geneCall
+import CGC_compare
+import CGC_stats
+
+numpy = CGC_geneCall.GetNumpy()  # None if not installed: see CGC_compare.NewComparison()
+
+##### FUNCTIONS
+
+# A table column (an array.array, or a numpy array if memory-mapped) as a numpy array of dtype;
+# an array.array is viewed in place, without copying
+def GetColumn(values,dtype):
+    if isinstance(values,array.array):
+        if len(values) == 0:
+            return numpy.zeros(0,dtype)
+        return numpy.frombuffer(values,dtype)
+    values = numpy.asarray(values)
+    if values.dtype.kind == 'S':  # strand column: one character per row
+        return values.view(numpy.uint8)
+    return values.astype(dtype)
+
+# A numpy array as an array.array of typecode (e.g., for GeneCallRefList columns)
+def ToArray(typecode,values):
+    return array.array(typecode,numpy.ascontiguousarray(values,numpy.dtype(typecode)).tostring())
+
+# True if the rows are in (contig, leftEnd, rightEnd, strand rank) order
+def IsSorted(contig,leftEnd,rightEnd,strandRank):
+    if len(contig) < 2:
+        return True
+    c0 = contig[:-1];     c1 = contig[1:]
+    l0 = leftEnd[:-1];    l1 = leftEnd[1:]
+    r0 = rightEnd[:-1];   r1 = rightEnd[1:]
+    s0 = strandRank[:-1]; s1 = strandRank[1:]
+    inOrder = (c1 > c0) | ((c1 == c0) & ((l1 > l0) | ((l1 == l0) & ((r1 > r0) | ((r1 == r0) & (s1 >= s0))))))
+    return bool(inOrder.all())
+
+# Returns the order of rows sorted by (contig, leftEnd, rightEnd, strand rank); rows with equal keys keep their
+# order. The keys are packed into one 64-bit integer when their values fit, since a single sort is several times
+# faster than numpy.lexsort over four keys
+def SortKeys(contig,leftEnd,rightEnd,strandRank):
+    if len(contig) == 0:
+        return numpy.zeros(0,numpy.intp)
+    if min(int(contig.min()),int(leftEnd.min()),int(rightEnd.min())) >= 0:
+        rightBits = int(rightEnd.max()).bit_length()
+        leftBits  = int(leftEnd.max()).bit_length()
+        if int(contig.max()).bit_length() + leftBits + rightBits + 2 <= 63:
+            key = contig.astype(numpy.int64) << (leftBits + rightBits + 2)
+            key |= leftEnd.astype(numpy.int64) << (rightBits + 2)
+            key |= rightEnd.astype(numpy.int64) << 2
+            key |= strandRank.astype(numpy.int64)
+            return numpy.argsort(key,kind='mergesort')  # stable
+    return numpy.lexsort((strandRank,rightEnd,leftEnd,contig))  # stable
+
+# Add the calls of a CGC_geneCall.GeneCallTable to stats (a CGC_stats.ComparisonStats), as
+# ComparisonStats.AddTable() does: the calls are sorted by (caller, contig, length), and counted by run
+def AddTableStats(stats,table):
+    stats.callerStats = {}  # per-caller totals are out of date
+    rowCount = len(table)
+    if rowCount == 0:
+        return
+    contigCount = max(1,len(table.contigNames))
+    key    = GetColumn(table.callerId,numpy.uint16).astype(numpy.int64) * contigCount + GetColumn(table.contigId,numpy.intc)
+    length = GetColumn(table.geneLength,numpy.intc).astype(numpy.int64)
+    strand = GetColumn(table.strand,numpy.uint8)
+    order  = numpy.lexsort((length,key))
+    key = key[order]; length = length[order]; strand = strand[order]
+
+    # Runs of one (caller, contig) key, and within them, of one length
+    keyChange = key[1:] != key[:-1]
+    keyStarts = numpy.flatnonzero(numpy.concatenate(([True],keyChange)))
+    runStarts = numpy.flatnonzero(numpy.concatenate(([True],keyChange | (length[1:] != length[:-1]))))
+    keyCounts = numpy.diff(numpy.append(keyStarts,rowCount))
+    runCounts = numpy.diff(numpy.append(runStarts,rowCount))
+    totals = numpy.add.reduceat(length,keyStarts)
+    plus   = numpy.add.reduceat((strand == ord('+')).astype(numpy.int64),keyStarts)
+    minus  = numpy.add.reduceat((strand == ord('-')).astype(numpy.int64),keyStarts)
+    keys   = key[keyStarts]
+
+    keyStats = []
+    for count, totalLength, plusCount, minusCount in zip(keyCounts.tolist(),totals.tolist(),plus.tolist(),minus.tolist()):
+        lengthStats = CGC_stats.LengthStats()
+        lengthStats.count = count; lengthStats.totalLength = totalLength
+        lengthStats.plusCount = plusCount; lengthStats.minusCount = minusCount
+        keyStats.append(lengthStats)
+    runKeys = numpy.searchsorted(keys,key[runStarts])
+    for keyIndex, runLength, count in zip(runKeys.tolist(),length[runStarts].tolist(),runCounts.tolist()):
+        keyStats[keyIndex].lengthCounts[runLength] = count
+    for keyValue, lengthStats in zip(keys.tolist(),keyStats):
+        statsKey = (table.callerNames[keyValue // contigCount],table.contigNames[keyValue % contigCount])
+        if statsKey in stats.contigStats:
+            stats.contigStats[statsKey].AddStats(lengthStats)
+        else:
+            stats.contigStats[statsKey] = lengthStats
+    return
+
+##### CLASSES
+
+# Returned by VectorComparison.MergeAll() in place of a generator: Compare() sorts the tables it names
+# at once. Iterating it yields the (table index, row) references of Comparison.IterMerged()
+class SortedMerge(object):
+
+    def __init__(self,comparison,firstIndex):
+        self.comparison = comparison
+        self.firstIndex = firstIndex
+
+    def __iter__(self):
+        return self.comparison.IterMerged(self.firstIndex)
+
+# The common core, as the (table index, row) of the first call of each common group; indexing or
+# iterating returns the GeneCall that Comparison.IdentifyCommonCore() would have made for it
+class CommonCoreList(object):
+
+    def __init__(self,tables,tableIndex,row):
+        self.tables     = tables      # list of GeneCallTables, shared with the owning Comparison
+        self.tableIndex = tableIndex  # array.array
+        self.row        = row         # array.array
+
+    def __len__(self):
+        return len(self.row)
+
+    def __getitem__(self,index):
+        if index < 0:
+            index += len(self.row)
+        table = self.tables[self.tableIndex[index]]; row = self.row[index]
+        count = index + 1
+        newCommonCoreCall = CGC_geneCall.FrozenGeneCall("CommonCoreGene_" + str(count),"All_callers",count,table.strand[row],table.leftEnd[row],
+                                                        table.rightEnd[row],table.geneLength[row],table.contigNames[table.contigId[row]])
+        return newCommonCoreCall
+
+    def __iter__(self):
+        for index in xrange(0,len(self.row)):
+            yield self[index]
+
+class VectorComparison(CGC_compare.Comparison):
+
+    # As Comparison.MergeAll(), but returns a SortedMerge, which Compare() sorts as arrays
+    def MergeAll(self,geneSets):
+        firstIndex = len(self.callSets)
+        for geneSet in geneSets:
+            self.AddCallSet(geneSet)
+        return SortedMerge(self,firstIndex)
+
+    # As Comparison.Compare(); given a SortedMerge, the merged order and the groups are computed as arrays
+    def Compare(self,mergeStream=None):
+        if not isinstance(mergeStream,SortedMerge):
+            return CGC_compare.Comparison.Compare(self,mergeStream)
+        merged = self.SortRows(mergeStream.firstIndex)
+        if merged is None:  # a table is not sorted
+            return CGC_compare.Comparison.Compare(self,iter(mergeStream))
+        tableIndex, rows, newGroup = merged
+        if len(rows) == 0:
+            print "Compare(): Nothing to Compare"
+            return
+        refs = CGC_compare.GeneCallRefList(self.callSets)
+        refs.tableIndex = ToArray('i',tableIndex)
+        refs.row        = ToArray('i',rows)
+        groups = CGC_compare.GeneCallGroupList(refs)
+        groups.starts = ToArray('i',numpy.flatnonzero(newGroup))
+        self.mergeList  = refs
+        self.uniqueList = groups
+        if self.matchMode != CGC_compare.MATCH_EXACT:
+            self.GroupMatches()
+        return
+
+    # Sort the rows of self.callSets[firstIndex:] together, in the order of Comparison.IterMerged(); rows are
+    # gathered in table order, and each table's in row order, so a stable sort on the key breaks ties by table, then row
+    # Returns (table index, row, starts a new group) arrays in merged order, or None if a table is not sorted
+    def SortRows(self,firstIndex=0):
+        tables = self.callSets[firstIndex:]
+        contigRanks = dict([(contig,rank) for rank, contig in enumerate(sorted(set([contig for table in tables for contig in table.contigNames])))])
+        strandRanks = numpy.zeros(256,numpy.int8) + 2  # unknown strands sort last
+        for strand, rank in CGC_geneCall.STRAND_RANK.items():
+            strandRanks[ord(strand)] = rank
+        columns = [[],[],[],[],[],[],[]]  # contig rank, leftEnd, rightEnd, strand rank, strand, table index, row
+        for offset, table in enumerate(tables):
+            rowCount = len(table)
+            if rowCount == 0:
+                continue
+            contigRank = numpy.array([contigRanks[contig] for contig in table.contigNames],numpy.intc)
+            contig   = contigRank[GetColumn(table.contigId,numpy.intc)]
+            leftEnd  = GetColumn(table.leftEnd,numpy.intc)
+            rightEnd = GetColumn(table.rightEnd,numpy.intc)
+            strand   = GetColumn(table.strand,numpy.uint8)
+            strandRank = strandRanks[strand]
+            if not IsSorted(contig,leftEnd,rightEnd,strandRank):
+                return None
+            for values, column in zip((contig,leftEnd,rightEnd,strandRank,strand,numpy.zeros(rowCount,numpy.intc) + (firstIndex + offset),
+                                       numpy.arange(rowCount,dtype=numpy.intc)),columns):
+                column.append(values)
+        if not columns[0]:
+            return numpy.zeros(0,numpy.intc), numpy.zeros(0,numpy.intc), numpy.zeros(0,bool)
+        contig, leftEnd, rightEnd, strandRank, strand, tableIndex, rows = [numpy.concatenate(column) for column in columns]
+        order = SortKeys(contig,leftEnd,rightEnd,strandRank)
+        contig = contig[order]; leftEnd = leftEnd[order]; rightEnd = rightEnd[order]; strand = strand[order]
+
+        # Same identity test as Comparison.Compare(): contig, strand, leftEnd and rightEnd
+        newGroup = numpy.ones(len(order),bool)
+        newGroup[1:] = (contig[1:] != contig[:-1]) | (strand[1:] != strand[:-1]) | \
+                       (leftEnd[1:] != leftEnd[:-1]) | (rightEnd[1:] != rightEnd[:-1])
+        return tableIndex[order], rows[order], newGroup
+
+    # Number of calls in each group of self.uniqueList
+    def GetGroupSizes(self):
+        starts = GetColumn(self.uniqueList.starts,numpy.intc)
+        return numpy.diff(numpy.append(starts,len(self.mergeList)))
+
+    # Bitmask of the callers of each group of self.uniqueList; callerBits maps caller => bit (see GetCallerBits())
+    def GetGroupMasks(self,callerBits):
+        if len(self.uniqueList) == 0:
+            return numpy.zeros(0,numpy.uint64)
+        tableBits = []; tableOffsets = [0]
+        for table in self.callSets:
+            callerMask = numpy.array([callerBits.get(caller,0) for caller in table.callerNames] or [0],numpy.uint64)
+            tableBits.append(callerMask[GetColumn(table.callerId,numpy.uint16)])
+            tableOffsets.append(tableOffsets[-1] + len(table))
+        rowBits = numpy.concatenate(tableBits)
+        tableIndex = GetColumn(self.mergeList.tableIndex,numpy.intc)
+        refBits = rowBits[numpy.array(tableOffsets,numpy.int64)[tableIndex] + GetColumn(self.mergeList.row,numpy.intc)]
+        return numpy.bitwise_or.reduceat(refBits,GetColumn(self.uniqueList.starts,numpy.intc))
+
+    # Number of callers of each group of self.uniqueList, counted as Comparison.IdentifyCommonCore() counts them: the
+    # group's size if matching is exact, otherwise its distinct callers. Returns None if there are too many callers
+    # for bitmasks (see CGC_compare.SUBSET_MAX_CALLERS); run IdentifyCallers() before running this method
+    def GetGroupCallerCounts(self):
+        if self.matchMode == CGC_compare.MATCH_EXACT:
+            return self.GetGroupSizes()
+        if len(self.callerList) > CGC_compare.SUBSET_MAX_CALLERS:
+            return None
+        masks = self.GetGroupMasks(self.GetCallerBits())  # a group of matching calls may hold several calls from one caller
+        groupCallerCounts = numpy.zeros(len(masks),numpy.int64)
+        for bit in xrange(0,len(self.callerList)):
+            groupCallerCounts += ((masks >> numpy.uint64(bit)) & numpy.uint64(1)).astype(numpy.int64)
+        return groupCallerCounts
+
+    # As Comparison.IdentifyCommonCore(); groups are counted as arrays, and self.commonCore is a CommonCoreList
+    def IdentifyCommonCore(self):
+        if not self.uniqueList or not self.mergeList or self.commonCore:
+            if self.commonCore:  # as Comparison's, which appends to a common core already found
+                self.commonCore = list(self.commonCore)
+            return CGC_compare.Comparison.IdentifyCommonCore(self)
+        callerCount = self.IdentifyCallers()
+        if callerCount == 0:
+            print "IdentifyCommonCore(): callerCount is zero! cannot process"
+            return
+        groupCallerCounts = self.GetGroupCallerCounts()
+        if groupCallerCounts is None:
+            return CGC_compare.Comparison.IdentifyCommonCore(self)
+        firsts = GetColumn(self.uniqueList.starts,numpy.intc)[groupCallerCounts == callerCount]
+        self.commonCore = CommonCoreList(self.callSets,ToArray('i',GetColumn(self.mergeList.tableIndex,numpy.intc)[firsts]),
+                                         ToArray('i',GetColumn(self.mergeList.row,numpy.intc)[firsts]))
+        return
+
+    # As Comparison.IdentifySubsets(), with each group's mask combined by numpy.bitwise_or.reduceat
+    def IdentifySubsets(self):
+        masks = self.GetGroupMasks(self.GetCallerBits())
+        self.subsetMasks = ToArray('L',masks)
+        self.subsetCounts = {}
+        if len(masks) > 0:
+            values, counts = numpy.unique(masks,return_counts=True)
+            self.subsetCounts = dict(zip([int(value) for value in values.tolist()],counts.tolist()))
+        return self.subsetCounts
+
+    def PrintStats(self,OUT=None):
+        groupCallerCounts = self.GetGroupCallerCounts()
+        if groupCallerCounts is None:
+            return CGC_compare.Comparison.PrintStats(self,OUT)
+        loneCallCount = int((groupCallerCounts == 1).sum())
+        self.GatherStats()
+        self.PrintStatsSummary(len(self.uniqueList),len(self.commonCore),loneCallCount,OUT)
+        return
+
+    def GatherStats(self):
+        self.stats = CGC_stats.ComparisonStats()
+        for table in self.callSets:
+            AddTableStats(self.stats,table)
+        return self.stats
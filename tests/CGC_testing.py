@@ -0,0 +1,96 @@
+################################################################################################
+#
+# Module:  CGC_testing.py
+#
+# Description:  Input files and helper functions shared by the test modules (test_CGC_*.py).
+#
+# Notes:
+#    Run from the top directory:  python -m unittest discover tests
+#    Importing this module puts the top directory on the module path, so that the tests import
+#    the CGC modules whether they are run by "python -m unittest discover tests" or one at a time.
+#    CGC_main.CHATTY is turned off, so that tests print little but their failures; the ERROR lines
+#    of comparisons that are refused on purpose (e.g., streaming with same-stop matching) still print.
+#
+# Functions:
+#    GetReport(fileSet,matchMode,stream,workers,backend,gridFormat,minOverlap,cache)
+#    SplitReport(report)
+#    GetCount(report,text)
+#    GetRows(callSet)
+#    GetBackends()
+#    ReadText(fileName)
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import sys
+from cStringIO import StringIO
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_DIR  = os.path.dirname(TEST_DIR)
+if TOP_DIR not in sys.path:
+    sys.path.insert(0,TOP_DIR)
+
+import CGC_geneCall
+import CGC_compare
+import CGC_grid
+import CGC_main
+
+CGC_main.CHATTY = False
+
+##### FILES
+
+DATA_DIR   = os.path.join(TEST_DIR,"data")
+CALL_FILES = [os.path.join(DATA_DIR,fileName) for fileName in ("genemark.cgc","glimmer.cgc","prodigal.cgc")]
+
+HAVE_NUMPY = CGC_geneCall.GetNumpy() is not None
+
+##### STATISTICS LINES
+
+DISTINCT = "The number of distinct gene calls"
+COMMON   = "The number of gene calls in common"
+LONE     = "The number of unique (non-matching) gene calls"
+
+##### FUNCTIONS
+
+# Run CGC_main.RunComparison() on fileSet; returns the report
+def GetReport(fileSet,matchMode=CGC_compare.MATCH_EXACT,stream=False,workers=1,backend=CGC_compare.BACKEND_PYTHON,
+              gridFormat=CGC_grid.GRID_TSV,minOverlap=CGC_compare.DEFAULT_MIN_OVERLAP,cache=None):
+    OUT = StringIO(); LOG = StringIO()
+    CGC_main.RunComparison(fileSet,OUT,LOG,stream,workers,matchMode,minOverlap,cache,gridFormat,None,None,None,backend)
+    return OUT.getvalue()
+
+# A TSV report as (statistics lines, grid lines); a streaming comparison prints its statistics after the grid
+def SplitReport(report):
+    lines = report.splitlines()
+    gridStart = [i for i, line in enumerate(lines) if line.startswith("count\t")][0]
+    gridEnd = gridStart + 1
+    while gridEnd < len(lines) and lines[gridEnd][:1].isdigit():
+        gridEnd += 1
+    return lines[:gridStart] + lines[gridEnd:], lines[gridStart:gridEnd]
+
+# The value of a statistics line of a report, e.g., LONE
+def GetCount(report,text):
+    for line in report.splitlines():
+        if line.startswith(text):
+            return int(line.split()[-1])
+    return None
+
+# The rows of a call set, as tuples
+def GetRows(callSet):
+    return [(geneCall.geneCaller,geneCall.geneNumber,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,
+             geneCall.geneLength,geneCall.contig) for geneCall in callSet.geneCallList]
+
+# The comparison backends that can be tested: numpy only if it is installed
+def GetBackends():
+    if HAVE_NUMPY:
+        return CGC_compare.BACKENDS
+    return (CGC_compare.BACKEND_PYTHON,)
+
+def ReadText(fileName):
+    INFILE = open(fileName,"r")
+    text = INFILE.read()
+    INFILE.close()
+    return text
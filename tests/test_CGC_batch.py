@@ -0,0 +1,135 @@
+################################################################################################
+#
+# Module:  test_CGC_batch.py
+#
+# Description:  Tests of CGC_batch.py: the genomes read from a manifest, each with a directory of its
+#    own, and the summary row of each genome, which is an error row for any comparison that fails
+#    or is refused.
+#
+# Notes:
+#    ReadManifest() prints a warning for each line skipped; the tests read the warnings.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from CGC_testing import DATA_DIR, CALL_FILES, ReadText
+import CGC_compare
+import CGC_batch
+
+CGC_batch.CHATTY = False
+
+##### FILES
+
+MATCH_FILES = [os.path.join(DATA_DIR,"match_genemark.cgc"),os.path.join(DATA_DIR,"match_glimmer.cgc")]
+RAW_FILE    = os.path.join(DATA_DIR,"raw","glimmer.predict")
+
+##### FUNCTIONS
+
+# Read a manifest from its text; returns (genomes, warnings printed)
+def ReadManifestText(text):
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        genomes = CGC_batch.ReadManifest(StringIO(text))
+        warnings = sys.stdout.getvalue().splitlines()
+    finally:
+        sys.stdout = stdout
+    return genomes, warnings
+
+##### TESTS
+
+class ManifestTest(unittest.TestCase):
+
+    def testGenomes(self):
+        genomes, warnings = ReadManifestText("# genome\tfiles\n\ng1\ta.cgc\tb.cgc\r\n  \ng2\t c.cgc \t\td.cgc\n")
+        self.assertEqual(genomes,[("g1",["a.cgc","b.cgc"]),("g2",["c.cgc","d.cgc"])])
+        self.assertEqual(warnings,[])
+
+    # The first line of a repeated genome id is kept
+    def testDuplicate(self):
+        genomes, warnings = ReadManifestText("g1\ta.cgc\ng2\tb.cgc\ng1\tc.cgc\n")
+        self.assertEqual(genomes,[("g1",["a.cgc"]),("g2",["b.cgc"])])
+        self.assertEqual(len(warnings),1)
+        self.assertTrue(warnings[0].startswith("WARNING: genome id is listed more than once"),warnings[0])
+
+    # An id that would write outside its own directory, or in no directory, is skipped; a lone separator is "_"
+    def testUnusableIds(self):
+        genomes, warnings = ReadManifestText("..\ta.cgc\n.\tb.cgc\n%s\tc.cgc\ng1\td.cgc\n" % (os.sep))
+        self.assertEqual(genomes,[(os.sep,["c.cgc"]),("g1",["d.cgc"])])
+        self.assertEqual([warning.split(';')[0] for warning in warnings],
+                         ["WARNING: genome id cannot be used as a directory name"] * 2)
+
+    # Path separators in an id are replaced, so an id such as "../x" stays under the output directory;
+    # ids that differ only by a separator would share a directory, so the later is skipped
+    def testSeparators(self):
+        self.assertEqual(CGC_batch.GetGenomeDirName(os.path.join("..","x")),".._x")
+        self.assertEqual(CGC_batch.GetGenomeDir("out",os.path.join("a","b")),os.path.join("out","a_b"))
+        genomes, warnings = ReadManifestText("%s\ta.cgc\na_b\tb.cgc\n" % (os.path.join("a","b")))
+        self.assertEqual(genomes,[(os.path.join("a","b"),["a.cgc"])])
+        self.assertEqual(len(warnings),1)
+
+    def testNoFiles(self):
+        genomes, warnings = ReadManifestText("g1\n g2\t\t\n")
+        self.assertEqual(genomes,[])
+        self.assertEqual(len(warnings),2)
+
+class CompareGenomeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def GetLog(self,genomeId):
+        return ReadText(os.path.join(CGC_batch.GetGenomeDir(self.tempDir,genomeId),CGC_batch.GENOME_LOG))
+
+    def testOk(self):
+        status, summary = CGC_batch.CompareGenome("g1",MATCH_FILES,self.tempDir,False,CGC_compare.MATCH_SAME_STOP)
+        self.assertEqual(status,"ok")
+        self.assertEqual((summary['distinct'],summary['common'],summary['lone']),(6,2,4))
+
+    def testMissingFile(self):
+        missing = os.path.join(self.tempDir,"missing.cgc")
+        status, summary = CGC_batch.CompareGenome("g1",[CALL_FILES[0],missing],self.tempDir)
+        self.assertTrue(status.startswith("error: IOError: ") and missing in status,status)
+        self.assertEqual(summary['callerCounts'],{})
+        self.assertEqual(self.GetLog("g1").count("ERROR: "),1)
+
+    # A comparison that CGC_main refuses is an error, with its reason, logged once; not a genome with no calls
+    def testRefused(self):
+        status, summary = CGC_batch.CompareGenome("g1",CALL_FILES,self.tempDir,True,CGC_compare.MATCH_SAME_STOP)
+        self.assertEqual(status,"error: streaming comparison supports exact matching only, not same-stop")
+        self.assertEqual(self.GetLog("g1").count("ERROR: "),1)
+        status, summary = CGC_batch.CompareGenome("g2",["glimmer:" + RAW_FILE,CALL_FILES[0]],self.tempDir,True)
+        self.assertTrue(status.startswith("error: streaming requires sorted call files"),status)
+        self.assertEqual(summary,{'distinct':0, 'common':0, 'lone':0, 'callerCounts':{}})
+
+    # A genome whose directory cannot be made is an error row
+    def testUnusableDirectory(self):
+        open(os.path.join(self.tempDir,"g1"),"w").close()
+        status, summary = CGC_batch.CompareGenome("g1",CALL_FILES,self.tempDir)
+        self.assertTrue(status.startswith("error: OSError: "),status)
+
+    # Summary rows are in manifest order, serially or in a pool; a genome that fails does not end the batch
+    def testBatch(self):
+        genomes = [("g1",CALL_FILES),("g2",[CALL_FILES[0],os.path.join(self.tempDir,"missing.cgc")]),("g3",MATCH_FILES)]
+        for workers in (1,2):
+            outDir = os.path.join(self.tempDir,"out%d" % (workers))
+            self.assertEqual(CGC_batch.RunBatch(genomes,outDir,workers),3)
+            rows = [line.split('\t') for line in ReadText(os.path.join(outDir,CGC_batch.SUMMARY_FILE)).splitlines()]
+            self.assertEqual([row[0] for row in rows[1:]],["g1","g2","g3"])
+            self.assertEqual([row[1].split(':')[0] for row in rows[1:]],["ok","error","ok"])
+            self.assertEqual(rows[1][3:5],["111","28"])
+
+if __name__ == "__main__":
+    unittest.main()
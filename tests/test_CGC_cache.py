@@ -0,0 +1,119 @@
+################################################################################################
+#
+# Module:  test_CGC_cache.py
+#
+# Description:  Tests of CGC_cache.CallSetCache: entries are found by content, not by file name;
+#    a change to the content or to the parsers makes a new entry; least recently used entries are
+#    evicted beyond the size limit; and a cache that cannot be used costs only a cache miss.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from CGC_testing import CALL_FILES, GetReport, GetRows, ReadText
+import CGC_geneCall
+import CGC_parser
+import CGC_cache
+
+##### FUNCTIONS
+
+def ReadCallSets(fileName):
+    INFILE = open(fileName,"r")
+    callSets = CGC_geneCall.ReadGeneCallSets(INFILE)
+    INFILE.close()
+    return callSets
+
+def WriteText(fileName,text):
+    OUT = open(fileName,"w")
+    OUT.write(text)
+    OUT.close()
+    return
+
+##### TESTS
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir  = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tempDir,"cache")
+        self.cache    = CGC_cache.CallSetCache(self.cacheDir)
+        self.callFile = os.path.join(self.tempDir,"genemark.cgc")
+        shutil.copy(CALL_FILES[0],self.callFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def Store(self,fileName):
+        key = self.cache.GetKey(fileName)
+        self.assertTrue(self.cache.Store(key,ReadCallSets(fileName)))
+        return key
+
+    # A file renamed (or copied), with the same content, is found in the cache, sorted
+    def testHitAfterRename(self):
+        self.Store(self.callFile)
+        renamed = os.path.join(self.tempDir,"renamed.cgc")
+        os.rename(self.callFile,renamed)
+        callSets = self.cache.Load(self.cache.GetKey(renamed))
+        self.assertEqual((self.cache.hits,self.cache.misses),(1,0))
+        expected = ReadCallSets(renamed)[0]
+        expected.SortGeneCalls()
+        self.assertEqual(GetRows(callSets[0]),GetRows(expected))
+
+    def testMissAfterChange(self):
+        key = self.Store(self.callFile)
+        WriteText(self.callFile,ReadText(self.callFile).replace("\t9\t194\t186\t","\t10\t194\t185\t"))
+        self.assertNotEqual(self.cache.GetKey(self.callFile),key)
+        self.assertEqual(self.cache.Load(self.cache.GetKey(self.callFile)),None)
+        self.assertEqual((self.cache.hits,self.cache.misses),(0,1))
+
+    # A new version of the parsers may read the same file differently: its entries are not those of the old version
+    def testParserVersion(self):
+        key = self.Store(self.callFile)
+        version = CGC_parser.PARSER_VERSION
+        CGC_parser.PARSER_VERSION = version + 1
+        try:
+            self.assertNotEqual(self.cache.GetKey(self.callFile),key)
+            self.assertEqual(self.cache.Load(self.cache.GetKey(self.callFile)),None)
+        finally:
+            CGC_parser.PARSER_VERSION = version
+        self.assertNotEqual(self.cache.Load(key),None)
+
+    # Beyond maxBytes, the least recently used entries are evicted first
+    def testEviction(self):
+        keys = [self.Store(fileName) for fileName in CALL_FILES]
+        for age, key in enumerate(keys):  # keys[0] is the oldest
+            entryTime = 1000000 + age
+            os.utime(os.path.join(self.cacheDir,key),(entryTime,entryTime))
+        self.cache.Load(keys[0])  # now the most recently used
+        sizes = dict([(key,self.cache.GetEntrySize(os.path.join(self.cacheDir,key))) for key in keys])
+        self.cache.maxBytes = sizes[keys[0]] + sizes[keys[2]]
+        self.cache.Evict()
+        self.assertEqual(sorted(os.listdir(self.cacheDir)),sorted([keys[0],keys[2]]))
+
+    # A cache directory removed, or replaced by a file, skips the store; the comparison goes on as without a cache
+    def testUnusableDirectory(self):
+        key = self.cache.GetKey(self.callFile)
+        shutil.rmtree(self.cacheDir)
+        self.assertFalse(self.cache.Store(key,ReadCallSets(self.callFile)))
+        self.assertEqual(GetReport(CALL_FILES,cache=self.cache),GetReport(CALL_FILES))
+        WriteText(self.cacheDir,"")
+        self.assertFalse(self.cache.Store(key,ReadCallSets(self.callFile)))
+        self.assertEqual(self.cache.Load(key),None)
+        self.assertEqual(GetReport(CALL_FILES,cache=self.cache),GetReport(CALL_FILES))
+        self.assertEqual(sorted(os.listdir(self.tempDir)),["cache","genemark.cgc"])
+
+    # A second run over the same inputs loads every call set from the cache, and reports the same
+    def testReport(self):
+        report = GetReport(CALL_FILES,cache=self.cache)
+        self.assertEqual(self.cache.misses,len(CALL_FILES))
+        self.assertEqual(GetReport(CALL_FILES,cache=self.cache),report)
+        self.assertEqual(self.cache.hits,len(CALL_FILES))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+################################################################################################
+#
+# Module:  test_CGC_compare.py
+#
+# Description:  Tests of the match modes of CGC_compare.Comparison: which calls are grouped
+#    in exact, same-stop and overlap matching, and the grid rows and counts reported for them;
+#    and of the caller-combination counts and pairwise matrices written with --subsets.
+#
+# Notes:
+#    tests/data/match_genemark.cgc and match_glimmer.cgc hold, on contig c1: two genemark calls
+#    with glimmer's stop at 1000 (one identical to glimmer's, one starting later); a genemark and
+#    a glimmer call with the same stop at 3000 that overlap by 90%; genemark and glimmer calls at
+#    5000..6000 on opposite strands; a glimmer call of its own; and on contig c2, a genemark call
+#    with the coordinates of the calls at 100..1000 on c1, which must match nothing.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import unittest
+from cStringIO import StringIO
+
+from CGC_testing import DATA_DIR, CALL_FILES, DISTINCT, COMMON, LONE, GetReport, SplitReport, GetCount, GetBackends
+import CGC_geneCall
+import CGC_compare
+import CGC_grid
+import CGC_main
+
+##### FILES
+
+MATCH_FILES = [os.path.join(DATA_DIR,"match_genemark.cgc"),os.path.join(DATA_DIR,"match_glimmer.cgc")]
+
+##### EXPECTED GRIDS
+
+GENEMARK_100 = "genemark\t+\t100\t1000\t901\tc1\t"
+GENEMARK_400 = "genemark\t+\t400\t1000\t601\tc1\t"
+GENEMARK_2000 = "genemark\t+\t2000\t3000\t1001\tc1\t"
+GENEMARK_5000 = "genemark\t-\t5000\t6000\t1001\tc1\t"
+GENEMARK_C2 = "genemark\t+\t100\t1000\t901\tc2\t"
+GLIMMER_100 = "glimmer\t+\t100\t1000\t901\tc1\t"
+GLIMMER_2100 = "glimmer\t+\t2100\t3000\t901\tc1\t"
+GLIMMER_5000 = "glimmer\t+\t5000\t6000\t1001\tc1\t"
+GLIMMER_7000 = "glimmer\t+\t7000\t8000\t1001\tc1\t"
+NONE = "\t\t\t\t\t\t"
+
+# Match mode => (distinct, common, lone, grid rows as (count, genemark cells, glimmer cells))
+EXPECTED = {
+    CGC_compare.MATCH_EXACT: (8,1,7,[(1,GENEMARK_100,GLIMMER_100),(2,GENEMARK_400,NONE),(3,GENEMARK_2000,NONE),
+                                     (4,NONE,GLIMMER_2100),(5,NONE,GLIMMER_5000),(6,GENEMARK_5000,NONE),
+                                     (7,NONE,GLIMMER_7000),(8,GENEMARK_C2,NONE)]),
+    CGC_compare.MATCH_SAME_STOP: (6,2,4,[(1,GENEMARK_100,GLIMMER_100),(1,GENEMARK_400,NONE),(2,GENEMARK_2000,GLIMMER_2100),
+                                         (3,NONE,GLIMMER_5000),(4,GENEMARK_5000,NONE),(5,NONE,GLIMMER_7000),
+                                         (6,GENEMARK_C2,NONE)]),
+    CGC_compare.MATCH_OVERLAP: (7,2,5,[(1,GENEMARK_100,GLIMMER_100),(2,GENEMARK_400,NONE),(3,GENEMARK_2000,GLIMMER_2100),
+                                       (4,NONE,GLIMMER_5000),(5,GENEMARK_5000,NONE),(6,NONE,GLIMMER_7000),
+                                       (7,GENEMARK_C2,NONE)]),
+    }
+
+##### FUNCTIONS
+
+# Compare fileSet as CGC_main.py does, then count caller combinations as --subsets does; returns (comparison, report)
+def CompareSubsets(fileSet,matchMode=CGC_compare.MATCH_EXACT,stream=False):
+    OUT = StringIO()
+    comparison = CGC_main.RunComparison(fileSet,OUT,StringIO(),stream,1,matchMode)
+    if not stream:
+        comparison.IdentifySubsets()
+    return comparison, OUT.getvalue()
+
+# A pairwise matrix written by PrintPairwiseMatrix(), as row caller => column caller => text of the cell
+def GetMatrix(comparison,measure):
+    OUT = StringIO()
+    comparison.PrintPairwiseMatrix(OUT,measure)
+    lines = [line.split('\t') for line in OUT.getvalue().splitlines()]
+    return dict([(line[0],dict(zip(lines[0][1:],line[1:]))) for line in lines[1:]])
+
+##### TESTS
+
+class MatchModeTest(unittest.TestCase):
+
+    def CheckReport(self,report,expected,message):
+        distinct, common, lone, rows = expected
+        self.assertEqual(GetCount(report,DISTINCT),distinct,message)
+        self.assertEqual(GetCount(report,COMMON),common,message)
+        self.assertEqual(GetCount(report,LONE),lone,message)
+        self.assertEqual(SplitReport(report)[1][1:],["%d \t%s%s" % row for row in rows],message)
+
+    # Each match mode, in each backend, serially and with a worker process per contig
+    def testMatchModes(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            for backend in GetBackends():
+                for workers in (1,2):
+                    report = GetReport(MATCH_FILES,matchMode,workers=workers,backend=backend)
+                    self.CheckReport(report,EXPECTED[matchMode],"%s %s workers=%d" % (matchMode,backend,workers))
+
+    # A lower minimum overlap also matches the later genemark start at 400 (601 of 901 bases)
+    def testMinOverlap(self):
+        report = GetReport(MATCH_FILES,CGC_compare.MATCH_OVERLAP,minOverlap=0.6)
+        self.CheckReport(report,EXPECTED[CGC_compare.MATCH_SAME_STOP],"overlap 0.6")
+
+    # The long grid lists every call of each group, one per line
+    def testLongGrid(self):
+        report = GetReport(MATCH_FILES,CGC_compare.MATCH_SAME_STOP,gridFormat=CGC_grid.GRID_LONG)
+        rows = [line for line in report.splitlines() if line[:1].isdigit()]
+        self.assertEqual(rows[:4],["1\t" + GENEMARK_100[:-1],"1\t" + GLIMMER_100[:-1],"1\t" + GENEMARK_400[:-1],
+                                   "2\t" + GENEMARK_2000[:-1]])
+        self.assertEqual(len(rows),9)
+
+    # Calls on different contigs never match, in any mode
+    def testContigs(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            comparison = CGC_compare.Comparison()
+            comparison.matchMode = matchMode
+            genemark = [("genemark",1,'+',100,1000,901,"c2")]
+            glimmer  = [("glimmer",1,'+',100,1000,901,"c1")]
+            tables = []
+            for calls in (genemark,glimmer):
+                table = CGC_geneCall.GeneCallTable()
+                for geneCaller, geneNumber, strand, leftEnd, rightEnd, length, contig in calls:
+                    table.AppendRow(geneNumber,strand,leftEnd,rightEnd,length,contig,geneCaller)
+                tables.append(table)
+            comparison.Compare(comparison.MergeAll(tables))
+            self.assertEqual(len(comparison.uniqueList),2,matchMode)
+
+# Caller combinations (--subsets): each unique gene call is counted once, under the callers that made it
+class SubsetTest(unittest.TestCase):
+
+    # The combination counts add up to the report's distinct, common and lone counts
+    def CheckCounts(self,comparison,report,message):
+        allCallers = (1 << len(comparison.callerList)) - 1
+        singles = [1 << i for i in xrange(0,len(comparison.callerList))]
+        self.assertEqual(sum(comparison.subsetCounts.values()),GetCount(report,DISTINCT),message)
+        self.assertEqual(comparison.subsetCounts.get(allCallers,0),GetCount(report,COMMON),message)
+        self.assertEqual(sum([comparison.subsetCounts.get(mask,0) for mask in singles]),GetCount(report,LONE),message)
+
+    def testExact(self):
+        comparison, report = CompareSubsets(CALL_FILES)
+        self.assertEqual(comparison.callerList,["genemark","glimmer","prodigal"])
+        self.CheckCounts(comparison,report,"exact")
+        self.assertEqual(len(comparison.subsetMasks),GetCount(report,DISTINCT))
+        self.assertEqual(comparison.subsetCounts,{1:16, 2:16, 3:10, 4:16, 5:10, 6:15, 7:28})
+
+    # Jaccard is symmetric (38 shared of 95 calls); agreement is the fraction of the row caller's calls,
+    # so genemark (64 calls) and glimmer (69 calls) agree on 38/64 and 38/69
+    def testMatrices(self):
+        comparison, report = CompareSubsets(CALL_FILES)
+        jaccard = GetMatrix(comparison,CGC_compare.MEASURE_JACCARD)
+        self.assertEqual((jaccard["genemark"]["glimmer"],jaccard["glimmer"]["genemark"]),("0.4000","0.4000"))
+        agreement = GetMatrix(comparison,CGC_compare.MEASURE_AGREEMENT)
+        self.assertEqual((agreement["genemark"]["glimmer"],agreement["glimmer"]["genemark"]),("0.5938","0.5507"))
+        self.assertEqual(agreement["prodigal"]["prodigal"],"1.0000")
+
+    # Overlap matching forms groups of matching calls, counted once each (see EXPECTED)
+    def testOverlap(self):
+        comparison, report = CompareSubsets(MATCH_FILES,CGC_compare.MATCH_OVERLAP)
+        self.CheckCounts(comparison,report,"overlap")
+        self.assertEqual(comparison.subsetCounts,{1:3, 2:2, 3:2})
+
+    # A streaming comparison counts combinations as it goes, without masks, to the same counts
+    def testStream(self):
+        comparison, report = CompareSubsets(CALL_FILES,stream=True)
+        self.CheckCounts(comparison,report,"stream")
+        self.assertEqual(comparison.subsetCounts,CompareSubsets(CALL_FILES)[0].subsetCounts)
+
+if __name__ == "__main__":
+    unittest.main()
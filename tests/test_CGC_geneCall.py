@@ -0,0 +1,120 @@
+################################################################################################
+#
+# Module:  test_CGC_geneCall.py
+#
+# Description:  Tests of CGC_geneCall.GeneCallSet.SortGeneCalls(): calls are ordered by contig,
+#    leftEnd, rightEnd and strand, stably, whatever their input order; input already in that order
+#    is left as it is, without being sorted again. GeneCall views of table rows are read-only.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import unittest
+
+from CGC_testing import CALL_FILES, GetRows
+import CGC_geneCall
+
+##### CALLS
+
+# (geneNumber, strand, leftEnd, rightEnd, length, contig), unsorted; the smallest call (c1, 5..400) is last
+UNSORTED = [(1,'+',3000,3500,501,"c2"),
+            (2,'-',900,1500,601,"c1"),
+            (3,'+',900,1200,301,"c1"),
+            (4,'-',100,700,601,"c2"),
+            (5,'-',900,1200,301,"c1"),
+            (6,'+',900,1200,301,"c1"),  # the same key as call 3: stays after it
+            (7,'+',5,400,396,"c1")]
+SORTED_NUMBERS = [7,3,6,5,2,4,1]
+
+##### FUNCTIONS
+
+def NewCallSet(rows,geneCaller="genemark"):
+    callSet = CGC_geneCall.GeneCallSet()
+    callSet.geneCaller = geneCaller
+    for geneNumber, strand, leftEnd, rightEnd, length, contig in rows:
+        callSet.geneCallList.AppendRow(geneNumber,strand,leftEnd,rightEnd,length,contig,geneCaller)
+    callSet.UpdateGeneCount()
+    return callSet
+
+def ReadCallSet(fileName):
+    INFILE = open(fileName,"r")
+    callSet = CGC_geneCall.ReadGeneCallSets(INFILE)[0]
+    INFILE.close()
+    return callSet
+
+# Fails the test if a table is reordered: the already-sorted fast path must not reorder
+def NoReorder(order):
+    raise AssertionError("sorted input was reordered")
+
+##### TESTS
+
+class SortTest(unittest.TestCase):
+
+    def testUnsorted(self):
+        callSet = NewCallSet(UNSORTED)
+        callSet.SortGeneCalls()
+        self.assertEqual([geneCall.geneNumber for geneCall in callSet.geneCallList],SORTED_NUMBERS)
+        rows = GetRows(callSet)
+        self.assertEqual(rows,sorted(rows,key=lambda row: (row[6],row[3],row[4],CGC_geneCall.STRAND_RANK[row[2]])))
+        self.assertTrue(callSet.geneCallList.sorted)
+
+    # Input already in order gives the same order, by the fast path, with no reordering
+    def testSortedFastPath(self):
+        callSet = NewCallSet(UNSORTED)
+        callSet.SortGeneCalls()
+        rows = [row[1:] for row in GetRows(callSet)]
+        sortedSet = NewCallSet(rows)
+        sortedSet.geneCallList.Reorder = NoReorder
+        sortedSet.SortGeneCalls()
+        self.assertEqual(GetRows(sortedSet),GetRows(callSet))
+        self.assertTrue(sortedSet.geneCallList.sorted)
+
+    # The smallest call last, in a file of calls otherwise sorted: the fast check must not stop at the first calls
+    def testSmallestLast(self):
+        callSet = ReadCallSet(CALL_FILES[0])
+        callSet.SortGeneCalls()
+        expected = GetRows(callSet)
+        rows = [row[1:] for row in expected]
+        unsortedSet = NewCallSet(rows[1:] + rows[:1])
+        unsortedSet.SortGeneCalls()
+        self.assertEqual(GetRows(unsortedSet),expected)
+        reversedSet = NewCallSet(list(reversed(rows)))
+        reversedSet.SortGeneCalls()
+        self.assertEqual([row[2:] for row in GetRows(reversedSet)],[row[2:] for row in expected])
+
+    # Contigs are ordered by name, not by their order of appearance
+    def testContigOrder(self):
+        callSet = NewCallSet([(1,'+',10,100,91,"contigB"),(2,'+',500,900,401,"contigA"),(3,'+',5,50,46,"contigB")])
+        callSet.SortGeneCalls()
+        self.assertEqual([geneCall.geneNumber for geneCall in callSet.geneCallList],[2,3,1])
+
+    # The original insertion sort orders calls on one contig by position as the keyed sort does
+    def testInsertionSort(self):
+        rows = [row for row in UNSORTED if row[5] == "c1" and row[0] != 5]  # no calls differing by strand only
+        keyedSet = NewCallSet(rows)
+        keyedSet.SortGeneCalls()
+        insertionSet = NewCallSet(rows)
+        insertionSet.SortGeneCalls(CGC_geneCall.SORT_INSERTION)
+        self.assertEqual(GetRows(insertionSet),GetRows(keyedSet))
+
+class GeneCallTest(unittest.TestCase):
+
+    # A view of a table row holds the row's values and cannot be changed; a new GeneCall can
+    def testFrozenView(self):
+        callSet = NewCallSet(UNSORTED)
+        geneCall = callSet.geneCallList[0]
+        self.assertEqual((geneCall.geneName,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,geneCall.contig),
+                         ("genemark_1",'+',3000,3500,"c2"))
+        self.assertRaises(AttributeError,setattr,geneCall,"leftEnd",1)
+        self.assertRaises(AttributeError,geneCall.AssignGeneCall,"x","x",1,'+',1,2,2)
+        newCall = CGC_geneCall.GeneCall()
+        newCall.AssignGeneCall("x","x",1,'+',1,2,2)
+        newCall.leftEnd = 0
+        self.assertEqual((newCall.leftEnd,newCall.contig),(0,"unknown"))
+        newCall.Freeze()
+        self.assertRaises(AttributeError,setattr,newCall,"leftEnd",1)
+
+if __name__ == "__main__":
+    unittest.main()
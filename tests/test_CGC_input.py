@@ -0,0 +1,192 @@
+################################################################################################
+#
+# Module:  test_CGC_input.py
+#
+# Description:  Tests of CGC_input.py, as used by CGC_parser.Parse() and CGC_main.py: a raw output
+#    parsed in chunks, in parallel, must give the calls of a single pass, and a compressed input
+#    (.gz, .zst) the calls, or report, of the same input uncompressed.
+#
+# Notes:
+#    Chunked parsing is tested on files of a few kilobytes, with CGC_input.CHUNK_SIZE lowered, so
+#    that they are split into many chunks, and chunk ends fall within lines and contigs.
+#    .zst input is tested only if the zstandard module or the zstd command is installed.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from CGC_testing import DATA_DIR, CALL_FILES, GetReport, ReadText
+import CGC_input
+import CGC_parser
+
+##### FILES
+
+RAW_DIR = os.path.join(DATA_DIR,"raw")
+
+# Gene caller => raw file, in each format that CGC_parser reads in one pass
+RAW_FILES = {
+    "genemark" : "genemark.fasta.lst",
+    "glimmer"  : "glimmer.predict",
+    "prodigal" : "prodigal.genes.sco",
+    "rast"     : "rast.gff3",
+    "phate"    : "phate.txt",
+    }
+
+CHUNK_SIZE = 256   # bytes per chunk, in place of CGC_input.CHUNK_SIZE
+COPIES     = 40    # copies of each call of a raw GFF file, on as many contigs
+
+##### FUNCTIONS
+
+def WriteText(fileName,text):
+    OUT = open(fileName,"wb")
+    OUT.write(text)
+    OUT.close()
+    return
+
+# The lines of a GFF file, copied COPIES times, each copy on contigs of its own (contigA1, contigB1, ...)
+def GetCopies(fileName):
+    lines = [line for line in ReadText(fileName).splitlines(True) if not line.startswith('#')]
+    copies = []
+    for copy in range(COPIES):
+        copies.extend([line.replace("\t",str(copy) + "\t",1) for line in lines])
+    return "##gff-version 3\n" + "".join(copies)
+
+def HaveZstd():
+    if CGC_input.zstandard is not None:
+        return True
+    try:
+        return subprocess.call([CGC_input.ZSTD_COMMAND,"-q","-V"],stdout=open(os.devnull,"w"),stderr=subprocess.STDOUT) == 0
+    except OSError:
+        return False
+
+##### TESTS
+
+class ChunkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir   = tempfile.mkdtemp()
+        self.chunkSize = CGC_input.CHUNK_SIZE
+        self.sco       = CGC_parser.PRODIGAL_sco
+        CGC_input.CHUNK_SIZE = CHUNK_SIZE
+        self.rastFile = os.path.join(self.tempDir,"rast.gff3")
+        WriteText(self.rastFile,GetCopies(os.path.join(RAW_DIR,"rast.gff3")))
+        self.gffFile = os.path.join(self.tempDir,"prodigal.genes.gff")
+        WriteText(self.gffFile,GetCopies(os.path.join(RAW_DIR,"prodigal.genes.gff")))
+
+    def tearDown(self):
+        CGC_input.CHUNK_SIZE = self.chunkSize
+        CGC_parser.PRODIGAL_sco = self.sco
+        shutil.rmtree(self.tempDir)
+
+    # Chunks cover the file, in order, each ending at a line end; their lines are the file's lines
+    def testChunks(self):
+        chunks = CGC_input.GetChunks(self.rastFile)
+        self.assertTrue(len(chunks) > 10)
+        self.assertEqual(chunks[0][0],0)
+        self.assertEqual(chunks[-1][1],os.path.getsize(self.rastFile))
+        for (start, end), (nextStart, nextEnd) in zip(chunks,chunks[1:]):
+            self.assertEqual(end,nextStart)
+        lines = []
+        for start, end in chunks:
+            chunkLines = CGC_input.ReadChunk(self.rastFile,start,end)
+            self.assertTrue(chunkLines[-1].endswith('\n'))
+            lines.extend(chunkLines)
+        self.assertEqual(lines,ReadText(self.rastFile).splitlines(True))
+
+    # The last line of a file may have no line end
+    def testNoLastLineEnd(self):
+        WriteText(self.rastFile,ReadText(self.rastFile).rstrip('\n'))
+        lines = []
+        for start, end in CGC_input.GetChunks(self.rastFile):
+            lines.extend(CGC_input.ReadChunk(self.rastFile,start,end))
+        self.assertEqual(lines,ReadText(self.rastFile).splitlines(True))
+        self.assertEqual(list(CGC_parser.Parse("rast",self.rastFile,4)),list(CGC_parser.Parse("rast",self.rastFile)))
+
+    # Calls parsed in chunks are those of a single pass, numbered in sequence, on the same contigs
+    def testRast(self):
+        calls = list(CGC_parser.Parse("rast",self.rastFile))
+        self.assertEqual(len(calls),4 * COPIES)
+        self.assertEqual([call[0] for call in calls],range(1,len(calls) + 1))
+        for workers in (2,4):
+            self.assertEqual(list(CGC_parser.Parse("rast",self.rastFile,workers)),calls,workers)
+
+    def testProdigalGff(self):
+        CGC_parser.PRODIGAL_sco = False
+        calls = list(CGC_parser.Parse("prodigal",self.gffFile))
+        self.assertEqual(len(calls),4 * COPIES)
+        self.assertEqual(list(CGC_parser.Parse("prodigal",self.gffFile,3)),calls)
+
+    # Formats read in one pass (contig header lines) give the same calls with workers
+    def testOnePassFormats(self):
+        for geneCaller in sorted(RAW_FILES):
+            fileName = os.path.join(RAW_DIR,RAW_FILES[geneCaller])
+            self.assertEqual(list(CGC_parser.Parse(geneCaller,fileName,4)),list(CGC_parser.Parse(geneCaller,fileName)),geneCaller)
+
+class CompressionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def Gzip(self,fileName,members=1):
+        text = ReadText(fileName)
+        gzFile = os.path.join(self.tempDir,os.path.basename(fileName) + ".gz")
+        OUT = open(gzFile,"wb")
+        size = len(text) // members + 1
+        for start in range(0,len(text),size):  # each part is a gzip member of its own, as concatenated .gz files are
+            GZ = gzip.GzipFile(fileobj=OUT,mode="wb")
+            GZ.write(text[start:start + size])
+            GZ.close()
+        OUT.close()
+        return gzFile
+
+    def Zstd(self,fileName):
+        zstFile = os.path.join(self.tempDir,os.path.basename(fileName) + ".zst")
+        if CGC_input.zstandard is not None:
+            WriteText(zstFile,CGC_input.zstandard.ZstdCompressor().compress(ReadText(fileName)))
+        else:
+            subprocess.check_call([CGC_input.ZSTD_COMMAND,"-q","-f","-o",zstFile,fileName])
+        return zstFile
+
+    def CheckRaw(self,compress):
+        for geneCaller in sorted(RAW_FILES):
+            fileName = os.path.join(RAW_DIR,RAW_FILES[geneCaller])
+            calls = list(CGC_parser.Parse(geneCaller,fileName))
+            self.assertEqual(list(CGC_parser.Parse(geneCaller,compress(fileName))),calls,geneCaller)
+            self.assertEqual(list(CGC_parser.Parse(geneCaller,compress(fileName),4)),calls,geneCaller)
+
+    def testGzip(self):
+        self.CheckRaw(self.Gzip)
+        self.CheckRaw(lambda fileName: self.Gzip(fileName,3))
+
+    @unittest.skipIf(not HaveZstd(),"neither the zstandard module nor the zstd command is installed")
+    def testZstd(self):
+        self.CheckRaw(self.Zstd)
+
+    # Compression is recognized by content: a compressed file with any name, or none, is decompressed
+    def testCompressionByContent(self):
+        fileName = os.path.join(RAW_DIR,RAW_FILES["glimmer"])
+        renamed = os.path.join(self.tempDir,"glimmer.predict")
+        shutil.move(self.Gzip(fileName),renamed)
+        self.assertEqual(CGC_input.GetCompression(renamed),CGC_input.COMPRESSION_GZIP)
+        self.assertEqual(list(CGC_parser.Parse("glimmer",renamed)),list(CGC_parser.Parse("glimmer",fileName)))
+
+    # Compressed call files, and compressed raw outputs given as <caller>:<file>, report as uncompressed ones
+    def testReport(self):
+        self.assertEqual(GetReport([self.Gzip(fileName) for fileName in CALL_FILES]),GetReport(CALL_FILES))
+        rawSpecs = [geneCaller + ":" + os.path.join(RAW_DIR,RAW_FILES[geneCaller]) for geneCaller in ("genemark","rast")]
+        gzSpecs = [geneCaller + ":" + self.Gzip(os.path.join(RAW_DIR,RAW_FILES[geneCaller])) for geneCaller in ("genemark","rast")]
+        self.assertEqual(GetReport(gzSpecs),GetReport(rawSpecs))
+
+if __name__ == "__main__":
+    unittest.main()
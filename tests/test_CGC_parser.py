@@ -0,0 +1,255 @@
+################################################################################################
+#
+# Module:  test_CGC_parser.py
+#
+# Description:  Tests of CGC_parser.py: the normalized calls read from each gene caller's output.
+#
+# Notes:
+#    tests/data/raw holds a small output file of each gene caller (and of Prodigal's GFF format),
+#    calling the same four genes on two contigs, contigA and contigB; every file must parse to the
+#    same normalized calls, RAW_CALLS (gene numbers are the callers' own).
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import shutil
+import multiprocessing
+import tempfile
+import unittest
+
+from CGC_testing import DATA_DIR, GetReport
+import CGC_geneCall
+import CGC_parser
+import CGC_compare
+import CGC_main
+
+##### FILES
+
+RAW_DIR = os.path.join(DATA_DIR,"raw")
+
+# Gene caller => (raw file, gene numbers)
+RAW_FILES = {
+    "genemark" : ("genemark.fasta.lst",(1,2,3,4)),
+    "glimmer"  : ("glimmer.predict",(1,3,5,6)),
+    "prodigal" : ("prodigal.genes.sco",(1,2,1,2)),
+    "rast"     : ("rast.gff3",(1,2,3,4)),
+    "phate"    : ("phate.txt",(1,2,3,4)),
+    }
+PRODIGAL_GFF = "prodigal.genes.gff"
+
+# (strand, leftEnd, rightEnd, length, contig) of the four calls in every raw file
+RAW_CALLS = [('+',3,1001,999,'contigA'),('-',1100,1600,501,'contigA'),('+',200,800,601,'contigB'),('-',900,1500,601,'contigB')]
+
+##### FUNCTIONS
+
+# The normalized calls expected of a raw file, with its gene numbers
+def GetExpected(geneNumbers):
+    return [(geneNumber,) + call for geneNumber, call in zip(geneNumbers,RAW_CALLS)]
+
+# Parse a raw file in Prodigal's GFF format, which CGC_parser reads only if PRODIGAL_sco is off
+def ParseProdigalGff(fileName,workers=1):
+    sco = CGC_parser.PRODIGAL_sco
+    CGC_parser.PRODIGAL_sco = False
+    try:
+        return list(CGC_parser.Parse("prodigal",fileName,workers))
+    finally:
+        CGC_parser.PRODIGAL_sco = sco
+
+##### TESTS
+
+# Each caller's raw output, normalized: 1-based left and right ends, strand, length and the contig's first word;
+# partial-gene marks (<, >) are dropped, and RAST features other than CDS are skipped
+class RawFormatTest(unittest.TestCase):
+
+    def testFormats(self):
+        for geneCaller in sorted(RAW_FILES):
+            fileName, geneNumbers = RAW_FILES[geneCaller]
+            calls = list(CGC_parser.Parse(geneCaller,os.path.join(RAW_DIR,fileName)))
+            self.assertEqual(calls,GetExpected(geneNumbers),geneCaller)
+
+    def testProdigalGff(self):
+        self.assertEqual(ParseProdigalGff(os.path.join(RAW_DIR,PRODIGAL_GFF)),GetExpected((1,2,3,4)))
+
+    # A line whose score column is not a number is not a call
+    def testProdigalGffScore(self):
+        tempDir = tempfile.mkdtemp()
+        try:
+            fileName = os.path.join(tempDir,PRODIGAL_GFF)
+            OUT = open(fileName,"w")
+            for line in open(os.path.join(RAW_DIR,PRODIGAL_GFF)):
+                OUT.write(line)
+                if line.startswith("contigA") and "\t1100\t" in line:
+                    OUT.write(line.replace("\t50.2\t","\tn/a\t"))
+                    OUT.write(line.replace("\t50.2\t","\t\t"))
+            OUT.close()
+            self.assertEqual(ParseProdigalGff(fileName),GetExpected((1,2,3,4)))
+        finally:
+            shutil.rmtree(tempDir)
+
+    # A call file written from a raw file reads back as the same calls
+    def testCallFile(self):
+        tempDir = tempfile.mkdtemp()
+        try:
+            for geneCaller in sorted(RAW_FILES):
+                fileName, geneNumbers = RAW_FILES[geneCaller]
+                outFile = os.path.join(tempDir,geneCaller + CGC_parser.OUT_SUFFIX)
+                result = CGC_parser.ParseToFile((geneCaller,os.path.join(RAW_DIR,fileName),outFile,False,1))
+                self.assertEqual(result[2:],(len(RAW_CALLS),""),geneCaller)
+                INFILE = open(outFile,"r")
+                callSet = CGC_geneCall.ReadGeneCallSets(INFILE)[0]
+                INFILE.close()
+                self.assertEqual(callSet.geneCaller,geneCaller)
+                rows = [(geneCall.geneNumber,geneCall.strand,geneCall.leftEnd,geneCall.rightEnd,geneCall.geneLength,
+                         geneCall.contig) for geneCall in callSet.geneCallList]
+                self.assertEqual(rows,GetExpected(geneNumbers),geneCaller)
+        finally:
+            shutil.rmtree(tempDir)
+
+class ContigTest(unittest.TestCase):
+
+    # Glimmer3 names each contig by a plain FASTA header, not only by a Newbler one (length=, numreads=)
+    def testGlimmerContigs(self):
+        lines = [">NC_001416 phage lambda\n",
+                 "orf00001      191      736  +2     9.12\n",
+                 ">contig2\n",
+                 "orf00002      300      100  -1     2.00\n",
+                 ">contig3  length=4000   numreads=12\n",
+                 "orf00003       10      500  +1     3.00\n"]
+        self.assertEqual(list(CGC_parser.ParseGlimmer(iter(lines))),
+                         [(1,'+',191,736,546,'NC_001416'),(2,'-',100,300,201,'contig2'),(3,'+',10,500,491,'contig3')])
+
+    def testGlimmerNoContig(self):
+        self.assertEqual(list(CGC_parser.ParseGlimmer(iter(["orf00001      191      736  +2     9.12\n"]))),
+                         [(1,'+',191,736,546,'unknown')])
+
+# <caller>:<raw file> inputs to CGC_main are parsed as by CGC_parser.py, with no intermediate file
+class RawInputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir  = tempfile.mkdtemp()
+        self.rawSpecs = []
+        self.outFiles = []
+        for geneCaller in ("genemark","glimmer","prodigal"):
+            rawFile = os.path.join(RAW_DIR,RAW_FILES[geneCaller][0])
+            outFile = os.path.join(self.tempDir,geneCaller + CGC_parser.OUT_SUFFIX)
+            CGC_parser.ParseToFile((geneCaller,rawFile,outFile,False,1))
+            self.rawSpecs.append(geneCaller + ":" + rawFile)
+            self.outFiles.append(outFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def testGetRawInput(self):
+        rawFile = os.path.join(RAW_DIR,RAW_FILES["glimmer"][0])
+        self.assertEqual(CGC_main.GetRawInput("Glimmer:" + rawFile),("glimmer",rawFile))
+        self.assertEqual(CGC_main.GetRawInput(rawFile),None)
+        self.assertEqual(CGC_main.GetRawInput("nocaller:" + rawFile),None)
+        self.assertEqual(CGC_main.GetRawInput("glimmer:"),None)
+
+    # The report of the raw outputs is that of the call files parsed from them, in each match mode
+    def testReport(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.assertEqual(GetReport(self.rawSpecs,matchMode),GetReport(self.outFiles,matchMode),matchMode)
+        self.assertEqual(GetReport(self.rawSpecs,workers=2),GetReport(self.outFiles))
+
+    # Raw outputs and call files may be mixed
+    def testMixed(self):
+        fileSet = [self.rawSpecs[0],self.outFiles[1],self.rawSpecs[2]]
+        self.assertEqual(GetReport(fileSet),GetReport(self.outFiles))
+
+# Multi-input mode: raw outputs parsed to call files, in a process pool
+class ParseFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.jobs = []
+        for geneCaller in sorted(RAW_FILES):
+            outFile = os.path.join(self.tempDir,geneCaller + CGC_parser.OUT_SUFFIX)
+            self.jobs.append((geneCaller,os.path.join(RAW_DIR,RAW_FILES[geneCaller][0]),outFile,False))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def ReadOutputs(self):
+        return dict([(job[2],open(job[2],"r").read()) for job in self.jobs])
+
+    # In a pool, every file is parsed, to the same call files as one at a time
+    def testPool(self):
+        results = list(CGC_parser.ParseFiles(self.jobs,1))
+        self.assertEqual(sorted([result[3] for result in results]),[""] * len(self.jobs))
+        serial = self.ReadOutputs()
+        results = list(CGC_parser.ParseFiles(self.jobs,2))
+        self.assertEqual(sorted([result[2] for result in results]),[len(RAW_CALLS)] * len(self.jobs))
+        self.assertEqual(self.ReadOutputs(),serial)
+        self.assertEqual(multiprocessing.active_children(),[])
+
+    # A parser that fails on one input (here, with an IndexError) fails that input only
+    def testParserError(self):
+        Parse = CGC_parser.Parse
+        def FailingParse(geneCaller,fileName,workers=1):
+            if geneCaller == "glimmer":
+                raise IndexError("list index out of range")
+            return Parse(geneCaller,fileName,workers)
+        CGC_parser.Parse = FailingParse
+        try:
+            results = dict([(result[0],result[2:]) for result in CGC_parser.ParseFiles(self.jobs,1)])
+        finally:
+            CGC_parser.Parse = Parse
+        for geneCaller, inFile, outFile, binary in self.jobs:
+            if geneCaller == "glimmer":
+                self.assertEqual(results[inFile],(0,"IndexError: list index out of range"))
+            else:
+                self.assertEqual(results[inFile],(len(RAW_CALLS),""),geneCaller)
+        self.assertEqual([fileName for fileName in os.listdir(self.tempDir) if fileName.startswith("glimmer")],[])
+
+    # A caller that stops reading the results early leaves no worker process running
+    def testStopEarly(self):
+        results = CGC_parser.ParseFiles(self.jobs,2)
+        results.next()
+        results.close()
+        self.assertEqual(multiprocessing.active_children(),[])
+
+class ParseToFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.rawFile = os.path.join(self.tempDir,"genome.phate")
+        RAW = open(self.rawFile,"w")
+        RAW.write(">c1\n100\t400\t+\n>c2\n900\t500\t-\n")
+        RAW.close()
+        self.outFile = os.path.join(self.tempDir,"genome.cgc")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def testIndex(self):
+        self.assertEqual(CGC_parser.ParseToFile(("phate",self.rawFile,self.outFile,False,1))[2:],(2,""))
+        self.assertEqual([entry[0] for entry in CGC_geneCall.ReadContigIndex(self.outFile)],["c1","c2"])
+        self.assertEqual(sorted(os.listdir(self.tempDir)),["genome.cgc","genome.cgc.contigs","genome.phate"])
+
+    # An index left by an earlier output of the same size is replaced, never read with the new output
+    def testOldIndexReplaced(self):
+        CGC_parser.ParseToFile(("phate",self.rawFile,self.outFile,False,1))
+        INDEX = open(self.outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX,"w")
+        INDEX.write("# CGC contig index %d %d\nold\t0\t1\t1\n" % (CGC_geneCall.CONTIG_INDEX_VERSION,os.path.getsize(self.outFile)))
+        INDEX.close()
+        CGC_parser.ParseToFile(("phate",self.rawFile,self.outFile,False,1))
+        self.assertEqual([entry[0] for entry in CGC_geneCall.ReadContigIndex(self.outFile)],["c1","c2"])
+
+    def testBinaryRemovesOldIndex(self):
+        INDEX = open(self.outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX,"w")
+        INDEX.close()
+        self.assertEqual(CGC_parser.ParseToFile(("phate",self.rawFile,self.outFile,True,1))[2:],(2,""))
+        self.assertFalse(os.path.exists(self.outFile + CGC_geneCall.CONTIG_INDEX_SUFFIX))
+
+    # A failed parse leaves no temporary files
+    def testFailure(self):
+        missing = os.path.join(self.tempDir,"missing.phate")
+        self.assertNotEqual(CGC_parser.ParseToFile(("phate",missing,self.outFile,False,1))[3],"")
+        self.assertEqual(os.listdir(self.tempDir),["genome.phate"])
+
+if __name__ == "__main__":
+    unittest.main()
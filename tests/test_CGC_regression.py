@@ -0,0 +1,194 @@
+################################################################################################
+#
+# Module:  test_CGC_regression.py
+#
+# Description:  Regression tests for gene call comparison: the report of a comparison must not
+#    depend on how it was run (comparison backend, worker processes, streaming or loading, text or
+#    binary call files), the tsv grid must be the original PrintGenecallGrid()'s, and no gene call
+#    may be lost from the grid or the statistics when a caller has several calls in one group
+#    (same-stop and overlap matching).
+#
+# Notes:
+#    Input files are in tests/data: genemark.cgc, glimmer.cgc and prodigal.cgc are sorted call
+#    files on two contigs; multi_*.cgc hold the calls of the cases with several calls per caller,
+#    and dup_genemark.cgc a caller's duplicate call.
+#    The numpy backend is tested only if numpy is installed.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import shutil
+import tempfile
+import unittest
+import cStringIO
+from StringIO import StringIO  # print's soft spaces need a file object with a softspace attribute
+
+from CGC_testing import DATA_DIR, CALL_FILES, HAVE_NUMPY, DISTINCT, COMMON, LONE, \
+                        GetReport, SplitReport, GetCount, GetRows, GetBackends
+import CGC_geneCall
+import CGC_compare
+import CGC_grid
+import CGC_main
+
+##### FILES
+
+MULTI_FILE  = os.path.join(DATA_DIR,"multi_genemark.cgc")    # genemark: +100..1000, +400..1000, +5000..6000
+MULTI_SAME  = os.path.join(DATA_DIR,"multi_glimmer_a.cgc")   # glimmer:  +100..1000
+MULTI_OTHER = os.path.join(DATA_DIR,"multi_glimmer_b.cgc")   # glimmer:  +5000..6000
+DUP_FILE    = os.path.join(DATA_DIR,"dup_genemark.cgc")      # genemark: +100..1000 (twice), +5000..6000
+
+##### FUNCTIONS
+
+# The grid of a comparison as the original PrintGenecallGrid() printed it, print statement for print statement
+def GetOriginalGrid(comparison):
+    OUT = StringIO()
+    count = 1
+    print >>OUT, "count\t",
+    for i in xrange(0,len(comparison.callerList)):
+        print >>OUT, "caller\tstrand\tleftEnd\trightEnd\tlength\tcontig\t",
+    print >>OUT
+    for geneList in comparison.uniqueList:
+        printArray = []
+        for i in xrange(0,len(comparison.callerList)):
+            printArray.append('')
+        for i in xrange(0,len(geneList)):
+            printColumn = comparison.callerList.index(geneList[i].geneCaller)
+            printArray[printColumn] = geneList[i].geneCaller + '\t' + geneList[i].strand + '\t' \
+                                    + str(geneList[i].leftEnd) + '\t' + str(geneList[i].rightEnd) + '\t' \
+                                    + str(geneList[i].geneLength) + '\t' + geneList[i].contig + '\t'
+        print >>OUT, count, '\t',
+        for geneCallString in printArray:
+            if geneCallString == '':
+                print >>OUT, "\t\t\t\t\t\t",
+            else:
+                print >>OUT, geneCallString,
+        print >>OUT
+        count += 1
+    return OUT.getvalue()
+
+##### TESTS
+
+class ReportTest(unittest.TestCase):
+
+    def testInputs(self):
+        report = GetReport(CALL_FILES)
+        self.assertEqual(GetCount(report,DISTINCT),111)
+        self.assertEqual(GetCount(report,COMMON),28)
+
+    # The tsv grid written by CGC_grid.GridWriter is the original grid, byte for byte, also where a caller
+    # has duplicate calls
+    def testOriginalGrid(self):
+        for fileSet in (CALL_FILES,[DUP_FILE,MULTI_SAME]):
+            OUT = cStringIO.StringIO()
+            comparison = CGC_main.RunComparison(fileSet,OUT,cStringIO.StringIO())
+            grid = OUT.getvalue()[OUT.getvalue().index("count\t"):]
+            self.assertEqual(grid,GetOriginalGrid(comparison),fileSet)
+
+    def testWorkers(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.assertEqual(GetReport(CALL_FILES,matchMode,workers=2),GetReport(CALL_FILES,matchMode),matchMode)
+
+    @unittest.skipIf(not HAVE_NUMPY,"numpy is not installed")
+    def testNumpyBackend(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            report = GetReport(CALL_FILES,matchMode)
+            self.assertEqual(GetReport(CALL_FILES,matchMode,backend=CGC_compare.BACKEND_NUMPY),report,matchMode)
+            self.assertEqual(GetReport(CALL_FILES,matchMode,workers=2,backend=CGC_compare.BACKEND_NUMPY),report,matchMode)
+
+    def testStream(self):
+        self.assertEqual(SplitReport(GetReport(CALL_FILES,stream=True)),SplitReport(GetReport(CALL_FILES)))
+
+    # Streaming compares identical calls only: other match modes are refused, rather than reported wrongly
+    def testStreamMatchModes(self):
+        for matchMode in (CGC_compare.MATCH_SAME_STOP,CGC_compare.MATCH_OVERLAP):
+            self.assertEqual(GetReport(CALL_FILES,matchMode,stream=True),"",matchMode)
+
+class BinaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.binaryFiles = []
+        for fileName in CALL_FILES:
+            INFILE = open(fileName,"r")
+            callSets = CGC_geneCall.ReadGeneCallSets(INFILE)
+            INFILE.close()
+            binaryFile = os.path.join(self.tempDir,os.path.basename(fileName)[:-len(".cgc")] + CGC_geneCall.BINARY_SUFFIX)
+            OUT = open(binaryFile,"wb")
+            callSets[0].WriteBinary(OUT)
+            OUT.close()
+            self.binaryFiles.append(binaryFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def testRoundTrip(self):
+        for fileName, binaryFile in zip(CALL_FILES,self.binaryFiles):
+            INFILE = open(fileName,"r")
+            callSet = CGC_geneCall.ReadGeneCallSets(INFILE)[0]
+            INFILE.close()
+            binarySet = CGC_geneCall.ReadBinaryGeneCallSet(binaryFile)
+            self.assertEqual(binarySet.geneCaller,callSet.geneCaller)
+            self.assertEqual(GetRows(binarySet),GetRows(callSet))
+
+    # A call set whose caller is not named (no caller line in its file) loads with its calls
+    def testEmptyCaller(self):
+        callSet = CGC_geneCall.GeneCallSet()
+        callSet.geneCallList.AppendRow(1,'+',100,1000,901,"c1","")
+        callSet.UpdateGeneCount()
+        binaryFile = os.path.join(self.tempDir,"unnamed" + CGC_geneCall.BINARY_SUFFIX)
+        OUT = open(binaryFile,"wb")
+        callSet.WriteBinary(OUT)
+        OUT.close()
+        binarySet = CGC_geneCall.ReadBinaryGeneCallSet(binaryFile)
+        self.assertEqual(binarySet.geneCaller,"")
+        self.assertEqual(GetRows(binarySet),GetRows(callSet))
+        self.assertEqual(binarySet.geneCallList.GetKey(0),callSet.geneCallList.GetKey(0))
+
+    def testReports(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.assertEqual(GetReport(self.binaryFiles,matchMode),GetReport(CALL_FILES,matchMode),matchMode)
+
+# A caller with several calls in one group of matching calls (same-stop matching)
+class MultiCallTest(unittest.TestCase):
+
+    # Every call appears in the grid; genemark's second call gets a line of its own, with the same count
+    def testGrid(self):
+        expected = ["1 \tgenemark\t+\t100\t1000\t901\tc1\tglimmer\t+\t100\t1000\t901\tc1\t",
+                    "1 \tgenemark\t+\t400\t1000\t601\tc1\t\t\t\t\t\t\t",
+                    "2 \tgenemark\t+\t5000\t6000\t1001\tc1\t\t\t\t\t\t\t"]
+        for backend in GetBackends():
+            report = GetReport([MULTI_FILE,MULTI_SAME],CGC_compare.MATCH_SAME_STOP,backend=backend)
+            self.assertEqual(SplitReport(report)[1][1:],expected,backend)
+
+    # With exact matching, a caller's duplicate calls fill its columns once: each row is one line
+    def testExactDuplicates(self):
+        expected = ["1 \tgenemark\t+\t100\t1000\t901\tc1\tglimmer\t+\t100\t1000\t901\tc1\t",
+                    "2 \tgenemark\t+\t5000\t6000\t1001\tc1\t\t\t\t\t\t\t"]
+        for backend in GetBackends():
+            report = GetReport([DUP_FILE,MULTI_SAME],backend=backend)
+            self.assertEqual(SplitReport(report)[1][1:],expected,backend)
+        report = GetReport([DUP_FILE,MULTI_SAME],gridFormat=CGC_grid.GRID_CSV)
+        self.assertEqual([line for line in report.splitlines() if not line.startswith("#")][1:],
+                         ["1,+,100,1000,901,c1,+,100,1000,901,c1","2,+,5000,6000,1001,c1,,,,,"])
+
+    def testCsvGrid(self):
+        expected = ["1,+,100,1000,901,c1,+,100,1000,901,c1",
+                    "1,+,400,1000,601,c1,,,,,",
+                    "2,+,5000,6000,1001,c1,,,,,"]
+        report = GetReport([MULTI_FILE,MULTI_SAME],CGC_compare.MATCH_SAME_STOP,gridFormat=CGC_grid.GRID_CSV)
+        self.assertEqual([line for line in report.splitlines() if not line.startswith("#")][1:],expected)
+
+    # A group holding calls of genemark only is a unique (non-matching) call, however many calls it holds
+    def testLoneCalls(self):
+        for backend in GetBackends():
+            for workers in (1,2):
+                report = GetReport([MULTI_FILE,MULTI_OTHER],CGC_compare.MATCH_SAME_STOP,workers=workers,backend=backend)
+                self.assertEqual(GetCount(report,DISTINCT),2,backend)
+                self.assertEqual(GetCount(report,COMMON),1,backend)
+                self.assertEqual(GetCount(report,LONE),1,backend)
+
+if __name__ == "__main__":
+    unittest.main()
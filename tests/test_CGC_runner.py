@@ -0,0 +1,155 @@
+################################################################################################
+#
+# Module:  test_CGC_runner.py
+#
+# Description:  Tests of CGC_runner.JobRunner: each genome is compared with the options given to the
+#    runner; a job that times out is stopped and retried, then reported as an error; a job whose
+#    process dies is retried; and the queues between stages hold back the stages before a slow one.
+#
+# Notes:
+#    The timeout, crash and queue tests replace the runner's stage functions (see TestRunner), so
+#    that jobs are slow, die or wait as each test needs.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from cStringIO import StringIO
+
+from CGC_testing import DATA_DIR, ReadText, GetReport
+import CGC_compare
+import CGC_grid
+import CGC_batch
+import CGC_runner
+
+CGC_runner.CHATTY = False
+
+##### FILES
+
+MATCH_FILES = [os.path.join(DATA_DIR,"match_genemark.cgc"),os.path.join(DATA_DIR,"match_glimmer.cgc")]
+RAW_FILES   = ["genemark:" + os.path.join(DATA_DIR,"raw","genemark.fasta.lst"),"glimmer:" + os.path.join(DATA_DIR,"raw","glimmer.predict")]
+
+SUMMARY = {'distinct':1, 'common':1, 'lone':0, 'callerCounts':{'genemark':1}}
+
+##### FUNCTIONS
+
+# Stage functions of the tests, run in a job's process
+
+def Sleep(seconds):
+    time.sleep(seconds)
+    return ("ok",SUMMARY)
+
+# Dies (as a crashed process does, with no result) the first time; returns when retried
+def CrashOnce(markerFile):
+    if not os.path.exists(markerFile):
+        open(markerFile,"w").close()
+        os._exit(1)
+    return ("ok",SUMMARY)
+
+# The summary table written by a run, as {genome id: fields}
+def ReadSummary(SUMMARY_HANDLE):
+    lines = SUMMARY_HANDLE.getvalue().splitlines()
+    return dict([(line.split('\t')[0],line.split('\t')) for line in lines[1:]])
+
+##### CLASSES
+
+# A runner whose compare stage runs each genome's own function: genome id "sleep<N>" sleeps N seconds,
+# "crash" dies once, and any other genome waits for self.release, if set
+class TestRunner(CGC_runner.JobRunner):
+
+    release     = None  # a threading.Event, or None
+    parsedCount = 0
+
+    def Parse(self,job,timeout):
+        self.parsedCount += 1
+        return (CGC_runner.RESULT_OK,(job['files'],0))
+
+    def Compare(self,job,timeout):
+        genomeId = job['genomeId']
+        if genomeId.startswith("sleep"):
+            return CGC_runner.RunInProcess(Sleep,(float(genomeId[len("sleep"):]),),timeout)
+        if genomeId == "crash":
+            return CGC_runner.RunInProcess(CrashOnce,(os.path.join(self.outDir,"crashed"),),timeout)
+        if self.release is not None:
+            self.release.wait()
+        return (CGC_runner.RESULT_OK,("ok",SUMMARY))
+
+##### TESTS
+
+class RunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def GetGenomeReport(self,genomeId):
+        return ReadText(os.path.join(CGC_batch.GetGenomeDir(self.tempDir,genomeId),CGC_batch.GENOME_OUT))
+
+    # The match mode, minimum overlap, grid format and backend given to the runner are those of each comparison
+    def testOptions(self):
+        for matchMode, minOverlap in ((CGC_compare.MATCH_SAME_STOP,CGC_compare.DEFAULT_MIN_OVERLAP),(CGC_compare.MATCH_OVERLAP,0.6)):
+            runner = CGC_runner.JobRunner(self.tempDir,1,1,None,None,0,CGC_runner.DEFAULT_INTERVAL,False,matchMode,minOverlap,
+                                          CGC_grid.GRID_LONG)
+            SUMMARY_HANDLE = StringIO()
+            self.assertEqual(runner.Run([("match",MATCH_FILES)],SUMMARY_HANDLE),1)
+            self.assertEqual(ReadSummary(SUMMARY_HANDLE)["match"][1:6],["ok","genemark,glimmer","6","2","4"])
+            self.assertEqual(self.GetGenomeReport("match"),
+                             GetReport(MATCH_FILES,matchMode,gridFormat=CGC_grid.GRID_LONG,minOverlap=minOverlap))
+
+    # With stream, raw outputs are parsed to sorted call files, which are streamed
+    def testStream(self):
+        runner = CGC_runner.JobRunner(self.tempDir,1,1,None,None,0,CGC_runner.DEFAULT_INTERVAL,True)
+        SUMMARY_HANDLE = StringIO()
+        runner.Run([("raw",RAW_FILES),("match",MATCH_FILES)],SUMMARY_HANDLE)
+        summary = ReadSummary(SUMMARY_HANDLE)
+        self.assertEqual(summary["raw"][1:6],["ok","genemark,glimmer","4","4","0"])
+        self.assertEqual(summary["match"][1:6],["ok","genemark,glimmer","8","1","7"])
+        self.assertTrue(os.path.exists(os.path.join(self.tempDir,"raw","genemark.fasta.lst.genemark.cgc")))
+
+    # A job that times out is stopped, retried, and then reported as an error; a crashed job succeeds when retried
+    def testTimeoutAndRetry(self):
+        runner = TestRunner(self.tempDir,1,2,None,1.0,1)
+        SUMMARY_HANDLE = StringIO()
+        start = time.time()
+        self.assertEqual(runner.Run([("sleep10",[]),("crash",[]),("sleep0",[])],SUMMARY_HANDLE),3)
+        self.assertTrue(time.time() - start < 8)
+        summary = ReadSummary(SUMMARY_HANDLE)
+        self.assertEqual(summary["sleep10"][1],"error: compare: timed out after 1 s")
+        self.assertEqual(summary["crash"][1],"ok")
+        self.assertEqual(summary["sleep0"][1],"ok")
+        compareStage = runner.stages[1]
+        self.assertEqual((compareStage.attempts,compareStage.retried),(5,2))
+        self.assertEqual(runner.failedCount,1)
+
+    # While the compare stage is held, only the jobs that fit in its queue, and in the parse stage, are taken
+    def testBoundedQueue(self):
+        runner = TestRunner(self.tempDir,1,1,1)
+        runner.release = threading.Event()
+        genomes = [("genome%d" % (i),[]) for i in xrange(0,20)]
+        SUMMARY_HANDLE = StringIO()
+        thread = threading.Thread(target=runner.Run,args=(genomes,SUMMARY_HANDLE))
+        thread.daemon = True
+        thread.start()
+        time.sleep(0.5)
+        try:
+            self.assertEqual(runner.stages[1].active,1)       # the job being compared
+            self.assertEqual(runner.compareQueue.qsize(),1)   # one job waiting for it
+            self.assertEqual(runner.parsedCount,3)            # and one parsed job waiting for room on the queue
+            self.assertEqual(runner.parseQueue.qsize(),1)
+        finally:
+            runner.release.set()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(sorted(ReadSummary(SUMMARY_HANDLE).keys()),sorted([genomeId for genomeId, fileSet in genomes]))
+
+if __name__ == "__main__":
+    unittest.main()
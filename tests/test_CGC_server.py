@@ -0,0 +1,102 @@
+################################################################################################
+#
+# Module:  test_CGC_server.py
+#
+# Description:  Tests of CGC_server.py, run as a process reading JSON-line jobs on standard input:
+#    each job is answered by one JSON line, in order; a comparison is answered with the report of
+#    CGC_main.py, and a bad request, a refused comparison or a file that cannot be read with an
+#    error of its own, after which the server goes on to the next job. Importing CGC_main loads
+#    only the modules that every run needs.
+#
+# Notes:
+#    The server is run once for all the jobs of a test (see Serve()), by the Python running the tests.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import sys
+import json
+import unittest
+import subprocess
+
+from CGC_testing import TOP_DIR, DATA_DIR, CALL_FILES, GetReport
+import CGC_compare
+
+##### FILES
+
+SERVER_FILE = os.path.join(TOP_DIR,"CGC_server.py")
+RAW_FILE    = os.path.join(DATA_DIR,"raw","glimmer.predict")
+MISSING     = os.path.join(DATA_DIR,"missing.cgc")
+
+##### CONSTANTS
+
+LAZY_MODULES = ["CGC_parser","CGC_input","CGC_cache","CGC_state","CGC_profile","multiprocessing"]  # not loaded by "import CGC_main"
+
+##### FUNCTIONS
+
+# Run the server on the requests (dicts, or lines of text) and return its responses, as dicts
+def Serve(requests,options=[]):
+    lines = [request if isinstance(request,str) else json.dumps(request) for request in requests]
+    server = subprocess.Popen([sys.executable,SERVER_FILE] + options,stdin=subprocess.PIPE,stdout=subprocess.PIPE,
+                              stderr=open(os.devnull,"w"),cwd=TOP_DIR)
+    output = server.communicate("\n".join(lines) + "\n")[0]
+    return [json.loads(line) for line in output.splitlines()]
+
+##### TESTS
+
+class ServerTest(unittest.TestCase):
+
+    # A job that fails is answered with its error; the jobs after it are run
+    def testJobs(self):
+        requests = [{'id':1, 'files':CALL_FILES},
+                    {'id':2, 'files':[CALL_FILES[0],MISSING]},
+                    {'id':3},
+                    "not a JSON line",
+                    {'id':4, 'files':CALL_FILES, 'match':"nearest"},
+                    {'id':5, 'files':CALL_FILES, 'match':CGC_compare.MATCH_SAME_STOP},
+                    {'id':6, 'command':"ping"}]
+        responses = Serve(requests)
+        self.assertEqual([response['id'] for response in responses],[1,2,3,None,4,5,6])
+        self.assertEqual([response['status'] for response in responses],["ok","error","error","error","error","ok","ok"])
+        ok, failed, noFiles, notJson, badMatch, sameStop = responses[:6]
+        self.assertEqual(ok['report'],GetReport(CALL_FILES))
+        self.assertEqual((ok['summary']['distinct'],ok['summary']['common']),(111,28))
+        self.assertTrue(MISSING in failed['error'],failed['error'])
+        self.assertTrue(noFiles['error'].startswith("bad request"),noFiles['error'])
+        self.assertTrue(notJson['error'].startswith("bad request"),notJson['error'])
+        self.assertEqual(badMatch['error'],"unknown match mode: nearest")
+        self.assertEqual(sameStop['report'],GetReport(CALL_FILES,CGC_compare.MATCH_SAME_STOP))
+
+    # A comparison that CGC_main refuses is answered with the reason it was refused
+    def testRefused(self):
+        requests = [{'id':1, 'files':CALL_FILES, 'stream':True, 'match':CGC_compare.MATCH_OVERLAP},
+                    {'id':2, 'files':["glimmer:" + RAW_FILE,CALL_FILES[0]], 'stream':True},
+                    {'id':3, 'files':CALL_FILES, 'stream':True}]
+        refusedMatch, refusedRaw, streamed = Serve(requests)
+        self.assertEqual(refusedMatch['status'],"error")
+        self.assertEqual(refusedMatch['error'],"streaming comparison supports exact matching only, not overlap")
+        self.assertEqual(refusedRaw['status'],"error")
+        self.assertTrue(refusedRaw['error'].startswith("streaming requires sorted call files"),refusedRaw['error'])
+        self.assertEqual(streamed['status'],"ok")
+        self.assertEqual(streamed['summary'],Serve([{'files':CALL_FILES}])[0]['summary'])
+
+    # Jobs after a shutdown are not run; with workers, jobs are answered as without
+    def testShutdown(self):
+        requests = [{'id':1, 'files':CALL_FILES},{'id':2, 'command':"shutdown"},{'id':3, 'files':CALL_FILES}]
+        responses = Serve(requests,["--workers=2"])
+        self.assertEqual([response['id'] for response in responses],[1,2])
+        self.assertEqual(responses[0]['report'],GetReport(CALL_FILES))
+
+class ImportTest(unittest.TestCase):
+
+    # Importing CGC_main does not load the modules that only parsing, caching, saving, measuring or a pool of workers need
+    def testImportCost(self):
+        script = "import sys; import CGC_main; print(' '.join(sorted(set(sys.argv[1:]) & set(sys.modules))))"
+        output = subprocess.check_output([sys.executable,"-c",script] + LAZY_MODULES,cwd=TOP_DIR)
+        self.assertEqual(output.strip(),"")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+################################################################################################
+#
+# Module:  test_CGC_state.py
+#
+# Description:  Tests of incremental comparison (CGC_state.py, CGC_main.UpdateComparison()): a saved
+#    comparison, loaded and updated by adding or removing a caller, must report exactly what a
+#    new comparison of the resulting callers reports, in every match mode.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from CGC_testing import CALL_FILES, DATA_DIR, GetReport, GetBackends
+import CGC_compare
+import CGC_state
+import CGC_main
+
+##### FILES
+
+MATCH_FILES = [os.path.join(DATA_DIR,"match_genemark.cgc"),os.path.join(DATA_DIR,"match_glimmer.cgc")]
+
+##### TESTS
+
+class StateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir  = tempfile.mkdtemp()
+        self.stateDir = os.path.join(self.tempDir,"state")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    # Compare fileSet and save the comparison to self.stateDir, as --save-state does
+    def Save(self,fileSet,matchMode,backend=CGC_compare.BACKEND_PYTHON,workers=1):
+        comparison = CGC_main.RunComparison(fileSet,StringIO(),StringIO(),False,workers,matchMode,CGC_compare.DEFAULT_MIN_OVERLAP,
+                                            None,backend=backend)
+        CGC_state.SaveComparison(comparison,self.stateDir)
+        return
+
+    # Load self.stateDir, add the callers of fileSet and remove removeCallers, as --load-state does; returns the report
+    def Update(self,fileSet,removeCallers=[]):
+        OUT = StringIO()
+        comparison = CGC_main.UpdateComparison(self.stateDir,fileSet,removeCallers,OUT,StringIO())
+        self.assertNotEqual(comparison,None)
+        return OUT.getvalue()
+
+    def testLoad(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.Save(CALL_FILES,matchMode)
+            self.assertEqual(self.Update([]),GetReport(CALL_FILES,matchMode),matchMode)
+
+    # Saved genemark and glimmer, plus prodigal: the same as a comparison of all three
+    def testAddCaller(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            for backend in GetBackends():
+                self.Save(CALL_FILES[:2],matchMode,backend)
+                self.assertEqual(self.Update(CALL_FILES[2:]),GetReport(CALL_FILES,matchMode),matchMode + " " + backend)
+
+    # Saved genemark, glimmer and prodigal, less glimmer: the same as a comparison of genemark and prodigal
+    def testRemoveCaller(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.Save(CALL_FILES,matchMode)
+            self.assertEqual(self.Update([],["glimmer"]),GetReport([CALL_FILES[0],CALL_FILES[2]],matchMode),matchMode)
+
+    # Groups holding several calls of one caller (see test_CGC_compare.py) are updated as they are compared
+    def testMultiCallGroups(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.Save(MATCH_FILES[:1],matchMode)
+            self.assertEqual(self.Update(MATCH_FILES[1:]),GetReport(MATCH_FILES,matchMode),matchMode)
+            self.Save(MATCH_FILES,matchMode)
+            self.assertEqual(self.Update([],["glimmer"]),GetReport(MATCH_FILES[:1],matchMode),matchMode)
+
+    # The saved state is replaced, and an updated comparison can be saved again, and updated again
+    def testSaveUpdated(self):
+        self.Save(CALL_FILES[:1],CGC_compare.MATCH_EXACT)
+        comparison = CGC_main.UpdateComparison(self.stateDir,CALL_FILES[1:2],[],StringIO(),StringIO())
+        CGC_state.SaveComparison(comparison,self.stateDir)
+        self.assertEqual(self.Update(CALL_FILES[2:]),GetReport(CALL_FILES))
+        self.assertEqual(os.listdir(self.tempDir),["state"])
+
+    # A comparison by contig (--workers) holds a table per caller per contig, but is saved as one table per caller
+    def testSaveByContig(self):
+        for matchMode in CGC_compare.MATCH_MODES:
+            self.Save(CALL_FILES[:2],matchMode,workers=2)
+            tableFiles = [fileName for fileName in os.listdir(self.stateDir) if fileName.endswith(".cgb")]
+            self.assertEqual(len(tableFiles),2,matchMode)
+            self.assertEqual(self.Update(CALL_FILES[2:]),GetReport(CALL_FILES,matchMode),matchMode)
+            self.Save(CALL_FILES,matchMode,workers=2)
+            self.assertEqual(self.Update([],["glimmer"]),GetReport([CALL_FILES[0],CALL_FILES[2]],matchMode),matchMode)
+
+    def testRemoveUnknownCaller(self):
+        self.Save(CALL_FILES[:2],CGC_compare.MATCH_EXACT)
+        self.assertEqual(CGC_main.UpdateComparison(self.stateDir,[],["prodigal"],StringIO(),StringIO()),None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+################################################################################################
+#
+# Module:  test_CGC_stats.py
+#
+# Description:  Tests of CGC_stats.py: the caller and contig statistics of a comparison (number of
+#    calls, min, max, mean and median length, length histogram, calls per strand), and the text,
+#    TSV and JSON files written with --stats, checked against statistics computed directly from
+#    the lines of the call files in tests/data.
+#
+# Notes:
+#    GetExpected() reads the call files without the CGC modules, and computes each statistic in
+#    the plainest way (e.g., the median of the sorted list of lengths), so that it checks the
+#    length counts kept by CGC_stats.LengthStats.
+#
+#################################################################################################
+
+# This code was developed by Carol L. Ecale Zhou at Lawrence Livermore National Laboratory.
+# THIS CODE IS COVERED BY THE BSD LICENSE. SEE INCLUDED FILE BSD.pdf FOR DETAILS.
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from CGC_testing import CALL_FILES, GetBackends, ReadText
+import CGC_compare
+import CGC_stats
+import CGC_main
+
+##### FUNCTIONS
+
+def GetMedian(lengths):
+    lengths = sorted(lengths)
+    middle = len(lengths) / 2
+    if len(lengths) % 2 == 1:
+        return float(lengths[middle])
+    return (lengths[middle - 1] + lengths[middle]) / 2.0
+
+def GetHistogram(lengths,binWidth=CGC_stats.LENGTH_BIN_WIDTH):
+    binStarts = [(length / binWidth) * binWidth for length in lengths]
+    return [(binStart,binStarts.count(binStart)) for binStart in range(min(binStarts),max(binStarts) + binWidth,binWidth)]
+
+# The statistics of a list of (length, strand), as LengthStats.GetSummary() reports them
+def GetSummary(calls):
+    lengths = [length for length, strand in calls]
+    plus  = len([strand for length, strand in calls if strand == '+'])
+    minus = len([strand for length, strand in calls if strand == '-'])
+    return {'calls':len(calls), 'totalLength':sum(lengths), 'minLength':min(lengths), 'maxLength':max(lengths),
+            'meanLength':float(sum(lengths)) / len(lengths), 'medianLength':GetMedian(lengths),
+            'plusStrand':plus, 'minusStrand':minus, 'plusFraction':float(plus) / (plus + minus),
+            'histogram':{'binWidth':CGC_stats.LENGTH_BIN_WIDTH, 'bins':GetHistogram(lengths)}}
+
+# Read the call files; returns {caller: summary} and {(caller, contig): summary}
+def GetExpected(fileSet):
+    callerCalls = {}; contigCalls = {}
+    for fileName in fileSet:
+        lines = ReadText(fileName).splitlines()
+        caller = lines[0].split()[1]  # "# <caller> gene calls, taken from file ..."
+        for line in lines:
+            if line.startswith('#') or line.strip() == "":
+                continue
+            geneNumber, strand, leftEnd, rightEnd, length, contig = line.split('\t')
+            callerCalls.setdefault(caller,[]).append((int(length),strand))
+            contigCalls.setdefault((caller,contig),[]).append((int(length),strand))
+    return (dict([(caller,GetSummary(calls)) for caller, calls in callerCalls.items()]),
+            dict([(key,GetSummary(calls)) for key, calls in contigCalls.items()]))
+
+def Compare(fileSet,stream=False,backend=CGC_compare.BACKEND_PYTHON):
+    return CGC_main.RunComparison(fileSet,StringIO(),StringIO(),stream,backend=backend)
+
+##### TESTS
+
+class LengthStatsTest(unittest.TestCase):
+
+    def GetStats(self,calls):
+        stats = CGC_stats.LengthStats()
+        for length, strand in calls:
+            stats.Add(length,strand)
+        return stats
+
+    def testMedian(self):
+        self.assertEqual(self.GetStats([(300,'+')]).GetMedian(),300.0)
+        self.assertEqual(self.GetStats([(900,'+'),(300,'-'),(600,'+')]).GetMedian(),600.0)
+        self.assertEqual(self.GetStats([(900,'+'),(300,'-'),(600,'+'),(601,'+')]).GetMedian(),600.5)
+        self.assertEqual(self.GetStats([(300,'+'),(300,'-'),(300,'+'),(1200,'+')]).GetMedian(),300.0)
+        self.assertEqual(self.GetStats([(300,'+'),(300,'-'),(1200,'+'),(1200,'+')]).GetMedian(),750.0)
+
+    # Empty bins between the shortest and the longest call are listed
+    def testHistogram(self):
+        stats = self.GetStats([(100,'+'),(299,'-'),(300,'+'),(1000,'+')])
+        self.assertEqual(stats.GetHistogram(),[(0,2),(300,1),(600,0),(900,1)])
+        self.assertEqual(stats.GetHistogram(500),[(0,3),(500,0),(1000,1)])
+
+    def testEmpty(self):
+        summary = CGC_stats.LengthStats().GetSummary()
+        self.assertEqual([summary[field] for field in ('calls','minLength','maxLength','meanLength','medianLength','plusFraction')],
+                         [0,None,None,None,None,None])
+        self.assertEqual(summary['histogram']['bins'],[])
+
+class ComparisonStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.callerExpected, self.contigExpected = GetExpected(CALL_FILES)
+
+    def CheckSummary(self,summary,expected,message):
+        for field in expected:
+            if isinstance(expected[field],float):
+                self.assertAlmostEqual(summary[field],expected[field],6,message + " " + field)
+            else:
+                self.assertEqual(summary[field],expected[field],message + " " + field)
+
+    # Per caller, in each backend, and in a streaming comparison
+    def testCallerStats(self):
+        comparisons = [(backend,Compare(CALL_FILES,backend=backend)) for backend in GetBackends()]
+        comparisons.append(("stream",Compare(CALL_FILES,True)))
+        for name, comparison in comparisons:
+            self.assertEqual(comparison.stats.GetCallers(),sorted(self.callerExpected))
+            for caller, expected in self.callerExpected.items():
+                self.CheckSummary(comparison.stats.GetCallerStats(caller).GetSummary(),expected,name + " " + caller)
+
+    # Per contig, in each backend; a streaming comparison keeps no per-contig statistics, so that its memory
+    # use does not grow with the number of contigs
+    def testContigStats(self):
+        self.assertEqual(Compare(CALL_FILES,True).stats.contigStats,{})
+        for backend in GetBackends():
+            comparison = Compare(CALL_FILES,backend=backend)
+            self.assertEqual(sorted(comparison.stats.contigStats),sorted(self.contigExpected))
+            for key, expected in self.contigExpected.items():
+                self.CheckSummary(comparison.stats.contigStats[key].GetSummary(),expected,backend + " " + ' '.join(key))
+
+    def testFiles(self):
+        tempDir = tempfile.mkdtemp()
+        try:
+            fileBase = os.path.join(tempDir,"")
+            CGC_main.WriteStatsFiles(Compare(CALL_FILES),fileBase)
+            self.CheckTSV(ReadText(fileBase + CGC_main.STATS_TSV_FILE))
+            self.CheckJSON(ReadText(fileBase + CGC_main.STATS_JSON_FILE))
+            self.CheckText(ReadText(fileBase + CGC_main.STATS_TEXT_FILE))
+        finally:
+            shutil.rmtree(tempDir)
+
+    # One row per caller, each followed by its contigs' rows, in order; floats to 4 places, as in the file
+    def CheckTSV(self,text):
+        lines = text.splitlines()
+        self.assertEqual(lines[0],CGC_stats.TSV_HEADER)
+        fields = CGC_stats.TSV_HEADER.split('\t')
+        expectedRows = []
+        for caller in sorted(self.callerExpected):
+            expectedRows.append(("caller",caller,"",self.callerExpected[caller]))
+            for key in sorted([key for key in self.contigExpected if key[0] == caller]):
+                expectedRows.append(("contig",caller,key[1],self.contigExpected[key]))
+        self.assertEqual(len(lines) - 1,len(expectedRows))
+        for line, (level, caller, contig, expected) in zip(lines[1:],expectedRows):
+            values = [level,caller,contig]
+            for field in fields[3:]:
+                if isinstance(expected[field],float):
+                    values.append("%.4f" % expected[field])
+                else:
+                    values.append(str(expected[field]))
+            self.assertEqual(line.split('\t'),values)
+
+    def CheckJSON(self,text):
+        callers = json.loads(text)['callers']
+        self.assertEqual(sorted(callers),sorted(self.callerExpected))
+        for caller, expected in self.callerExpected.items():
+            summary = callers[caller]
+            summary['histogram']['bins'] = [tuple(binCount) for binCount in summary['histogram']['bins']]
+            self.CheckSummary(summary,expected,"json " + caller)
+            contigs = dict([((caller,contig),contigSummary) for contig, contigSummary in summary['contigs'].items()])
+            self.assertEqual(sorted(contigs),sorted([key for key in self.contigExpected if key[0] == caller]))
+            for key, contigSummary in contigs.items():
+                self.assertEqual(contigSummary['plusStrand'],self.contigExpected[key]['plusStrand'])
+                self.assertEqual(contigSummary['medianLength'],self.contigExpected[key]['medianLength'])
+
+    def CheckText(self,text):
+        for caller, expected in self.callerExpected.items():
+            self.assertTrue("Caller %s produced %d gene calls." % (caller,expected['calls']) in text,caller)
+            self.assertTrue("   Length:  min: %d, max: %d, mean: %.1f, median: %.1f" % (expected['minLength'],expected['maxLength'],
+                            expected['meanLength'],expected['medianLength']) in text,caller)
+            self.assertTrue("   Strand:  +: %d, -: %d" % (expected['plusStrand'],expected['minusStrand']) in text,caller)
+
+if __name__ == "__main__":
+    unittest.main()